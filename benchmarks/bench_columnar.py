@@ -0,0 +1,85 @@
+"""题库内存表示基准
+
+生成一个合成的 ``questions_raw.json``，分别以 ``Benchmark``（``json.load`` +
+pydantic 模型）与 ``ColumnarBenchmark``（流式读取 + 列存储）加载，
+对比加载后常驻内存与峰值内存（tracemalloc，会拖慢两者的加载速度），
+并在关闭 tracemalloc 后单独测量加载时间。
+
+用法::
+
+    uv run python benchmarks/bench_columnar.py [-n 200000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from bili_hardcore_benchmark.core.columnar import ColumnarBenchmark
+from bili_hardcore_benchmark.core.models import Benchmark
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import JSONQuestionStore
+
+CATEGORIES = ["动画", "游戏", "鬼畜", "知识", "文史", "影视", "音乐", "体育"]
+CHOICES = [f"选项{i}" for i in range(400)]
+
+
+def synthesize(n: int) -> Dict[str, Any]:
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1)
+    questions = {}
+    for i in range(n):
+        qid = str(100000 + i)
+        correct = rng.choice([None, None, rng.randrange(4)])
+        questions[qid] = {
+            "id": qid,
+            "question": f"第 {i} 题：以下哪一项正确？",
+            "choices": rng.sample(CHOICES, 4),
+            "category": rng.choice([None, *CATEGORIES]),
+            "correct_answer": correct,
+            "wrong_answers": (
+                [] if correct is not None else sorted(rng.sample(range(4), rng.randrange(3)))
+            ),
+            "attempts": rng.randrange(1, 10),
+            "last_attempt": (start + timedelta(seconds=rng.randrange(10**7))).isoformat(),
+        }
+    return questions
+
+
+def measure(label: str, load: Callable[[], Any]) -> Any:
+    t = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - t
+    tracemalloc.start()
+    result = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mib = 2**20
+    print(
+        f"  {label:<28} {elapsed:7.2f} s  常驻 {current / mib:7.1f} MiB  峰值 {peak / mib:7.1f} MiB"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=200000, help="题目数量")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JSONQuestionStore(Path(tmp) / "questions_raw.json")
+        store.save(synthesize(args.n))
+        size = store.file_path.stat().st_size
+        print(f"== {args.n} 道题目（{size / 2**20:.1f} MiB）")
+
+        dense = measure("Benchmark (pydantic)", lambda: Benchmark(questions=store.load()))
+        columnar = measure("ColumnarBenchmark", lambda: ColumnarBenchmark(store.iter_load()))
+        assert columnar.dump_questions() == dense.dump_questions()
+        assert columnar.count_by_status() == dense.count_by_status()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""响应解码微基准
+
+对比旧路径（每次新建 TypeAdapter + ``resp.json()`` + ``validate_python``）
+与 ``decoding.decode_response``（缓存 TypeAdapter + ``validate_json``）。
+安装了 orjson 时额外对比 ``orjson.loads`` + ``validate_python``。
+
+用法::
+
+    uv run python benchmarks/bench_decode.py [-n 5000]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Dict
+
+from pydantic import TypeAdapter
+
+from bili_hardcore_benchmark.core.models import BiliQuestion, BiliResponse, BiliResult
+from bili_hardcore_benchmark.infrastructure.bilibili.decoding import (
+    decode_response,
+    response_adapter,
+)
+
+QUESTION = {
+    "code": 0,
+    "message": "0",
+    "data": {
+        "id": 123456,
+        "question": "以下哪部作品的导演是宫崎骏？",
+        "answers": [
+            {"ans_text": choice, "ans_hash": f"{i:032x}"}
+            for i, choice in enumerate(["千与千寻", "你的名字", "秒速五厘米", "攻壳机动队"])
+        ],
+        "question_num": 42,
+    },
+}
+RESULT = {
+    "code": 0,
+    "message": "0",
+    "data": {
+        "score": 37,
+        "scores": [
+            {"category": c, "score": i * 3, "total": 10}
+            for i, c in enumerate(["动画", "游戏", "鬼畜", "知识", "文史", "影视", "音乐", "体育"])
+        ],
+    },
+}
+SUBMIT: Dict[str, Any] = {"code": 0, "message": "0", "data": {}}
+
+
+def legacy(content: bytes, model: Any) -> Any:
+    adapter: TypeAdapter[Any] = TypeAdapter(BiliResponse[model])
+    return adapter.validate_python(json.loads(content))
+
+
+def cached_python(content: bytes, model: Any) -> Any:
+    return response_adapter(model).validate_python(json.loads(content))
+
+
+def candidates() -> Dict[str, Callable[[bytes, Any], Any]]:
+    result: Dict[str, Callable[[bytes, Any], Any]] = {
+        "legacy (new adapter + json.loads)": legacy,
+        "cached adapter + json.loads": cached_python,
+        "cached adapter + validate_json": decode_response,
+    }
+    try:
+        import orjson
+
+        def cached_orjson(content: bytes, model: Any) -> Any:
+            return response_adapter(model).validate_python(orjson.loads(content))
+
+        result["cached adapter + orjson.loads"] = cached_orjson
+    except ImportError:
+        pass
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=5000, help="每个用例的循环次数")
+    args = parser.parse_args()
+
+    payloads = {
+        "question": (json.dumps(QUESTION, ensure_ascii=False).encode(), BiliQuestion),
+        "result": (json.dumps(RESULT, ensure_ascii=False).encode(), BiliResult),
+        "submit": (json.dumps(SUBMIT).encode(), Dict[str, Any]),
+    }
+    for name, (content, model) in payloads.items():
+        print(f"== {name} ({len(content)} bytes)")
+        baseline = None
+        for label, fn in candidates().items():
+            fn(content, model)  # 预热
+            per_call = timeit.timeit(lambda: fn(content, model), number=args.n) / args.n
+            baseline = baseline or per_call
+            print(f"  {label:<36} {per_call * 1e6:9.2f} µs  x{baseline / per_call:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
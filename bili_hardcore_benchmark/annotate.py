@@ -0,0 +1,75 @@
+"""离线预标注：提前为所有未完成题目计算 AI 预测
+
+用法::
+
+    # 直接调用模型（有界并发）
+    uv run python -m bili_hardcore_benchmark.annotate run [-c 8] [--limit N]
+    # 或走 OpenAI Batch API：导出请求 -> 提交并下载结果 -> 导入
+    uv run python -m bili_hardcore_benchmark.annotate export batch_requests.jsonl
+    uv run python -m bili_hardcore_benchmark.annotate ingest batch_results.jsonl
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from loguru import logger
+
+from .container import Container
+from .core.services.annotation_service import AnnotationService
+from .core.settings import get_settings
+from .infrastructure.ai.batch import ingest_batch_results, write_batch_requests
+from .infrastructure.ai.cached_provider import CachedAIProvider
+from .infrastructure.ai.hedged_provider import HedgedAIProvider
+from .infrastructure.ai.openai_provider import OpenAIProvider
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="为未完成题目预先计算 AI 预测")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="直接调用模型")
+    run.add_argument("-c", "--concurrency", type=int, default=8, help="并发请求数")
+    run.add_argument("--limit", type=int, default=None, help="最多标注的条目数")
+    export = sub.add_parser("export", help="导出 Batch API 请求文件")
+    export.add_argument("output", type=Path)
+    ingest = sub.add_parser("ingest", help="导入 Batch API 结果文件")
+    ingest.add_argument("results", type=Path)
+    args = parser.parse_args()
+
+    container = Container(get_settings())
+    try:
+        table = container.ai_provider
+        if not isinstance(table, CachedAIProvider):
+            logger.error("预标注结果保存在 AI 缓存中，请启用 AI_CACHE_ENABLED")
+            return
+        service = AnnotationService(
+            container.benchmark_service,
+            container.quiz_service,
+            table,
+        )
+
+        # 对冲模式下缓存键由首个端点决定，批量请求也发往该端点
+        provider = table.inner
+        if isinstance(provider, HedgedAIProvider):
+            provider = provider.endpoints[0]
+
+        if args.command == "run":
+            report = asyncio.run(service.run(concurrency=args.concurrency, limit=args.limit))
+            logger.info(str(report))
+        elif not isinstance(provider, OpenAIProvider):
+            logger.error("Batch API 仅支持 OpenAIProvider")
+        elif args.command == "export":
+            count = write_batch_requests(provider, table, service.pending(), args.output)
+            logger.info(f"已导出 {count} 条请求到 {args.output}")
+        else:
+            ok, failed = ingest_batch_results(provider, table, args.results)
+            logger.info(f"已导入 {ok} 条预测，{failed} 条无效")
+        logger.info(table.stats())
+    except Exception as e:
+        logger.error(e)
+    finally:
+        container.close()
+
+
+if __name__ == "__main__":
+    main()
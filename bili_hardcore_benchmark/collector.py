@@ -0,0 +1,256 @@
+"""多账号并发答题编排
+
+每个账号对应一个 ``QuizSession``，拥有独立的答题客户端与分数跟踪；
+所有会话共享同一个 ``BenchmarkService``，在同一事件循环中并发运行。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from loguru import logger
+
+from .container import Container
+from .core.exceptions import APIError, AuthError, CircuitOpenError, QuizError, TransientAPIError
+from .core.models import BiliQuestion, BiliResult, LoginData, Question
+
+
+@dataclass
+class SessionStats:
+    """单个会话的答题统计"""
+
+    name: str
+    questions: int = 0
+    correct: int = 0
+    wrong: int = 0
+    score: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"[{self.name}] 题目: {self.questions}, 正确: {self.correct}, "
+            f"错误: {self.wrong}, 分数: {self.score}"
+        )
+
+
+class QuizSession:
+    """单账号答题会话"""
+
+    def __init__(self, container: Container, login: LoginData, name: str = "main"):
+        if not login.csrf:
+            raise AuthError("登录信息不完整，缺少 CSRF")
+        self.container = container
+        self.settings = container.settings
+        self.senior = container.get_async_senior_client(login.access_token, login.csrf)
+        self.quiz, self.benchmark = container.quiz_service, container.benchmark_service
+        self.stats = SessionStats(name=name)
+        self.category_scores: dict[str, int] = {}
+        # 出错后上一题的判定结果未知，下一题前需要重新同步分数
+        self._resync = False
+        # 流水线模式：得知上一题结果后立即预取下一题并开始其 AI 预测，与记录结果并行
+        self.predictor = container.predictor if self.settings.pipeline_predictions else None
+        self._next_question: Optional[asyncio.Task[BiliQuestion]] = None
+
+    @property
+    def score(self) -> int:
+        return self.stats.score
+
+    def _log_prefix(self) -> str:
+        return f"[{self.stats.name}] "
+
+    async def _sync_score(self) -> None:
+        result = await self.senior.get_result()
+        self.stats.score = result.score
+        self.category_scores = {s.category: s.score for s in result.scores}
+        self._resync = False
+
+    async def _fetch_result(self, score: int, submitted: float) -> BiliResult:
+        """获取提交后的结果
+
+        服务端处理提交可能有延迟，过早读取会把答对误判为答错并永久记为错误选项：
+        与提交至少间隔 ``result_min_delay``，分数未变时再确认几次。
+        """
+        s = self.settings
+        delay = s.result_min_delay - (time.monotonic() - submitted)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        result = await self.senior.get_result()
+        for _ in range(s.result_confirm_polls):
+            if result.score > score:
+                break
+            await asyncio.sleep(s.result_confirm_delay)
+            result = await self.senior.get_result()
+        return result
+
+    async def run(self) -> SessionStats:
+        try:
+            return await self._run()
+        finally:
+            if self._next_question is not None:
+                self._next_question.cancel()
+
+    async def _run(self) -> SessionStats:
+        p = self._log_prefix()
+        await self._sync_score()
+
+        # 只有取到题目才计入 max_questions，出错的轮次不占用答题数；
+        # 连续出错过多时结束会话
+        failures = 0
+        while self.stats.questions < self.settings.max_questions:
+            if failures >= self.settings.session_max_failures:
+                logger.error(f"{p}连续失败 {failures} 次，结束会话")
+                break
+            try:
+                if self._resync:
+                    await self._sync_score()
+                if self.score >= self.settings.safety_threshold:
+                    break
+                await self._step()
+                failures = 0
+                continue
+            except QuizError as e:
+                logger.error(f"{p}Quiz Error: {e}")
+            except TransientAPIError as e:
+                # 重试已用尽的瞬时故障不终止会话：等待熔断恢复后重新同步分数
+                logger.warning(f"{p}接口暂时不可用: {e}")
+                if isinstance(e, CircuitOpenError):
+                    await asyncio.sleep(e.retry_after)
+            except APIError as e:
+                if self.senior.pacer is None or not self.senior.pacer.is_throttle(e.code):
+                    logger.error(f"{p}API Error: {e} (code: {e.code})")
+                    break
+                logger.warning(f"{p}触发限流 (code: {e.code})，退避后继续")
+            except Exception as e:
+                logger.error(f"{p}Unexpected Error: {e}")
+                break
+            failures += 1
+            self._resync = True
+        return self.stats
+
+    def _track(self, q_data: BiliQuestion) -> Question:
+        q = self.benchmark.get_or_create_question(str(q_data.id), q_data.question, q_data.choices)
+        if self.predictor:
+            known = self.quiz.resolve(q)
+            if self.quiz.recall(known) is None:
+                self.predictor.prefetch(known)
+        return q
+
+    async def _prefetch_question(self) -> BiliQuestion:
+        q_data = await self.senior.get_question()
+        self._track(q_data)
+        return q_data
+
+    async def _fetch_question(self) -> BiliQuestion:
+        task, self._next_question = self._next_question, None
+        if task is not None:
+            return await task
+        return await self.senior.get_question()
+
+    async def _step(self) -> None:
+        p, score = self._log_prefix(), self.score
+        q_data = await self._fetch_question()
+        q = self._track(q_data)
+        self.stats.questions += 1
+        logger.info(f"{p}题目: {q.question[:30]}...")
+
+        # 合并同内容题目（不同 ID）的已知答案后再决策
+        known = self.quiz.resolve(q)
+        if self.quiz.should_skip_question(known, score, self.settings.safety_threshold):
+            idx, _ = self.quiz.select_answer(known)
+            logger.info(f"{p}策略: 故意选错 (当前分数: {score})")
+            await self.senior.submit_answer(
+                int(q.id), q_data.answers[idx].ans_hash, q_data.answers[idx].ans_text
+            )
+            self.benchmark.record_attempt(q.id)
+            return
+
+        ranking = None
+        if self.quiz.needs_ranking(known):
+            # 措辞相近的已完成题目足够相似时直接复用其答案；该排序不保存，
+            # 答错后命中的选项被排除，下次仍由 AI 排序
+            ranking = self.quiz.recall(known)
+            if ranking is not None:
+                logger.info(f"{p}复用相似题目的答案")
+            else:
+                if self.predictor:
+                    ranking = await self.predictor.predict(known)
+                    self.predictor.discard(q.id)
+                else:
+                    # AI 调用是阻塞的，放到线程中执行以免卡住事件循环
+                    ranking = await asyncio.to_thread(self.quiz.rank, known)
+                # 排序保存在题目上，答错后直接取下一个选项
+                self.benchmark.record_ranking(q.id, ranking)
+        idx, strategy = self.quiz.select_answer(known, ranking)
+        logger.info(f"{p}策略: {strategy} -> 选项 {idx}: {q.choices[idx]}")
+        await self.senior.submit_answer(
+            int(q.id), q_data.answers[idx].ans_hash, q_data.answers[idx].ans_text
+        )
+        submitted = time.monotonic()
+        new_result = await self._fetch_result(score, submitted)
+        new_score = new_result.score
+        # 只在确定还有下一轮时预取：预取会建立题目记录并发起 AI 请求，
+        # 最后一题或分数已达阈值时预取的题目不会被作答
+        if (
+            self.predictor
+            and self.stats.questions < self.settings.max_questions
+            and new_score < self.settings.safety_threshold
+        ):
+            self._next_question = asyncio.create_task(self._prefetch_question())
+
+        if new_score > score:
+            # 通过分数变化推算分类
+            category = None
+            for s in new_result.scores:
+                if s.score > self.category_scores.get(s.category, 0):
+                    category = s.category
+                    break
+            if category:
+                logger.success(f"{p}✅ 回答正确! 分区: {category} | 分数: {score} -> {new_score}")
+            else:
+                logger.success(f"{p}✅ 回答正确! 分数: {score} -> {new_score}")
+            self.benchmark.record_correct_answer(q.id, idx, category=category)
+            self.stats.correct += 1
+            if self.predictor:
+                self.predictor.discard(q.id)
+        else:
+            logger.warning(f"{p}❌ 回答错误. 分数未变: {score}")
+            self.benchmark.record_wrong_answer(q.id, idx)
+            self.stats.wrong += 1
+            if self.predictor:
+                self.predictor.prefetch(self.quiz.resolve(q))
+
+        self.stats.score = new_score
+        self.category_scores = {s.category: s.score for s in new_result.scores}
+
+
+async def login_accounts(container: Container, count: int) -> list[LoginData]:
+    """依次登录每个账号：有缓存凭证时直接复用，否则逐个扫码（避免二维码输出交错）"""
+    logins = []
+    for i in range(count):
+        if count > 1:
+            logger.info(f"登录账号 {i + 1}/{count}")
+        logins.append(await container.auth_service.get_login(slot=i))
+    return logins
+
+
+async def run_sessions(container: Container, logins: list[LoginData]) -> list[SessionStats]:
+    """并发运行所有账号的答题会话，单个会话失败不影响其他会话"""
+    sessions = [
+        QuizSession(container, login, name=f"#{i + 1}" if len(logins) > 1 else "main")
+        for i, login in enumerate(logins)
+    ]
+    results = await asyncio.gather(*(s.run() for s in sessions), return_exceptions=True)
+
+    stats = []
+    for session, result in zip(sessions, results):
+        if isinstance(result, BaseException):
+            logger.error(f"[{session.stats.name}] 会话异常退出: {result}")
+            stats.append(session.stats)
+        else:
+            stats.append(result)
+    for s in stats:
+        logger.info(str(s))
+    logger.info(container.benchmark_service.get_statistics())
+    if ai_stats := container.ai_provider.stats():
+        logger.info(ai_stats)
+    return stats
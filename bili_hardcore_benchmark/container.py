@@ -1,18 +1,40 @@
+import shutil
+from datetime import timedelta
 from functools import cached_property
+from typing import Optional
+
+import httpx
+from loguru import logger
 
 from .core.logging import setup_logging
-from .core.services.auth_service import AuthService
-from .core.services.benchmark_service import BenchmarkService
+from .core.services.auth_service import AuthService, TokenCache
+from .core.services.benchmark_service import BenchmarkService, QuestionStore
 from .core.services.export_service import ExportService
+from .core.services.prediction_service import SpeculativePredictor
 from .core.services.quiz_service import QuizService
+from .core.services.selection_policy import BayesianPolicy
 from .core.settings import Settings
+from .infrastructure.ai.cached_provider import CachedAIProvider
+from .infrastructure.ai.hedged_provider import HedgedAIProvider
+from .infrastructure.ai.local_provider import LocalLMProvider
 from .infrastructure.ai.openai_provider import OpenAIProvider
-from .infrastructure.bilibili.auth import BilibiliAuthClient
-from .infrastructure.bilibili.senior import BilibiliSeniorClient
-from .infrastructure.bilibili.user import BilibiliUserClient
+from .infrastructure.ai.provider import AIProviderBase
+from .infrastructure.bilibili.auth import AsyncBilibiliAuthClient, BilibiliAuthClient
+from .infrastructure.bilibili.client import create_async_http_client
+from .infrastructure.bilibili.pacing import AdaptivePacer
+from .infrastructure.bilibili.resilience import RequestGuard, RetryPolicy
+from .infrastructure.bilibili.senior import AsyncBilibiliSeniorClient, BilibiliSeniorClient
+from .infrastructure.bilibili.user import AsyncBilibiliUserClient, BilibiliUserClient
+from .infrastructure.cassette import Cassette
 from .infrastructure.persistence.exporters.huggingface_exporter import HuggingFaceExporter
 from .infrastructure.persistence.exporters.jsonl_exporter import JSONLExporter
-from .infrastructure.persistence.question_store import JSONQuestionStore
+from .infrastructure.persistence.question_store import (
+    JSONQuestionStore,
+    MemoryQuestionStore,
+    WALQuestionStore,
+)
+from .infrastructure.persistence.sqlite_store import SQLiteQuestionStore
+from .infrastructure.persistence.token_cache import EncryptedTokenCache, MemoryTokenCache
 
 
 class Container:
@@ -22,43 +44,300 @@ class Container:
 
     @cached_property
     def auth_service(self) -> AuthService:
-        return AuthService(auth_client=self.auth_client)
+        return AuthService(
+            auth_client=self.auth_client,
+            async_auth_client=self.async_auth_client,
+            token_cache=self.token_cache,
+            user_client_factory=self.get_async_user_client,
+            refresh_margin=timedelta(days=self.settings.login_refresh_margin_days),
+        )
+
+    @cached_property
+    def token_cache(self) -> Optional[TokenCache]:
+        s = self.settings
+        if not s.login_cache_enabled:
+            return None
+        if s.cassette_mode == "replay":
+            # 回放只能发出录制时的登录请求：从录制开始时的凭证出发，刷新结果不写回真实缓存
+            if not s.cassette_login_cache_dir.exists():
+                return MemoryTokenCache()
+            snapshot = EncryptedTokenCache(s.cassette_login_cache_dir, key=s.login_cache_key)
+            return MemoryTokenCache(snapshot.load_all())
+        cache = EncryptedTokenCache(s.login_cache_dir, key=s.login_cache_key)
+        if s.cassette_mode == "record":
+            shutil.rmtree(s.cassette_login_cache_dir, ignore_errors=True)
+            snapshot = EncryptedTokenCache(s.cassette_login_cache_dir, key=s.login_cache_key)
+            for slot, login in cache.load_all().items():
+                snapshot.save(login, slot)
+        return cache
 
     @cached_property
-    def ai_provider(self) -> OpenAIProvider:
-        return OpenAIProvider(
-            base_url=self.settings.openai_base_url,
-            api_key=self.settings.openai_api_key,
-            model=self.settings.openai_model,
-            timeout=self.settings.openai_timeout,
+    def ai_provider(self) -> AIProviderBase:
+        s = self.settings
+        provider = self.create_model_provider()
+        if not s.ai_cache_enabled:
+            return provider
+        if s.cassette_mode == "replay":
+            # 缓存命中与否决定是否发出 AI 请求：从录制开始时的缓存出发，
+            # 条目不因回放时已超过有效期而失效，回放结果不写入真实缓存
+            cached = CachedAIProvider(
+                provider, db_path=None, max_entries=s.ai_cache_max_entries, ttl=None
+            )
+            if s.cassette_ai_cache_path.exists():
+                cached.restore(s.cassette_ai_cache_path)
+            return cached
+        cached = CachedAIProvider(
+            provider,
+            db_path=s.ai_cache_path,
+            max_entries=s.ai_cache_max_entries,
+            ttl=s.ai_cache_ttl_days * 86400,
+        )
+        if s.cassette_mode == "record":
+            cached.backup(s.cassette_ai_cache_path)
+        return cached
+
+    def create_model_provider(self) -> AIProviderBase:
+        s = self.settings
+        if s.ai_backend == "local":
+            return LocalLMProvider(
+                s.local_model, batch_size=s.local_batch_size, threads=s.local_threads
+            )
+        provider: AIProviderBase = OpenAIProvider(
+            base_url=s.openai_base_url,
+            api_key=s.openai_api_key,
+            model=s.openai_model,
+            timeout=s.openai_timeout,
+            logprobs=s.openai_logprobs,
+            answer_format=s.openai_answer_format,
+            max_tokens=s.openai_max_tokens,
+            references=self.benchmark_service if s.retrieval_enabled else None,
+            reference_k=s.retrieval_top_k,
+            reference_min_similarity=s.retrieval_min_similarity,
+            http_client=self.openai_http_client,
         )
+        if s.ai_endpoints:
+            extra = [
+                OpenAIProvider(
+                    base_url=e.base_url,
+                    api_key=e.api_key or s.openai_api_key,
+                    model=e.model,
+                    timeout=s.openai_timeout,
+                    logprobs=e.logprobs,
+                    answer_format=e.answer_format or s.openai_answer_format,
+                    max_tokens=s.openai_max_tokens,
+                    references=self.benchmark_service if s.retrieval_enabled else None,
+                    reference_k=s.retrieval_top_k,
+                    reference_min_similarity=s.retrieval_min_similarity,
+                    http_client=self.openai_http_client,
+                )
+                for e in s.ai_endpoints
+            ]
+            provider = HedgedAIProvider(
+                [provider, *extra],
+                mode=s.ai_hedge_mode,
+                quantile=s.ai_hedge_quantile,
+                initial_delay=s.ai_hedge_initial_delay,
+                timeout=s.openai_timeout,
+            )
+        return provider
+
+    @cached_property
+    def cassette(self) -> Optional[Cassette]:
+        s = self.settings
+        if s.cassette_mode == "off":
+            return None
+        return Cassette(
+            s.cassette_path, s.cassette_mode, speed=s.cassette_speed, strict=s.cassette_strict
+        )
+
+    def sync_transport(self) -> Optional[httpx.BaseTransport]:
+        """同步客户端的传输层，启用录制/回放时经过录制文件"""
+        if self.cassette is None:
+            return None
+        return self.cassette.wrap_sync(httpx.HTTPTransport())
+
+    @cached_property
+    def openai_http_client(self) -> Optional[httpx.Client]:
+        transport = self.sync_transport()
+        return None if transport is None else httpx.Client(transport=transport)
 
     @cached_property
     def auth_client(self) -> BilibiliAuthClient:
-        return BilibiliAuthClient(timeout=self.settings.bilibili_api_timeout)
+        return BilibiliAuthClient(
+            timeout=self.settings.bilibili_api_timeout,
+            guard=self.request_guard,
+            base_url=self.settings.bilibili_passport_base_url,
+            transport=self.sync_transport(),
+        )
+
+    @cached_property
+    def request_guard(self) -> RequestGuard:
+        s = self.settings
+        policy = RetryPolicy(
+            max_attempts=s.bilibili_retry_times,
+            base_delay=s.bilibili_retry_base_delay,
+            max_delay=s.bilibili_retry_max_delay,
+            attempt_timeout=s.bilibili_attempt_timeout,
+            total_budget=s.bilibili_request_budget,
+            retryable_codes=frozenset(s.bilibili_retryable_codes),
+            safe_codes=frozenset(s.pacing_throttle_codes),
+        )
+        return RequestGuard(
+            policy,
+            failure_threshold=s.circuit_failure_threshold,
+            reset_timeout=s.circuit_reset_timeout,
+        )
+
+    @cached_property
+    def async_http_client(self) -> httpx.AsyncClient:
+        return create_async_http_client(
+            timeout=self.settings.bilibili_api_timeout,
+            max_connections=self.settings.bilibili_max_connections,
+            http2=self.settings.bilibili_http2,
+            wrap_transport=None if self.cassette is None else self.cassette.wrap_async,
+        )
+
+    @cached_property
+    def async_auth_client(self) -> AsyncBilibiliAuthClient:
+        return AsyncBilibiliAuthClient(
+            self.async_http_client,
+            guard=self.request_guard,
+            base_url=self.settings.bilibili_passport_base_url,
+        )
 
     def get_user_client(self, access_token: str) -> BilibiliUserClient:
         return BilibiliUserClient(
-            access_token=access_token, timeout=self.settings.bilibili_api_timeout
+            access_token=access_token,
+            timeout=self.settings.bilibili_api_timeout,
+            guard=self.request_guard,
+            base_url=self.settings.bilibili_app_base_url,
+            transport=self.sync_transport(),
+        )
+
+    def get_async_user_client(self, access_token: str) -> AsyncBilibiliUserClient:
+        return AsyncBilibiliUserClient(
+            self.async_http_client,
+            access_token=access_token,
+            guard=self.request_guard,
+            base_url=self.settings.bilibili_app_base_url,
         )
 
     def get_senior_client(self, access_token: str, csrf: str) -> BilibiliSeniorClient:
         return BilibiliSeniorClient(
-            access_token=access_token, csrf=csrf, timeout=self.settings.bilibili_api_timeout
+            access_token=access_token,
+            csrf=csrf,
+            timeout=self.settings.bilibili_api_timeout,
+            guard=self.request_guard,
+            base_url=self.settings.bilibili_api_base_url,
+            transport=self.sync_transport(),
+        )
+
+    def get_async_senior_client(self, access_token: str, csrf: str) -> AsyncBilibiliSeniorClient:
+        return AsyncBilibiliSeniorClient(
+            self.async_http_client,
+            access_token=access_token,
+            csrf=csrf,
+            pacer=self.create_pacer(),
+            guard=self.request_guard,
+            base_url=self.settings.bilibili_api_base_url,
+        )
+
+    def create_pacer(self) -> AdaptivePacer:
+        s = self.settings
+        return AdaptivePacer(
+            rate=s.pacing_rate,
+            burst=s.pacing_burst,
+            min_rate=s.pacing_min_rate,
+            max_rate=s.pacing_max_rate,
+            increase=s.pacing_increase,
+            backoff_base=s.pacing_backoff_base,
+            backoff_max=s.pacing_backoff_max,
+            throttle_codes=s.pacing_throttle_codes,
         )
 
     @cached_property
-    def question_store(self) -> JSONQuestionStore:
-        return JSONQuestionStore(file_path=self.settings.raw_data_path)
+    def question_store(self) -> QuestionStore:
+        if self.settings.cassette_mode == "replay":
+            # 回放的结果不可信（例如不同的作答得到录制时的判定），不写入真实题库
+            snapshot = self.settings.cassette_snapshot_path
+            logger.info(f"回放模式：题库以 {snapshot.name} 为起点，只在内存中更新")
+            return MemoryQuestionStore(JSONQuestionStore(snapshot).load())
+        if self.settings.question_store_backend == "wal":
+            return WALQuestionStore(
+                file_path=self.settings.raw_data_path,
+                compact_every=self.settings.wal_compact_every,
+                fsync=self.settings.wal_fsync,
+            )
+        if self.settings.question_store_backend == "sqlite":
+            return SQLiteQuestionStore(
+                self.settings.sqlite_path, migrate_from=self.settings.raw_data_path
+            )
+        return JSONQuestionStore(
+            file_path=self.settings.raw_data_path, fsync=self.settings.wal_fsync
+        )
 
     @cached_property
     def quiz_service(self) -> QuizService:
-        return QuizService(ai_provider=self.ai_provider)
+        return QuizService(
+            ai_provider=self.ai_provider,
+            answer_index=self.benchmark_service,
+            solved_index=self.benchmark_service if self.settings.retrieval_enabled else None,
+            recall_threshold=self.settings.retrieval_answer_threshold,
+            policy=self.selection_policy,
+        )
+
+    @cached_property
+    def selection_policy(self) -> Optional[BayesianPolicy]:
+        if self.settings.selection_policy != "bayes":
+            return None
+        return BayesianPolicy(
+            self.benchmark_service,
+            prior_strength=self.settings.selection_prior_strength,
+            refresh_interval=self.settings.selection_refresh_interval,
+        )
+
+    @cached_property
+    def predictor(self) -> SpeculativePredictor:
+        return SpeculativePredictor(
+            ai_provider=self.ai_provider,
+            max_concurrency=self.settings.prediction_concurrency,
+        )
 
     @cached_property
     def benchmark_service(self) -> BenchmarkService:
-        return BenchmarkService(question_store=self.question_store)
+        service = BenchmarkService(
+            question_store=self.question_store,
+            write_behind=self.settings.write_behind,
+            flush_every=self.settings.write_behind_max_events,
+            flush_interval=self.settings.write_behind_interval,
+            columnar=self.settings.columnar_questions,
+        )
+        if self.settings.cassette_mode == "record":
+            # 回放时从录制开始时的题库出发，才能做出与录制时相同的决策
+            JSONQuestionStore(self.settings.cassette_snapshot_path).save(
+                service.benchmark.dump_questions()
+            )
+        return service
 
     @cached_property
     def export_service(self) -> ExportService:
-        return ExportService(hf_exporter=HuggingFaceExporter(), jsonl_exporter=JSONLExporter())
+        return ExportService(
+            hf_exporter=HuggingFaceExporter(),
+            jsonl_exporter=JSONLExporter(),
+            max_shards=self.settings.export_max_shards,
+        )
+
+    def close(self) -> None:
+        """写入题库中排队的变更，释放 AI 提供者资源并关闭录制文件"""
+        if "benchmark_service" in self.__dict__:
+            self.benchmark_service.close()
+        if "ai_provider" in self.__dict__:
+            self.ai_provider.close()
+        cassette = self.__dict__.get("cassette")
+        if cassette is not None:
+            logger.info(cassette.stats())
+            cassette.close()
+
+    async def aclose(self) -> None:
+        if "async_http_client" in self.__dict__:
+            await self.async_http_client.aclose()
@@ -0,0 +1,265 @@
+"""列式题库
+
+每道题不再是一个完整的 pydantic 对象，而是若干列中的一行：选项字符串与选项
+组合在表内驻留（“是/否”之类的重复选项只存一份），分类存为整数编码，答案状态
+存放在 ``array`` 中——正确答案为一个字节，错误答案为一个位掩码（因此
+``wrong_answers`` 总是按升序返回），最后作答时间为微秒整数。
+
+``ColumnarQuestions`` 实现 ``MutableMapping[str, Question]``：访问时按需构建
+``Question`` 视图。视图通过弱引用缓存，同一时刻持有同一题目的调用方拿到的
+是同一个对象（与 ``Dict[str, Question]`` 的语义一致）；修改视图后需重新赋值
+（``questions[qid] = q``）才会写回列中。
+"""
+
+import weakref
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+
+from .models import Question, QuestionStatus, format_stats
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+_NO_TIME = -(2**63)
+_MAX_CHOICES = 64
+
+
+def _to_us(dt: Optional[datetime]) -> int:
+    if dt is None:
+        return _NO_TIME
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return (dt - _EPOCH) // _US
+
+
+def _from_us(us: int) -> Optional[datetime]:
+    return None if us == _NO_TIME else _EPOCH + us * _US
+
+
+def _mask(indices: Iterable[int]) -> int:
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+def _bits(mask: int) -> List[int]:
+    return [i for i in range(mask.bit_length()) if mask >> i & 1]
+
+
+class ColumnarQuestions(MutableMapping[str, Question]):
+    """列存储的题目映射，行号即题目的整数 id"""
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, int] = {}
+        self._pool: Dict[str, str] = {}
+        self._choice_pool: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._views: "weakref.WeakValueDictionary[str, Question]" = weakref.WeakValueDictionary()
+
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.choices: List[Tuple[str, ...]] = []
+        self.category = array("i")
+        self.correct = array("b")
+        self.wrong = array("Q")
+        self.attempts = array("I")
+        self.last_attempt = array("q")
+        # 只有少数题目带 AI 排序，按行号稀疏存放
+        self.rankings: Dict[int, Tuple[int, ...]] = {}
+
+    def _intern(self, s: str) -> str:
+        return self._pool.setdefault(s, s)
+
+    def _category_code(self, category: Optional[str]) -> int:
+        if category is None:
+            return -1
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self._categories)
+            self._categories.append(category)
+        return code
+
+    def _write(
+        self,
+        qid: str,
+        text: str,
+        choices: Iterable[str],
+        category: Optional[str],
+        correct_answer: Optional[int],
+        wrong_answers: Iterable[int],
+        attempts: int,
+        last_attempt: Optional[datetime],
+        ai_ranking: Iterable[int] = (),
+    ) -> None:
+        opts = tuple(self._intern(c) for c in choices)
+        if len(opts) > _MAX_CHOICES:
+            raise ValueError(f"题目 {qid} 选项数超过 {_MAX_CHOICES}")
+        opts = self._choice_pool.setdefault(opts, opts)
+        code = self._category_code(category)
+        correct = -1 if correct_answer is None else correct_answer
+        mask, us = _mask(wrong_answers), _to_us(last_attempt)
+        row = self._rows.get(qid)
+        if row is None:
+            self._rows[qid] = len(self.ids)
+            self.ids.append(qid)
+            self.texts.append(text)
+            self.choices.append(opts)
+            self.category.append(code)
+            self.correct.append(correct)
+            self.wrong.append(mask)
+            self.attempts.append(attempts)
+            self.last_attempt.append(us)
+        else:
+            self.texts[row], self.choices[row] = text, opts
+            self.category[row], self.correct[row], self.wrong[row] = code, correct, mask
+            self.attempts[row], self.last_attempt[row] = attempts, us
+        if ranking := tuple(ai_ranking):
+            self.rankings[self._rows[qid]] = ranking
+        else:
+            self.rankings.pop(self._rows[qid], None)
+
+    def add_raw(self, data: Dict[str, Any]) -> None:
+        """写入一条 ``Question.model_dump(mode="json")`` 格式的记录，不经过 pydantic 校验"""
+        last = data.get("last_attempt")
+        self._write(
+            data["id"],
+            data["question"],
+            data["choices"],
+            data.get("category"),
+            data.get("correct_answer"),
+            data.get("wrong_answers", ()),
+            data.get("attempts", 0),
+            datetime.fromisoformat(last) if last else None,
+            data.get("ai_ranking", ()),
+        )
+
+    def lookup_category(self, category: str) -> int:
+        """返回分类编码，不存在时返回 -2（不会与任何行匹配）"""
+        return self._category_codes.get(category, -2)
+
+    def _view(self, row: int) -> Question:
+        correct = self.correct[row]
+        return Question.model_construct(
+            id=self.ids[row],
+            question=self.texts[row],
+            choices=list(self.choices[row]),
+            category=self._categories[c] if (c := self.category[row]) >= 0 else None,
+            correct_answer=None if correct < 0 else correct,
+            wrong_answers=_bits(self.wrong[row]),
+            attempts=self.attempts[row],
+            last_attempt=_from_us(self.last_attempt[row]),
+            ai_ranking=list(self.rankings.get(row, ())),
+        )
+
+    def status(self, row: int) -> QuestionStatus:
+        if self.correct[row] >= 0:
+            return QuestionStatus.COMPLETE
+        return QuestionStatus.PARTIAL if self.wrong[row] else QuestionStatus.UNKNOWN
+
+    def __getitem__(self, qid: str) -> Question:
+        q = self._views.get(qid)
+        if q is None:
+            q = self._views[qid] = self._view(self._rows[qid])
+        return q
+
+    def __setitem__(self, qid: str, q: Question) -> None:
+        self._write(
+            qid,
+            q.question,
+            q.choices,
+            q.category,
+            q.correct_answer,
+            q.wrong_answers,
+            q.attempts,
+            q.last_attempt,
+            q.ai_ranking,
+        )
+        self._views[qid] = q
+
+    def __delitem__(self, qid: str) -> None:
+        # 保持其余题目的顺序（与 dict 一致），其后各行的行号前移一位
+        row = self._rows.pop(qid)
+        for column in (
+            self.ids,
+            self.texts,
+            self.choices,
+            self.category,
+            self.correct,
+            self.wrong,
+            self.attempts,
+            self.last_attempt,
+        ):
+            del column[row]
+        for i in range(row, len(self.ids)):
+            self._rows[self.ids[i]] = i
+        self.rankings = {r - (r > row): ranking for r, ranking in self.rankings.items() if r != row}
+        self._views.pop(qid, None)
+
+    def __contains__(self, qid: object) -> bool:
+        return qid in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def dump(self, row: int) -> Dict[str, Any]:
+        """以 ``Question.model_dump(mode="json")`` 的格式导出一行"""
+        last = _from_us(self.last_attempt[row])
+        correct = self.correct[row]
+        return {
+            "id": self.ids[row],
+            "question": self.texts[row],
+            "choices": list(self.choices[row]),
+            "category": self._categories[c] if (c := self.category[row]) >= 0 else None,
+            "correct_answer": None if correct < 0 else correct,
+            "wrong_answers": _bits(self.wrong[row]),
+            "attempts": self.attempts[row],
+            "last_attempt": last.isoformat() if last else None,
+            "ai_ranking": list(self.rankings.get(row, ())),
+        }
+
+
+class ColumnarBenchmark:
+    """与 ``Benchmark`` 接口一致的列式题库"""
+
+    def __init__(self, items: Iterable[Tuple[str, Dict[str, Any]]] = ()):
+        self.questions = ColumnarQuestions()
+        for _, data in items:
+            self.questions.add_raw(data)
+
+    def dump_questions(self) -> Dict[str, Any]:
+        qs = self.questions
+        return {qs.ids[row]: qs.dump(row) for row in range(len(qs))}
+
+    def count_by_status(self) -> Dict[QuestionStatus, int]:
+        qs = self.questions
+        counts = dict.fromkeys(QuestionStatus, 0)
+        for row in range(len(qs)):
+            counts[qs.status(row)] += 1
+        return counts
+
+    def iter_questions(
+        self,
+        status: Optional[QuestionStatus] = None,
+        category: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> Iterator[Question]:
+        # 先在列上过滤，只为命中的行构建视图
+        qs = self.questions
+        code = qs.lookup_category(category) if category is not None else None
+        since_us = _to_us(since) if since is not None else None
+        for row in range(len(qs)):
+            if status is not None and qs.status(row) != status:
+                continue
+            if code is not None and qs.category[row] != code:
+                continue
+            if since_us is not None and qs.last_attempt[row] < since_us:
+                continue
+            yield qs[qs.ids[row]]
+
+    def get_stats(self) -> str:
+        return format_stats(self.count_by_status())
@@ -27,3 +27,24 @@ class QuizError(BiliHardcoreError):
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(message)
         self.details = details or {}
+
+
+class TransientAPIError(APIError):
+    """Transient API error that persisted after retries"""
+
+    pass
+
+
+class CircuitOpenError(TransientAPIError):
+    """Circuit breaker is open for an endpoint"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"接口熔断中: {endpoint}，{retry_after:.1f}s 后重试")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CassetteMissError(BiliHardcoreError):
+    """No recorded response left to replay for a request"""
+
+    pass
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, Generic, List, Optional, TypeVar, cast
+from typing import Any, Dict, Generic, Iterator, List, Literal, Optional, TypeVar, cast
 
 from pydantic import BaseModel, Field
 
@@ -22,6 +22,8 @@ class Question(BaseModel):
     wrong_answers: List[int] = Field(default_factory=list)
     attempts: int = 0
     last_attempt: Optional[datetime] = None
+    # AI 对选项的完整排序（绝对索引，可能性从高到低），答错后直接取下一个未尝试的选项
+    ai_ranking: List[int] = Field(default_factory=list)
 
     @property
     def status(self) -> QuestionStatus:
@@ -38,6 +40,32 @@ class Question(BaseModel):
             return []
         return [i for i in range(len(self.choices)) if i not in self.wrong_answers]
 
+    def ranked_untried(self) -> List[int]:
+        """按 AI 排序排列的未尝试选项；没有排序时返回空列表"""
+        if not self.ai_ranking:
+            return []
+        untried = self.get_untried_indices()
+        ranked = [i for i in self.ai_ranking if i in untried]
+        return ranked + [i for i in untried if i not in ranked]
+
+
+class QuestionEvent(BaseModel):
+    """题目状态的单次变更，用于增量持久化"""
+
+    op: Literal["create", "attempt", "correct", "wrong", "category", "rank"]
+    id: str
+    seq: Optional[int] = None
+    ts: Optional[datetime] = None
+    idx: Optional[int] = None
+    category: Optional[str] = None
+    question: Optional[str] = None
+    choices: Optional[List[str]] = None
+    ranking: Optional[List[int]] = None
+
+    @classmethod
+    def create(cls, q: Question) -> "QuestionEvent":
+        return cls(op="create", id=q.id, question=q.question, choices=q.choices)
+
 
 class BiliResponse(BaseModel, Generic[T]):
     code: int
@@ -57,7 +85,16 @@ class QRCodeData(BaseModel):
 class LoginData(BaseModel):
     access_token: str
     mid: int
+    refresh_token: str = ""
+    expires_in: int = 0
     cookie_info: Dict[str, Any] = Field(default_factory=dict)
+    obtained_at: Optional[datetime] = None
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        if self.obtained_at is None or not self.expires_in:
+            return None
+        return self.obtained_at + timedelta(seconds=self.expires_in)
 
     @property
     def csrf(self) -> Optional[str]:
@@ -67,6 +104,21 @@ class LoginData(BaseModel):
         return None
 
 
+class BiliTokenInfo(BaseModel):
+    mid: int
+    access_token: str
+    refresh_token: str = ""
+    expires_in: int = 0
+
+
+class RefreshData(BaseModel):
+    token_info: BiliTokenInfo
+    cookie_info: Dict[str, Any] = Field(default_factory=dict)
+
+    def to_login(self) -> LoginData:
+        return LoginData(**self.token_info.model_dump(), cookie_info=self.cookie_info)
+
+
 class BiliAnswer(BaseModel):
     ans_text: str
     ans_hash: str
@@ -97,11 +149,37 @@ class BiliResult(BaseModel):
 class Benchmark(BaseModel):
     questions: Dict[str, Question] = Field(default_factory=dict)
 
+    def dump_questions(self) -> Dict[str, Any]:
+        return cast(Dict[str, Any], self.model_dump(mode="json")["questions"])
+
+    def count_by_status(self) -> Dict[QuestionStatus, int]:
+        counts = dict.fromkeys(QuestionStatus, 0)
+        for q in self.questions.values():
+            counts[q.status] += 1
+        return counts
+
+    def iter_questions(
+        self,
+        status: Optional[QuestionStatus] = None,
+        category: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> Iterator[Question]:
+        for q in self.questions.values():
+            if status is not None and q.status != status:
+                continue
+            if category is not None and q.category != category:
+                continue
+            if since is not None and (q.last_attempt is None or q.last_attempt < since):
+                continue
+            yield q
+
     def get_stats(self) -> str:
-        total = len(self.questions)
-        complete = sum(1 for q in self.questions.values() if q.correct_answer is not None)
-        return (
-            f"Total: {total}, Complete: {complete} ({complete/total*100:.1f}%)"
-            if total
-            else "No data"
-        )
+        return format_stats(self.count_by_status())
+
+
+def format_stats(counts: Dict[QuestionStatus, int]) -> str:
+    total = sum(counts.values())
+    complete = counts[QuestionStatus.COMPLETE]
+    return (
+        f"Total: {total}, Complete: {complete} ({complete/total*100:.1f}%)" if total else "No data"
+    )
@@ -1,7 +1,15 @@
 """业务服务模块"""
 
+from .annotation_service import AnnotationService
 from .benchmark_service import BenchmarkService
 from .export_service import ExportService
+from .prediction_service import SpeculativePredictor
 from .quiz_service import QuizService
 
-__all__ = ["QuizService", "BenchmarkService", "ExportService"]
+__all__ = [
+    "QuizService",
+    "BenchmarkService",
+    "ExportService",
+    "SpeculativePredictor",
+    "AnnotationService",
+]
@@ -0,0 +1,105 @@
+"""离线预标注
+
+在答题之前为题库中所有 UNKNOWN/PARTIAL 题目的未尝试选项预先计算 AI
+排序，结果写入预测表（``CachedAIProvider`` 的缓存）。实时答题时
+``QuizService.rank`` 与 ``SpeculativePredictor`` 发出的请求直接命中
+预测表，模型延迟不再出现在答题循环中。
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Protocol, Tuple
+
+from loguru import logger
+
+from ...core.models import QuestionStatus
+from .benchmark_service import BenchmarkService
+from .quiz_service import QuizService
+
+
+class PredictionTable(Protocol):
+    def lookup(self, question: str, choices: List[str]) -> Optional[List[int]]: ...
+    def rank(self, question: str, choices: List[str]) -> List[int]: ...
+
+
+@dataclass
+class AnnotationReport:
+    pending: int = 0
+    annotated: int = 0
+    failed: int = 0
+
+    def __str__(self) -> str:
+        return f"待标注 {self.pending}，完成 {self.annotated}，失败 {self.failed}"
+
+
+class AnnotationService:
+    def __init__(
+        self,
+        benchmark: BenchmarkService,
+        quiz: QuizService,
+        table: PredictionTable,
+    ):
+        """初始化服务
+
+        Args:
+            benchmark: 题库服务
+            quiz: 答题服务（用于合并同内容题目的已知答案）
+            table: 预测表
+        """
+        self.benchmark = benchmark
+        self.quiz = quiz
+        self.table = table
+
+    def pending(self) -> Iterator[Tuple[str, List[str]]]:
+        """逐个产出预测表中尚缺的 (题干, 未尝试选项)，已去重"""
+        seen: set[Tuple[str, Tuple[str, ...]]] = set()
+        for status in (QuestionStatus.UNKNOWN, QuestionStatus.PARTIAL):
+            for q in self.benchmark.benchmark.iter_questions(status=status):
+                q = self.quiz.resolve(q)
+                if not self.quiz.needs_ranking(q):
+                    continue
+                # 与 QuizService.rank 相同：按原顺序取未尝试选项
+                choices = [q.choices[i] for i in q.get_untried_indices()]
+                item = (q.question, tuple(choices))
+                if item in seen or self.table.lookup(q.question, choices) is not None:
+                    continue
+                seen.add(item)
+                yield q.question, choices
+
+    async def run(self, concurrency: int = 8, limit: Optional[int] = None) -> AnnotationReport:
+        """以有界并发调用模型补全预测表
+
+        Args:
+            concurrency: 同时进行的模型请求数
+            limit: 最多标注的条目数
+        """
+        report = AnnotationReport()
+        queue: asyncio.Queue[Tuple[str, List[str]]] = asyncio.Queue(maxsize=concurrency * 2)
+
+        async def worker() -> None:
+            while True:
+                question, choices = await queue.get()
+                try:
+                    await asyncio.to_thread(self.table.rank, question, choices)
+                    report.annotated += 1
+                except Exception as e:
+                    report.failed += 1
+                    logger.warning(f"预标注失败: {question[:30]}... ({e})")
+                finally:
+                    queue.task_done()
+                done = report.annotated + report.failed
+                if done % 100 == 0:
+                    logger.info(f"预标注进度: {done}/{report.pending}+")
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for item in self.pending():
+                if limit is not None and report.pending >= limit:
+                    break
+                report.pending += 1
+                await queue.put(item)
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+        return report
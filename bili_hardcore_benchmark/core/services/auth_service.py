@@ -1,25 +1,49 @@
+import asyncio
 import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Protocol
 
 from loguru import logger
 from qrcode.constants import ERROR_CORRECT_L
 from qrcode.main import QRCode
 
-from ...core.exceptions import AuthError
-from ...core.models import LoginData
-from ...infrastructure.bilibili.auth import BilibiliAuthClient
+from ...core.exceptions import APIError, AuthError, CassetteMissError, TransientAPIError
+from ...core.models import LoginData, QRCodeData
+from ...infrastructure.bilibili.auth import AsyncBilibiliAuthClient, BilibiliAuthClient
+from ...infrastructure.bilibili.user import AsyncBilibiliUserClient
+
+
+class TokenCache(Protocol):
+    def load(self, slot: int = 0) -> Optional[LoginData]: ...
+    def save(self, login: LoginData, slot: int = 0) -> None: ...
+    def clear(self, slot: int = 0) -> None: ...
 
 
 class AuthService:
-    def __init__(self, auth_client: BilibiliAuthClient):
+    def __init__(
+        self,
+        auth_client: BilibiliAuthClient,
+        async_auth_client: AsyncBilibiliAuthClient,
+        token_cache: Optional[TokenCache] = None,
+        user_client_factory: Optional[Callable[[str], AsyncBilibiliUserClient]] = None,
+        refresh_margin: timedelta = timedelta(days=7),
+    ):
         self.auth_client = auth_client
+        self.async_auth_client = async_auth_client
+        self.token_cache = token_cache
+        self.user_client_factory = user_client_factory
+        self.refresh_margin = refresh_margin
 
-    def login(self) -> LoginData:
-        qr_data = self.auth_client.get_qrcode()
+    def _show_qrcode(self, qr_data: QRCodeData) -> None:
         qr = QRCode(version=1, error_correction=ERROR_CORRECT_L, box_size=2, border=1)
         qr.add_data(qr_data.url)
         qr.print_ascii()
         logger.info(f"请扫码登录: {qr_data.url}")
 
+    def login(self) -> LoginData:
+        qr_data = self.auth_client.get_qrcode()
+        self._show_qrcode(qr_data)
+
         for _ in range(60):
             try:
                 if login := self.auth_client.poll_qrcode(qr_data.auth_code):
@@ -29,3 +53,89 @@ class AuthService:
                 pass
             time.sleep(1)
         raise AuthError("登录超时")
+
+    async def login_async(self) -> LoginData:
+        qr_data = await self.async_auth_client.get_qrcode()
+        self._show_qrcode(qr_data)
+
+        for _ in range(60):
+            try:
+                if login := await self.async_auth_client.poll_qrcode(qr_data.auth_code):
+                    logger.info("✅ 登录成功")
+                    return login
+            except Exception:
+                pass
+            await asyncio.sleep(1)
+        raise AuthError("登录超时")
+
+    async def get_login(self, slot: int = 0) -> LoginData:
+        """获取账号槽位的登录凭证
+
+        优先使用缓存：临近过期时先刷新令牌，再通过账号信息接口校验有效性；
+        缓存缺失或失效时才回退到扫码登录。新凭证会写回缓存。
+
+        Raises:
+            TransientAPIError: 缓存凭证已过期且网络暂时无法刷新（缓存保留，稍后重试）
+        """
+        if self.token_cache and (cached := self.token_cache.load(slot)):
+            if login := await self._revive(cached):
+                self.token_cache.save(login, slot)
+                logger.info(f"✅ 使用缓存登录 (mid: {login.mid})")
+                return login
+            self.token_cache.clear(slot)
+
+        login = (await self.login_async()).model_copy(update={"obtained_at": datetime.now()})
+        if self.token_cache:
+            self.token_cache.save(login, slot)
+        return login
+
+    def _needs_refresh(self, login: LoginData) -> bool:
+        expires_at = login.expires_at
+        return (
+            bool(login.refresh_token)
+            and expires_at is not None
+            and expires_at - datetime.now() < self.refresh_margin
+        )
+
+    async def _revive(self, login: LoginData) -> Optional[LoginData]:
+        if self._needs_refresh(login):
+            try:
+                fresh = await self.async_auth_client.refresh_token(login)
+            except CassetteMissError as e:
+                # 回放时距录制已过去一段时间，录制时无需刷新的凭证现在临近过期
+                logger.warning(f"录制文件中没有刷新请求，沿用缓存凭证: {e}")
+            except TransientAPIError as e:
+                # 网络暂时不可用：保留缓存，未过期的凭证继续使用，下次启动时再刷新；
+                # 已过期时抛出，避免清除缓存后被迫重新扫码
+                expires_at = login.expires_at
+                if expires_at is not None and expires_at <= datetime.now():
+                    raise
+                logger.warning(f"暂时无法刷新登录凭证，沿用缓存: {e}")
+            except APIError as e:
+                logger.warning(f"刷新登录凭证失败: {e}")
+                return None
+            else:
+                login = fresh.model_copy(
+                    update={
+                        "obtained_at": datetime.now(),
+                        "cookie_info": fresh.cookie_info or login.cookie_info,
+                    }
+                )
+                logger.info(f"🔄 登录凭证已刷新 (mid: {login.mid})")
+
+        if not login.csrf:
+            return None
+        if self.user_client_factory is None:
+            return login
+        try:
+            await self.user_client_factory(login.access_token).get_account_info()
+        except CassetteMissError as e:
+            # 录制时未校验该凭证（如录制时扫码登录），回放中无法校验时沿用缓存
+            logger.warning(f"录制文件中没有校验请求，沿用缓存凭证: {e}")
+        except TransientAPIError as e:
+            # 网络暂时不可用时无法校验，沿用缓存凭证，由答题请求暴露真正的失效
+            logger.warning(f"无法校验登录凭证，暂时沿用缓存: {e}")
+        except APIError as e:
+            logger.warning(f"缓存的登录凭证已失效: {e}")
+            return None
+        return login
@@ -1,6 +1,27 @@
-from typing import Any, Dict, Optional, Protocol
+import threading
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
-from ...core.models import Benchmark, Question
+from loguru import logger
+
+from ...core.columnar import ColumnarBenchmark
+from ...core.models import Benchmark, Question, QuestionEvent, QuestionStatus
+from .content_index import ContentIndex, map_answers
+from .retrieval_index import RetrievalIndex
 
 
 class QuestionStore(Protocol):
@@ -8,44 +29,284 @@ class QuestionStore(Protocol):
     def save(self, data: Dict[str, Any]) -> None: ...
 
 
+@runtime_checkable
+class IncrementalQuestionStore(QuestionStore, Protocol):
+    """支持增量写入的题库存储：只持久化本次变更，而不是整个题库
+
+    ``apply`` 的 ``questions`` 至少包含 ``events`` 涉及的题目（变更后的状态）。
+    """
+
+    def apply(self, events: Sequence[QuestionEvent], questions: Mapping[str, Question]) -> None: ...
+
+
+@runtime_checkable
+class StreamingQuestionStore(QuestionStore, Protocol):
+    """可逐条读取题目的存储，加载时无需一次性解析整个文件"""
+
+    def iter_load(self) -> Iterator[Tuple[str, Dict[str, Any]]]: ...
+
+
+@runtime_checkable
+class QuestionQuery(Protocol):
+    """可按条件查询的题目来源：``Benchmark``（内存过滤）或支持下推查询的存储"""
+
+    def count_by_status(self) -> Dict[QuestionStatus, int]: ...
+    def iter_questions(
+        self,
+        status: Optional[QuestionStatus] = None,
+        category: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> Iterator[Question]: ...
+
+
 class BenchmarkService:
-    def __init__(self, question_store: QuestionStore):
+    """题库收集服务
+
+    多个答题会话可共享同一实例：所有修改都在锁内完成，并按以下规则合并，
+    使并发会话对同一题目的结果不会互相覆盖：
+
+    - 已确认的正确答案不会被记为错误答案；
+    - 记录正确答案时会从 ``wrong_answers`` 中剔除该选项；
+    - 两个会话给出不同的正确答案时保留最新结果并告警。
+
+    内存中维护题目内容索引（``ContentIndex``），``related_answers`` 可取得
+    以其他 ID 出现过的同一道题的已知答案；已完成题目另建检索索引
+    （``RetrievalIndex``），``similar_solved`` 可检索措辞相近的已解题目。
+
+    存储实现 ``IncrementalQuestionStore`` 时每次变更只写入对应的事件，
+    否则每次作答后整体保存题库。启用 ``write_behind`` 后变更在内存中排队，
+    由后台线程按数量或时间阈值批量落盘，``close()`` 时写入剩余变更。
+    """
+
+    def __init__(
+        self,
+        question_store: QuestionStore,
+        write_behind: bool = False,
+        flush_every: int = 100,
+        flush_interval: float = 5.0,
+        columnar: bool = False,
+    ):
+        """初始化服务
+
+        Args:
+            question_store: 题库存储
+            write_behind: 是否启用延迟写入：变更先进入内存队列，由后台线程批量落盘
+            flush_every: 延迟写入时，累积多少条变更立即触发落盘
+            flush_interval: 延迟写入时，两次落盘的最长间隔（秒）
+            columnar: 是否使用列式内存表示（``ColumnarBenchmark``），适合数十万题的题库
+
+        Raises:
+            Exception: 读取题库失败（文件损坏等）时原样抛出，不以空题库继续运行
+        """
         self.store = question_store
+        self.write_behind = write_behind
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        # 保证落盘按顺序进行；获取顺序固定为先 _io_lock 后 _lock
+        self._io_lock = threading.Lock()
+        self._pending: List[QuestionEvent] = []
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        self.benchmark: Union[Benchmark, ColumnarBenchmark]
         try:
-            self.benchmark = Benchmark(questions=self.store.load())
-        except Exception:
-            self.benchmark = Benchmark()
+            if columnar:
+                self.benchmark = ColumnarBenchmark(self._iter_load())
+            else:
+                self.benchmark = Benchmark(questions=self.store.load())
+        except Exception as e:
+            # 以空题库继续运行会在下一次保存时覆盖原有数据
+            logger.error(f"加载题库失败: {e}")
+            raise
+        self.index = ContentIndex()
+        self.retrieval = RetrievalIndex()
+        for q in self.questions.values():
+            self.index.add(q)
+            if q.correct_answer is not None:
+                self.retrieval.add(q.id, q.question)
+
+    def _iter_load(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        if isinstance(self.store, StreamingQuestionStore):
+            return self.store.iter_load()
+        return self.store.load().items()
+
+    @property
+    def questions(self) -> MutableMapping[str, Question]:
+        return self.benchmark.questions
 
     def save(self) -> None:
-        self.store.save(self.benchmark.model_dump(mode="json")["questions"])
+        with self._lock:
+            self.store.save(self.benchmark.dump_questions())
+
+    def _commit(self, events: List[QuestionEvent], full_save: bool = True) -> None:
+        if self.write_behind:
+            self._pending.extend(events)
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="benchmark-flusher", daemon=True
+                )
+                self._flusher.start()
+            if len(self._pending) >= self.flush_every:
+                self._wake.set()
+        elif isinstance(self.store, IncrementalQuestionStore):
+            self.store.apply(events, self.questions)
+        elif full_save:
+            self.save()
+
+    def flush(self) -> None:
+        """将排队的变更写入存储
+
+        只在锁内复制待写数据，磁盘 I/O 在锁外进行，不阻塞答题循环。
+        写入失败时变更重新入队，由下一次落盘重试。
+        """
+        with self._io_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+                if not events:
+                    return
+                if isinstance(self.store, IncrementalQuestionStore):
+                    touched = {e.id: self.questions[e.id].model_copy(deep=True) for e in events}
+                else:
+                    data = self.benchmark.dump_questions()
+            try:
+                if isinstance(self.store, IncrementalQuestionStore):
+                    self.store.apply(events, touched)
+                else:
+                    self.store.save(data)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = events
+                raise
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"题库写入失败，稍后重试: {e}")
+
+    def close(self) -> None:
+        """停止后台落盘线程并写入所有排队的变更"""
+        self._closed = True
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
 
     def get_or_create_question(
         self, qid: str, text: str, choices: list[str], category: Optional[str] = None
     ) -> Question:
-        if qid not in self.benchmark.questions:
-            self.benchmark.questions[qid] = Question(
-                id=qid, question=text, choices=choices, category=category
-            )
-        elif category and not self.benchmark.questions[qid].category:
-            self.benchmark.questions[qid].category = category
-        return self.benchmark.questions[qid]
-
-    def record_attempt(self, qid: str) -> None:
-        from datetime import datetime
+        with self._lock:
+            q = self.questions.get(qid)
+            if q is None:
+                q = self.questions[qid] = Question(
+                    id=qid, question=text, choices=choices, category=category
+                )
+                self.index.add(q)
+                events = [QuestionEvent.create(q)]
+            elif category and not q.category:
+                q.category = category
+                self.questions[qid] = q
+                events = []
+            else:
+                return q
+            if category:
+                events.append(QuestionEvent(op="category", id=qid, category=category))
+            self._commit(events, full_save=False)
+            return q
 
-        q = self.benchmark.questions[qid]
+    def _touch(self, q: Question, events: List[QuestionEvent]) -> None:
         q.attempts += 1
         q.last_attempt = datetime.now()
-        self.save()
+        events.append(QuestionEvent(op="attempt", id=q.id, ts=q.last_attempt))
+        # 列式题库返回的是视图，修改后需写回
+        self.questions[q.id] = q
+        self._commit(events)
 
-    def record_correct_answer(self, qid: str, idx: int) -> None:
-        self.benchmark.questions[qid].correct_answer = idx
-        self.record_attempt(qid)
+    def record_attempt(self, qid: str) -> None:
+        with self._lock:
+            self._touch(self.questions[qid], [])
+
+    def record_correct_answer(self, qid: str, idx: int, category: Optional[str] = None) -> None:
+        with self._lock:
+            q = self.questions[qid]
+            if q.correct_answer is not None and q.correct_answer != idx:
+                logger.warning(f"题目 {qid} 正确答案冲突: {q.correct_answer} -> {idx}")
+            q.correct_answer = idx
+            if idx in q.wrong_answers:
+                q.wrong_answers.remove(idx)
+            self.retrieval.add(qid, q.question)
+            events = [QuestionEvent(op="correct", id=qid, idx=idx)]
+            if category:
+                q.category = category
+                events.append(QuestionEvent(op="category", id=qid, category=category))
+            self._touch(q, events)
 
     def record_wrong_answer(self, qid: str, idx: int) -> None:
-        if idx not in self.benchmark.questions[qid].wrong_answers:
-            self.benchmark.questions[qid].wrong_answers.append(idx)
-        self.record_attempt(qid)
+        with self._lock:
+            q = self.questions[qid]
+            events = []
+            if idx == q.correct_answer:
+                logger.warning(f"题目 {qid} 选项 {idx} 已确认正确，忽略错误记录")
+            elif idx not in q.wrong_answers:
+                q.wrong_answers.append(idx)
+                events.append(QuestionEvent(op="wrong", id=qid, idx=idx))
+            self._touch(q, events)
+
+    def record_ranking(self, qid: str, ranking: List[int]) -> None:
+        """保存 AI 对选项的排序，之后答错时按排序取下一个选项而无需再次调用 AI"""
+        with self._lock:
+            q = self.questions[qid]
+            if q.ai_ranking == ranking:
+                return
+            q.ai_ranking = list(ranking)
+            self.questions[qid] = q
+            self._commit([QuestionEvent(op="rank", id=qid, ranking=q.ai_ranking)], full_save=False)
+
+    def related_answers(self, q: Question) -> Tuple[Optional[int], List[int]]:
+        """汇总内容相同的其他题目的已知答案，按 ``q`` 的选项顺序返回
+
+        Returns:
+            (正确选项, 错误选项列表)；多个题目的正确答案不一致时以出现次数最多者为准
+        """
+        with self._lock:
+            votes: Dict[int, int] = {}
+            wrong: set[int] = set()
+            for sid in self.index.siblings(q):
+                correct, w = map_answers(self.questions[sid], q)
+                if correct is not None:
+                    votes[correct] = votes.get(correct, 0) + 1
+                wrong.update(w)
+        answer = max(votes, key=lambda i: votes[i]) if votes else None
+        return answer, sorted(wrong - {answer} if answer is not None else wrong)
+
+    def similar_solved(self, text: str, k: int = 3) -> List[Tuple[Question, float]]:
+        """检索题干与 ``text`` 相近的已完成题目
+
+        Returns:
+            按相似度从高到低排列的 (题目, 余弦相似度)
+        """
+        with self._lock:
+            hits = self.retrieval.search(text, k)
+            return [(self.questions[qid], sim) for qid, sim in hits]
+
+    def references(self, question: str, k: int) -> List[Tuple[str, str, float]]:
+        """相近已完成题目的 (题干, 正确选项文本, 相似度)，供 AI 提示词参考"""
+        return [
+            (q.question, q.choices[q.correct_answer], sim)
+            for q, sim in self.similar_solved(question, k)
+            if q.correct_answer is not None and q.correct_answer < len(q.choices)
+        ]
+
+    def completed_questions(self) -> List[Question]:
+        """已完成题目的快照"""
+        with self._lock:
+            return list(self.benchmark.iter_questions(status=QuestionStatus.COMPLETE))
 
     def get_statistics(self) -> str:
-        return self.benchmark.get_stats()
+        with self._lock:
+            return self.benchmark.get_stats()
@@ -0,0 +1,69 @@
+"""题目内容索引
+
+B站会以不同的题目 ID 下发相同的题目（选项顺序也可能不同）。索引以
+“规范化题干 + 排序后的规范化选项”的哈希为键，把内容相同的题目关联起来，
+使已知的正确/错误选项可以按新题目的选项顺序复用。
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ...core.models import Question
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """统一全半角与大小写并去除空白"""
+    return _WHITESPACE.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+
+def content_key(text: str, choices: Sequence[str]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(normalize(text).encode())
+    for choice in sorted(normalize(c) for c in choices):
+        h.update(b"\x1f" + choice.encode())
+    return h.digest()
+
+
+def map_answers(source: Question, target: Question) -> Tuple[Optional[int], List[int]]:
+    """把 ``source`` 已知的正确/错误选项映射为 ``target`` 的选项索引
+
+    规范化后重复的选项无法确定对应关系，直接忽略。
+    """
+    positions: Dict[str, int] = {}
+    for i, choice in enumerate(target.choices):
+        key = normalize(choice)
+        positions[key] = -1 if key in positions else i
+
+    def to_target(idx: int) -> Optional[int]:
+        if not 0 <= idx < len(source.choices):
+            return None
+        pos = positions.get(normalize(source.choices[idx]), -1)
+        return pos if pos >= 0 else None
+
+    correct = to_target(source.correct_answer) if source.correct_answer is not None else None
+    wrong = [w for w in map(to_target, source.wrong_answers) if w is not None]
+    return correct, wrong
+
+
+class ContentIndex:
+    """内容哈希 -> 题目 ID 列表"""
+
+    def __init__(self) -> None:
+        self._groups: Dict[bytes, List[str]] = {}
+
+    def add(self, q: Question) -> None:
+        group = self._groups.setdefault(content_key(q.question, q.choices), [])
+        if q.id not in group:
+            group.append(q.id)
+
+    def siblings(self, q: Question) -> List[str]:
+        """内容与 ``q`` 相同的其他题目 ID"""
+        group = self._groups.get(content_key(q.question, q.choices), [])
+        return [qid for qid in group if qid != q.id]
+
+    def __len__(self) -> int:
+        return len(self._groups)
@@ -1,31 +1,196 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
-from typing import Protocol
+from typing import Dict, Iterable, List, Literal, Optional, Protocol
 
-from ...core.models import Benchmark, Question
+from ...core.models import Question, QuestionStatus
+from .benchmark_service import QuestionQuery
 
 
 class HuggingFaceExporter(Protocol):
     def export(self, questions: list[Question], output_dir: Path, version: str) -> None: ...
+    def append(self, questions: list[Question], output_dir: Path, version: str) -> None: ...
 
 
 class JSONLExporter(Protocol):
     def export(self, questions: list[Question], output_file: Path) -> None: ...
+    def append(self, questions: list[Question], output_file: Path) -> None: ...
+
+
+def record_digest(q: Question) -> str:
+    """导出记录内容的摘要，内容不变时摘要不变"""
+    content = [q.question, q.choices, q.correct_answer, q.category or "general"]
+    return hashlib.sha1(json.dumps(content, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+@dataclass
+class ExportManifest:
+    """上一次导出的内容清单
+
+    Attributes:
+        version: 导出的数据集版本
+        records: 已导出题目 ID 到内容摘要的映射
+        shards: HuggingFace 数据集的分片数
+        jsonl_size: JSONL 文件大小，与实际不符时说明文件被改动过，需要整体重写
+    """
+
+    version: str
+    records: Dict[str, str] = field(default_factory=dict)
+    shards: int = 1
+    jsonl_size: int = 0
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ExportManifest"]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            # 忽略旧版本清单中已不再使用的字段
+            return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def add(self, questions: Iterable[Question]) -> None:
+        for q in questions:
+            self.records[q.id] = record_digest(q)
+
+    def new_questions(self, questions: Iterable[Question]) -> Optional[List[Question]]:
+        """找出清单中没有的题目
+
+        Args:
+            questions: 当前全部完整题目
+
+        Returns:
+            新题目列表；已导出的题目内容有变化或被移除时返回 None（需要整体重写）
+        """
+        added, seen = [], 0
+        for q in questions:
+            digest = self.records.get(q.id)
+            if digest is None:
+                added.append(q)
+            elif digest != record_digest(q):
+                return None
+            else:
+                seen += 1
+        return added if seen == len(self.records) else None
+
+
+@dataclass
+class ExportResult:
+    mode: Literal["unchanged", "append", "rewrite"]
+    written: int
+    total: int
 
 
 class ExportService:
-    def __init__(self, hf_exporter: HuggingFaceExporter, jsonl_exporter: JSONLExporter):
+    def __init__(
+        self,
+        hf_exporter: HuggingFaceExporter,
+        jsonl_exporter: JSONLExporter,
+        max_shards: int = 32,
+    ):
         self.hf_exporter, self.jsonl_exporter = hf_exporter, jsonl_exporter
+        self.max_shards = max_shards
+
+    @staticmethod
+    def _complete(source: QuestionQuery, category: Optional[str]) -> list[Question]:
+        return list(source.iter_questions(status=QuestionStatus.COMPLETE, category=category))
 
     def export_huggingface(
-        self, benchmark: Benchmark, output_dir: Path, version: str, split: bool = False
+        self,
+        source: QuestionQuery,
+        output_dir: Path,
+        version: str,
+        split: bool = False,
+        category: Optional[str] = None,
     ) -> None:
-        qs = [q for q in benchmark.questions.values() if q.correct_answer is not None]
+        qs = self._complete(source, category)
         if not qs:
             return
         self.hf_exporter.export(qs, output_dir, version)
 
-    def export_jsonl(self, benchmark: Benchmark, output_file: Path) -> None:
-        qs = [q for q in benchmark.questions.values() if q.correct_answer is not None]
+    def export_jsonl(
+        self, source: QuestionQuery, output_file: Path, category: Optional[str] = None
+    ) -> None:
+        qs = self._complete(source, category)
         if not qs:
             return
         self.jsonl_exporter.export(qs, output_file)
+
+    def export_incremental(
+        self,
+        source: QuestionQuery,
+        output_dir: Path,
+        output_file: Path,
+        manifest_path: Path,
+        version: str,
+        full: bool = False,
+    ) -> ExportResult:
+        """按上一次导出的清单增量导出 HuggingFace 数据集与 JSONL
+
+        逐题比较导出内容的摘要，不依赖作答时间：不改变作答时间的修改（如补充
+        分类）与合并进来的旧时间戳变更同样能被发现。只有新增题目时追加到
+        JSONL 末尾并写成新的 Arrow 分片；已导出题目的内容变化、题目被移除、
+        分片数超过 ``max_shards`` 或输出文件与清单不符时整体重写。
+
+        Args:
+            source: 题目来源
+            output_dir: HuggingFace 数据集目录
+            output_file: JSONL 文件路径
+            manifest_path: 导出清单路径
+            version: 数据集版本
+            full: 忽略清单，整体重写
+
+        Returns:
+            导出方式、写入题目数与完整题目总数
+        """
+        manifest = None if full else ExportManifest.load(manifest_path)
+        if manifest is not None and not (
+            manifest.version == version
+            and (output_dir / "train" / "state.json").exists()
+            and output_file.exists()
+            and output_file.stat().st_size == manifest.jsonl_size
+        ):
+            manifest = None
+        if manifest is None:
+            return self._rewrite(
+                self._complete(source, None), output_dir, output_file, manifest_path, version
+            )
+
+        qs = self._complete(source, None)
+        total = len(qs)
+        added = manifest.new_questions(qs)
+        if added is None or (added and manifest.shards >= self.max_shards):
+            return self._rewrite(qs, output_dir, output_file, manifest_path, version)
+        if not added:
+            return ExportResult("unchanged", 0, total)
+
+        self.jsonl_exporter.append(added, output_file)
+        self.hf_exporter.append(added, output_dir, version)
+        manifest.add(added)
+        manifest.shards += 1
+        manifest.jsonl_size = output_file.stat().st_size
+        manifest.save(manifest_path)
+        return ExportResult("append", len(added), total)
+
+    def _rewrite(
+        self,
+        qs: list[Question],
+        output_dir: Path,
+        output_file: Path,
+        manifest_path: Path,
+        version: str,
+    ) -> ExportResult:
+        if not qs:
+            return ExportResult("unchanged", 0, 0)
+        self.hf_exporter.export(qs, output_dir, version)
+        self.jsonl_exporter.export(qs, output_file)
+        manifest = ExportManifest(version=version, jsonl_size=output_file.stat().st_size)
+        manifest.add(qs)
+        manifest.save(manifest_path)
+        return ExportResult("rewrite", len(qs), len(qs))
@@ -0,0 +1,91 @@
+"""投机式 AI 预测
+
+题目文本一到达就在后台线程发起 AI 排序请求，使模型延迟与网络往返重叠。
+排序覆盖所有未尝试选项并保存在题目上，答错后再次遇到该题时直接取下一个
+选项，无需再等待模型。
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+from loguru import logger
+
+from ...core.models import Question
+from .quiz_service import AIProvider, QuizService
+
+PredictionKey = tuple[str, tuple[int, ...]]
+
+
+class SpeculativePredictor:
+    """按 (题目 ID, 未尝试选项) 缓存进行中或已完成的排序任务
+
+    排序结果为选项在 ``q.choices`` 中的绝对索引。
+    """
+
+    def __init__(
+        self,
+        ai_provider: AIProvider,
+        max_concurrency: int = 4,
+        max_entries: int = 10000,
+    ):
+        self.ai_provider = ai_provider
+        self.max_entries = max_entries
+        self._max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: OrderedDict[PredictionKey, asyncio.Task[list[int]]] = OrderedDict()
+        # 被淘汰出缓存的任务仍需强引用，直到执行结束
+        self._running: set[asyncio.Task[list[int]]] = set()
+
+    @staticmethod
+    def needs_prediction(q: Question) -> bool:
+        return QuizService.needs_ranking(q)
+
+    async def _run(self, q: Question, subset: tuple[int, ...]) -> list[int]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            choices = [q.choices[i] for i in subset]
+            ranking = await asyncio.to_thread(self.ai_provider.rank, q.question, choices)
+        return [subset[i] for i in ranking]
+
+    def _schedule(self, q: Question) -> asyncio.Task[list[int]]:
+        subset = tuple(q.get_untried_indices())
+        key = (q.id, subset)
+        task = self._tasks.get(key)
+        if task is not None:
+            self._tasks.move_to_end(key)
+            return task
+
+        task = asyncio.create_task(self._run(q, subset))
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        self._tasks[key] = task
+        self._running.add(task)
+        while len(self._tasks) > self.max_entries:
+            self._tasks.popitem(last=False)
+        return task
+
+    def _on_done(self, key: PredictionKey, task: asyncio.Task[list[int]]) -> None:
+        self._running.discard(task)
+        if task.cancelled():
+            return
+        if exc := task.exception():
+            # 失败的预测不缓存，下次需要时重新请求
+            logger.debug(f"预取预测失败 {key}: {exc}")
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def prefetch(self, q: Question) -> None:
+        """为题目当前的未尝试选项发起后台排序"""
+        if self.needs_prediction(q):
+            self._schedule(q)
+
+    async def predict(self, q: Question) -> list[int]:
+        """返回题目当前未尝试选项的排序（复用已发起的请求）"""
+        # 任务可能被多个会话共享，取消当前等待者时不应连带取消预测本身
+        return await asyncio.shield(self._schedule(q))
+
+    def discard(self, qid: str) -> None:
+        """题目已完整或排序已保存时丢弃其所有预测（进行中的请求无法中断，仅释放引用）"""
+        for key in [k for k in self._tasks if k[0] == qid]:
+            del self._tasks[key]
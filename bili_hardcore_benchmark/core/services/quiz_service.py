@@ -1,18 +1,114 @@
 import random
-from typing import Optional, Protocol
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+from loguru import logger
 
 from ...core.models import Question
+from .content_index import normalize
 
 
 class AIProvider(Protocol):
     def predict(self, question: str, choices: list[str]) -> int: ...
+    def rank(self, question: str, choices: list[str]) -> list[int]: ...
+
+
+class AnswerIndex(Protocol):
+    def related_answers(self, q: Question) -> Tuple[Optional[int], List[int]]: ...
+
+
+class SolvedIndex(Protocol):
+    def similar_solved(self, text: str, k: int = 3) -> List[Tuple[Question, float]]: ...
+
+
+class SelectionPolicy(Protocol):
+    def order(self, q: Question) -> List[int]: ...
 
 
 class QuizService:
-    def __init__(self, ai_provider: AIProvider):
+    def __init__(
+        self,
+        ai_provider: AIProvider,
+        answer_index: Optional[AnswerIndex] = None,
+        solved_index: Optional[SolvedIndex] = None,
+        recall_threshold: float = 0.9,
+        policy: Optional[SelectionPolicy] = None,
+    ):
+        """初始化服务
+
+        Args:
+            ai_provider: AI 提供者
+            answer_index: 内容相同题目的已知答案来源
+            solved_index: 相近已完成题目的检索来源
+            recall_threshold: 相近题目的相似度不低于该值且其正确选项出现在本题
+                未尝试选项中时，直接选择该选项而不调用 AI
+            policy: 结合 AI 排序与历史统计决定尝试顺序的策略，为 None 时按 AI 排序
+        """
         self.ai_provider = ai_provider
+        self.answer_index = answer_index
+        self.solved_index = solved_index
+        self.recall_threshold = recall_threshold
+        self.policy = policy
+
+    def resolve(self, q: Question) -> Question:
+        """合并内容相同的其他题目的已知答案
 
-    def select_answer(self, q: Question) -> tuple[int, str]:
+        返回的副本只用于选项决策，不会写回题库：新 ID 的答案仍以实际作答结果为准。
+        """
+        if self.answer_index is None or q.correct_answer is not None:
+            return q
+        correct, wrong = self.answer_index.related_answers(q)
+        extra = [i for i in wrong if i not in q.wrong_answers]
+        if correct is None and not extra:
+            return q
+        logger.debug(f"题目 {q.id} 复用同内容题目的答案: 正确 {correct}, 错误 {extra}")
+        return q.model_copy(
+            update={
+                "correct_answer": correct,
+                "wrong_answers": [i for i in q.wrong_answers + extra if i != correct],
+            }
+        )
+
+    def recall(self, q: Question) -> Optional[List[int]]:
+        """按相近已完成题目的答案给出排序，没有足够相似的题目时返回 None
+
+        命中的选项排在首位，其余未尝试选项保持原顺序。
+        """
+        if self.solved_index is None or q.correct_answer is not None:
+            return None
+        untried = {normalize(q.choices[i]): i for i in q.get_untried_indices()}
+        for solved, sim in self.solved_index.similar_solved(q.question):
+            if sim < self.recall_threshold:
+                break
+            if solved.correct_answer is None:
+                continue
+            hit = untried.get(normalize(solved.choices[solved.correct_answer]))
+            if hit is not None:
+                logger.debug(f"题目 {q.id} 与已完成题目 {solved.id} 相似度 {sim:.2f}，复用其答案")
+                return [hit] + [i for i in untried.values() if i != hit]
+        return None
+
+    @staticmethod
+    def needs_ranking(q: Question) -> bool:
+        """题目尚需调用 AI 排序：答案未知、剩余多个选项且没有已保存的排序"""
+        return q.correct_answer is None and not q.ai_ranking and len(q.get_untried_indices()) > 1
+
+    def rank(self, q: Question) -> List[int]:
+        """一次 AI 调用得到所有未尝试选项的排序（``q.choices`` 中的绝对索引）"""
+        untried = q.get_untried_indices()
+        ranking = self.ai_provider.rank(q.question, [q.choices[i] for i in untried])
+        return [untried[i] for i in ranking]
+
+    def select_answer(
+        self, q: Question, ranking: Optional[Sequence[int]] = None
+    ) -> tuple[int, str]:
+        """选择要提交的选项
+
+        ``ranking`` 为预先算好的 AI 排序（``q.choices`` 中的绝对索引），
+        未提供时使用题目上保存的排序，都没有时才同步调用 AI。调用 AI 前
+        先通过 ``resolve`` 复用同内容题目的已知答案。配置了 ``policy`` 时
+        由策略结合排序与历史统计给出最终选择。
+        """
+        q = self.resolve(q)
         if q.correct_answer is not None:
             wrong = [i for i in range(len(q.choices)) if i != q.correct_answer]
             return random.choice(wrong or [0]), "故意选错"
@@ -21,11 +117,23 @@ class QuizService:
         if len(untried) == 1:
             return untried[0], "排除法"
 
-        ai_idx = self.ai_provider.predict(q.question, [q.choices[i] for i in untried])
-        return untried[ai_idx], "AI推荐"
+        if ranking is not None:
+            q = q.model_copy(update={"ai_ranking": list(ranking)})
+        if q.ai_ranking:
+            # 答错后取排序中的下一个选项，无需再次调用 AI
+            strategy = "AI推荐" if len(untried) == len(q.choices) else "AI排序"
+        elif recalled := self.recall(q):
+            return recalled[0], "相似题"
+        else:
+            q = q.model_copy(update={"ai_ranking": self.rank(q)})
+            strategy = "AI推荐"
+
+        if self.policy is not None:
+            return self.policy.order(q)[0], "后验推荐"
+        return q.ranked_untried()[0], strategy
 
     def should_skip_question(self, q: Question, score: int, threshold: int) -> bool:
-        return q.correct_answer is not None and score < threshold
+        return self.resolve(q).correct_answer is not None and score < threshold
 
     def judge_result(
         self, q: Question, idx: int, old_score: int, new_score: int
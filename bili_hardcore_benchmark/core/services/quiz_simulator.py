@@ -0,0 +1,248 @@
+"""离线答题模拟
+
+以题库为题目池模拟硬核会员答题，用于在不消耗真实答题次数的情况下比较
+收集策略（选项顺序、故意选错、安全分数线）：
+
+- 每场最多 ``max_questions`` 题，从题目池中随机抽取（有放回，题目池远大于
+  单场题数时与真实抽题近似）；
+- 答对加 1 分，分数达到安全分数线后停止答题；达到 60 分即通过答题，
+  该账号不能再用于收集；
+- 已完成题目在分数低于安全分数线时故意选错（``should_skip_question``），
+  否则直接答对；
+- 选项数超过已完成题目最大选项数的题目没有统计量，不参与模拟；
+- 未完成题目的真实答案：已知则取已知答案，否则按同分类的答案位置分布
+  在未尝试选项中抽取；
+  AI 排序：题目保存了排序则使用该排序，否则按历史统计中正确答案在 AI
+  排序里的名次分布生成。
+
+每道题在给定策略下的尝试顺序是固定的，因此只需预先算出“第几次尝试
+答对”，答题过程退化为逐题比较错误次数，可对大量独立运行向量化。同一
+运行内各场答题顺序进行，知识（已完成题目、已保存的排序）在场次间累积。
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from ...core.models import Question
+from .selection_policy import BayesianPolicy
+
+PASS_SCORE = 60
+
+_Ints = npt.NDArray[np.int_]
+
+AttemptOrder = Literal["ai", "bayes", "first"]
+
+
+@dataclass
+class SimStrategy:
+    """收集策略
+
+    Attributes:
+        order: 未完成题目的尝试顺序：ai 按 AI 排序，bayes 按 ``BayesianPolicy``
+            的后验，first 按选项原顺序（不调用 AI 的基线）
+        threshold: 安全分数线，对应 ``SAFETY_THRESHOLD``
+        deliberate_wrong: 分数低于安全分数线时对已完成题目故意选错
+    """
+
+    name: str
+    order: AttemptOrder = "ai"
+    threshold: int = 55
+    deliberate_wrong: bool = True
+
+
+@dataclass
+class SimulationReport:
+    strategy: SimStrategy
+    sessions: int = 0
+    questions: int = 0
+    completed: int = 0
+    llm_calls: int = 0
+    deliberate_wrong: int = 0
+    passed: int = 0
+    elapsed: float = 0.0
+    completed_by_category: Dict[str, int] = field(default_factory=dict)
+
+    def per_session(self, value: int) -> float:
+        return value / self.sessions if self.sessions else 0.0
+
+    @property
+    def completed_per_call(self) -> float:
+        return self.completed / self.llm_calls if self.llm_calls else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.strategy.name}: 每场 {self.per_session(self.questions):.1f} 题, "
+            f"完成 {self.per_session(self.completed):.2f} 题, "
+            f"AI 调用 {self.per_session(self.llm_calls):.2f} 次, "
+            f"故意选错 {self.per_session(self.deliberate_wrong):.1f} 次; "
+            f"每次 AI 调用完成 {self.completed_per_call:.3f} 题; "
+            f"通过 {self.per_session(self.passed):.1%}; "
+            f"{self.sessions / max(self.elapsed, 1e-9):,.0f} 场/秒"
+        )
+
+
+class _History:
+    def __init__(self, questions: List[Question]):
+        self.questions = questions
+
+    def completed_questions(self) -> List[Question]:
+        return [q for q in self.questions if q.correct_answer is not None]
+
+
+class QuizSimulator:
+    """以题库为题目池的向量化答题模拟器"""
+
+    def __init__(self, questions: List[Question], cold_start: bool = False, seed: int = 0):
+        """初始化模拟器
+
+        Args:
+            questions: 题目池（通常为整个题库）
+            cold_start: 为 True 时所有题目视为未完成，真实答案仍取题库中的已知答案；
+                用于比较从零开始收集的效率
+            seed: 随机种子；不同策略使用相同的随机数，便于对比
+        """
+        self.seed = seed
+        self.tables = BayesianPolicy(_History(questions)).refresh()
+        self.width = width = self.tables.rank.shape[1]
+        questions = [q for q in questions if 1 < len(q.choices) <= width]
+        if not questions:
+            raise ValueError("题目池为空")
+        n = len(questions)
+        self.size = np.array([len(q.choices) for q in questions])
+        last = len(self.tables.rank) - 1
+        self.category = np.array([self.tables.categories.get(q.category, last) for q in questions])
+        self.correct = np.array(
+            [-1 if q.correct_answer is None else q.correct_answer for q in questions]
+        )
+        self.valid = np.arange(width)[None, :] < self.size[:, None]
+        self.tried = np.zeros((n, width), dtype=bool)
+        # 已保存的 AI 排序中各选项的名次，排序中缺失的选项排在最后
+        self.places = np.full((n, width), -1)
+        for row, q in enumerate(questions):
+            self.tried[row, q.wrong_answers] = True
+            if q.ai_ranking:
+                ranked = q.ai_ranking + [i for i in range(len(q.choices)) if i not in q.ai_ranking]
+                self.places[row, ranked] = np.arange(len(ranked))
+        self.known = (self.correct >= 0) & (not cold_start)
+        if cold_start:
+            self.tried[:] = False
+            self.places[:] = -1
+
+    def _world(self, rng: np.random.Generator) -> Tuple[_Ints, _Ints]:
+        """一次运行的隐含状态：各题真实答案与 AI 排序中各选项的名次"""
+        n, width = len(self.size), self.width
+        untried = self.valid & ~self.tried
+        rows = np.arange(n)
+
+        def sample(probs: npt.NDArray[np.float64]) -> _Ints:
+            cum = np.cumsum(probs, axis=1)
+            picked: _Ints = (cum < rng.random(n)[:, None] * cum[:, -1:]).sum(axis=1)
+            return picked
+
+        # 未知的真实答案按同分类的答案位置分布在未尝试选项中抽样
+        position = self.tables.position[self.category, self.size] * untried
+        truth = np.where(self.correct >= 0, self.correct, sample(position))
+        # 真实答案在 AI 排序中的名次按历史分布抽样，其余选项随机排列
+        m = untried.sum(axis=1)
+        place = sample(self.tables.rank[self.category] * (np.arange(width)[None, :] < m[:, None]))
+        keys = np.where(untried, rng.random((n, width)), 2.0)
+        keys[rows, truth] = 3.0
+        others = keys.argsort(axis=1).argsort(axis=1)
+        places = np.where(others >= place[:, None], others + 1, others)
+        places[rows, truth] = place
+        places = np.where(self.places >= 0, self.places, places)
+        return truth, places
+
+    def _solve_at(self, order: AttemptOrder, truth: _Ints, places: _Ints) -> npt.NDArray[np.int8]:
+        """按策略的尝试顺序，真实答案是第几个被尝试的未尝试选项（0 起）"""
+        n, width = len(self.size), self.width
+        rows = np.arange(n)
+        untried = self.valid & ~self.tried
+        if order == "first":
+            key = np.broadcast_to(np.arange(width, dtype=np.float64), (n, width))
+            tie = key
+        elif order == "ai":
+            key = places.astype(np.float64)
+            tie = key
+        else:
+            t = self.tables
+            prior = t.position[self.category, self.size]
+            like = t.rank[self.category[:, None], np.minimum(places, width - 1)]
+            key = -(prior * like)
+            tie = places.astype(np.float64)
+        kt, tt = key[rows, truth][:, None], tie[rows, truth][:, None]
+        before = untried & ((key < kt) | ((key == kt) & (tie < tt)))
+        counts: npt.NDArray[np.int8] = before.sum(axis=1).astype(np.int8)
+        return counts
+
+    def run(
+        self,
+        strategy: SimStrategy,
+        runs: int = 100,
+        sessions: int = 10,
+        max_questions: int = 100,
+    ) -> SimulationReport:
+        """模拟 ``runs`` 个独立运行，每个运行连续答 ``sessions`` 场
+
+        Args:
+            strategy: 收集策略
+            runs: 独立运行数（向量化的批大小）
+            sessions: 每个运行的答题场数
+            max_questions: 每场最多答题数，对应 ``MAX_QUESTIONS``
+
+        Returns:
+            所有运行、所有场次的汇总
+        """
+        start = time.perf_counter()
+        n = len(self.size)
+        solve_at = np.empty((runs, n), dtype=np.int8)
+        for i in range(runs):
+            truth, places = self._world(np.random.default_rng([self.seed, i]))
+            solve_at[i] = self._solve_at(strategy.order, truth, places)
+        m0 = (self.valid & ~self.tried).sum(axis=1)
+        wrong = np.zeros((runs, n), dtype=np.int8)
+        known = np.broadcast_to(self.known, (runs, n)).copy()
+        ranked = np.broadcast_to((self.places >= 0).any(axis=1), (runs, n)).copy()
+        ranked |= strategy.order == "first"
+        completed = np.zeros(len(self.tables.rank), dtype=np.int64)
+
+        report = SimulationReport(strategy, sessions=runs * sessions)
+        rng = np.random.default_rng([self.seed, runs])
+        all_runs = np.arange(runs)
+        for _ in range(sessions):
+            score = np.zeros(runs, dtype=np.int64)
+            draws = rng.integers(0, n, (runs, max_questions))
+            for t in range(max_questions):
+                active = score < min(strategy.threshold, PASS_SCORE)
+                if not active.any():
+                    break
+                r, q = all_runs[active], draws[active, t]
+                report.questions += len(r)
+                k = known[r, q]
+                if strategy.deliberate_wrong:
+                    report.deliberate_wrong += int(k.sum())
+                else:
+                    score[r[k]] += 1
+
+                r, q = r[~k], q[~k]
+                calls = ~ranked[r, q] & (m0[q] - wrong[r, q] > 1)
+                report.llm_calls += int(calls.sum())
+                ranked[r[calls], q[calls]] = True
+                hit = wrong[r, q] == solve_at[r, q]
+                score[r[hit]] += 1
+                known[r[hit], q[hit]] = True
+                np.add.at(completed, self.category[q[hit]], 1)
+                wrong[r[~hit], q[~hit]] += 1
+            report.passed += int((score >= PASS_SCORE).sum())
+
+        report.completed = int(completed.sum())
+        names = {row: name for name, row in self.tables.categories.items()}
+        report.completed_by_category = {
+            names.get(row) or "未分类": int(c) for row, c in enumerate(completed) if c
+        }
+        report.elapsed = time.perf_counter() - start
+        return report
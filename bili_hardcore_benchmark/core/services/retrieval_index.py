@@ -0,0 +1,133 @@
+"""已完成题目的检索索引
+
+以规范化题干的字符 n-gram 建立倒排索引：先用 BM25 在倒排表上召回候选，
+再以 IDF 加权的余弦相似度精排，得到 ``[0, 1]`` 区间的相似度。索引支持
+增量更新，题目一旦确认正确答案即可被检索到。
+
+与 ``ContentIndex`` 的区别：后者只关联内容完全相同的题目，这里检索措辞
+相近的题目，用作 AI 提示词中的参考，相似度足够高时直接作答。
+"""
+
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from .content_index import normalize
+
+
+def ngrams(text: str, n: int = 2) -> Counter[str]:
+    """规范化文本的字符 n-gram 计数，短于 n 的文本整体作为一项"""
+    text = normalize(text)
+    if len(text) <= n:
+        return Counter([text]) if text else Counter()
+    return Counter(text[i : i + n] for i in range(len(text) - n + 1))
+
+
+class RetrievalIndex:
+    """字符 n-gram 倒排索引（BM25 召回 + 余弦精排）"""
+
+    def __init__(
+        self,
+        n: int = 2,
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_df: float = 0.2,
+        candidates: int = 32,
+    ):
+        """初始化索引
+
+        Args:
+            n: n-gram 长度（中文题干以二元组为宜）
+            k1: BM25 词频饱和参数
+            b: BM25 长度归一化参数
+            max_df: 文档频率超过该比例的 n-gram 不参与召回（题库较小时不生效）
+            candidates: 进入余弦精排的候选数
+        """
+        self.n = n
+        self.k1 = k1
+        self.b = b
+        self.max_df = max_df
+        self.candidates = candidates
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # 只保存原文（与题库共享同一字符串对象）与长度，n-gram 在需要时重新计算
+        self._texts: Dict[str, str] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._texts
+
+    def add(self, doc_id: str, text: str) -> None:
+        """加入或替换一个文档"""
+        self.remove(doc_id)
+        terms = ngrams(text, self.n)
+        if not terms:
+            return
+        self._texts[doc_id] = text
+        self._lengths[doc_id] = length = sum(terms.values())
+        self._total_len += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: str) -> None:
+        text = self._texts.pop(doc_id, None)
+        if text is None:
+            return
+        self._total_len -= self._lengths.pop(doc_id)
+        for term in ngrams(text, self.n):
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log((len(self._texts) - df + 0.5) / (df + 0.5) + 1)
+
+    def search(self, text: str, k: int = 5) -> List[Tuple[str, float]]:
+        """检索与 ``text`` 最相似的文档
+
+        Returns:
+            按相似度从高到低排列的 (文档 ID, 余弦相似度)
+        """
+        query = ngrams(text, self.n)
+        total = len(self._texts)
+        if not query or not total:
+            return []
+        avgdl = self._total_len / total
+        limit = self.max_df * total if total >= 100 else total
+
+        k1, b, lengths = self.k1, self.b, self._lengths
+        scores: Dict[str, float] = defaultdict(float)
+        # 同一次查询内缓存 IDF，精排时候选文档的 n-gram 多有重复
+        weights: Dict[str, float] = {}
+        for term in query:
+            posting = self._postings.get(term)
+            idf = weights[term] = self._idf(term)
+            if posting is None or len(posting) > limit:
+                continue
+            for doc_id, tf in posting.items():
+                norm = k1 * (1 - b + b * lengths[doc_id] / avgdl)
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+        if not scores:
+            return []
+
+        def weight(term: str) -> float:
+            w = weights.get(term)
+            if w is None:
+                w = weights[term] = self._idf(term)
+            return w
+
+        q_norm = math.sqrt(sum((qtf * weights[t]) ** 2 for t, qtf in query.items()))
+        ranked = []
+        for doc_id in heapq.nlargest(self.candidates, scores, key=scores.__getitem__):
+            doc = ngrams(self._texts[doc_id], self.n)
+            dot = sum(qtf * doc[t] * weights[t] ** 2 for t, qtf in query.items() if t in doc)
+            d_norm = math.sqrt(sum((tf * weight(t)) ** 2 for t, tf in doc.items()))
+            ranked.append((doc_id, dot / (q_norm * d_norm)))
+        ranked.sort(key=lambda r: r[1], reverse=True)
+        return ranked[:k]
@@ -0,0 +1,179 @@
+"""选项选择策略
+
+``BayesianPolicy`` 对每道题维护选项为正确答案的后验概率：
+
+- 先验：同分类、同选项数的已完成题目中正确答案所在位置的频率；
+- 似然：同分类已完成题目中正确答案在 AI 排序里的名次分布，即 AI 在该
+  分类上的历史准确率与各名次的置信度；
+- 已答错的选项后验为 0。
+
+每次作答只得到“对/错”的反馈，代价相同，按后验从高到低依次尝试可使
+期望尝试次数最小，因此每次选择后验最大的未尝试选项。统计量由 NumPy 在
+整个题库上一次算出、按分类缓存，超过刷新间隔后由后台线程重新计算：
+数十万题规模时计算需要秒级时间，不能在答题的事件循环中进行。计算完成前
+沿用旧的统计量，首次计算完成前只有先验（等价于按 AI 排序）。
+"""
+
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Protocol
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from ...core.models import Question
+
+_Array = npt.NDArray[np.float64]
+
+
+class AnswerHistory(Protocol):
+    def completed_questions(self) -> List[Question]: ...
+
+
+class _Tables(NamedTuple):
+    # 分类名 -> 行号；未知分类使用最后一行（全题库统计）
+    categories: Dict[Optional[str], int]
+    # [分类, 选项数, 位置]：正确答案位于该位置的概率
+    position: _Array
+    # [分类, 名次]：正确答案位于 AI 排序该名次的概率
+    rank: _Array
+
+
+class BayesianPolicy:
+    """按后验概率从高到低尝试选项"""
+
+    def __init__(
+        self,
+        history: AnswerHistory,
+        prior_strength: float = 5.0,
+        refresh_interval: float = 300.0,
+    ):
+        """初始化策略
+
+        Args:
+            history: 已完成题目的来源
+            prior_strength: 平滑强度：全题库统计的每个位置/名次加上的伪计数，
+                同时是分类统计向全题库统计收缩的伪样本数
+            refresh_interval: 统计量的缓存时间（秒）
+        """
+        self.history = history
+        self.prior_strength = prior_strength
+        self.refresh_interval = refresh_interval
+        self._tables: Optional[_Tables] = None
+        self._prior: Optional[_Tables] = None
+        self._next_refresh = 0.0
+        self._refreshing: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """下一次取统计量时重新计算"""
+        with self._lock:
+            self._next_refresh = 0.0
+
+    def tables(self) -> _Tables:
+        """当前的统计量，不阻塞调用方
+
+        统计量过期时启动后台线程重新计算，并立即返回旧的统计量；
+        尚未算出时返回只含先验的统计量。
+        """
+        with self._lock:
+            if time.monotonic() >= self._next_refresh and self._refreshing is None:
+                self._refreshing = threading.Thread(
+                    target=self._refresh_in_background, name="selection-policy", daemon=True
+                )
+                self._refreshing.start()
+            if self._tables is not None:
+                return self._tables
+            if self._prior is None:
+                self._prior = self._build([])
+            return self._prior
+
+    def refresh(self) -> _Tables:
+        """在当前线程中重新计算统计量并返回"""
+        tables = self._build(self.history.completed_questions())
+        with self._lock:
+            self._tables = tables
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        return tables
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"选择策略统计更新失败: {e}")
+            with self._lock:
+                self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            with self._lock:
+                self._refreshing = None
+
+    def _build(self, questions: List[Question]) -> _Tables:
+        categories: Dict[Optional[str], int] = {}
+        cat, size, pos, rank = [], [], [], []
+        for q in questions:
+            if q.correct_answer is None or q.correct_answer >= len(q.choices):
+                continue
+            cat.append(categories.setdefault(q.category, len(categories)))
+            size.append(len(q.choices))
+            pos.append(q.correct_answer)
+            rank.append(
+                q.ai_ranking.index(q.correct_answer) if q.correct_answer in q.ai_ranking else -1
+            )
+        width = max(size, default=4)
+        rows = len(categories) + 1
+        c, n, p, r = (np.asarray(a, dtype=np.intp) for a in (cat, size, pos, rank))
+
+        position = np.zeros((rows, width + 1, width))
+        np.add.at(position, (c, n, p), 1.0)
+        position[-1] = position[:-1].sum(axis=0)
+        ranked = r >= 0
+        rank_counts = np.zeros((rows, width))
+        np.add.at(rank_counts, (c[ranked], r[ranked]), 1.0)
+        rank_counts[-1] = rank_counts[:-1].sum(axis=0)
+
+        s = self.prior_strength
+        # 选项数为 n 时只有前 n 个位置有效
+        valid = np.arange(width)[None, :] < np.arange(width + 1)[:, None]
+        overall = (position[-1] + s) * valid
+        overall /= np.maximum(overall.sum(axis=-1, keepdims=True), 1e-12)
+        position = (position + s * overall) / (position.sum(axis=-1, keepdims=True) + s)
+        overall_rank = (rank_counts[-1] + s) / (rank_counts[-1].sum() + s * width)
+        rank_p = (rank_counts + s * overall_rank) / (rank_counts.sum(axis=-1, keepdims=True) + s)
+
+        logger.debug(
+            f"选择策略统计已更新: {len(pos)} 道已完成题目, {int(ranked.sum())} 道有 AI 排序, "
+            f"AI 首选准确率 {overall_rank[0]:.1%}"
+        )
+        return _Tables(categories, position, rank_p)
+
+    def posterior(self, q: Question) -> _Array:
+        """各选项为正确答案的后验概率，已尝试的选项为 0"""
+        n = len(q.choices)
+        tables = self.tables()
+        row = tables.categories.get(q.category, len(tables.rank) - 1)
+        width = tables.rank.shape[1]
+        if n > width:
+            post = np.ones(n)
+        else:
+            post = tables.position[row, n, :n].copy()
+            if q.ai_ranking:
+                # 不在排序中的选项视为排在末位之后
+                places = np.full(n, min(len(q.ai_ranking), width - 1))
+                for place, i in enumerate(q.ai_ranking[:width]):
+                    if i < n:
+                        places[i] = place
+                post *= tables.rank[row, places]
+        mask = np.zeros(n, dtype=bool)
+        mask[q.get_untried_indices()] = True
+        post = np.where(mask, post, 0.0)
+        total = float(post.sum())
+        if total > 0:
+            return post / total
+        return mask / max(int(mask.sum()), 1)
+
+    def order(self, q: Question) -> List[int]:
+        """未尝试选项按后验从高到低排列，后验相同时保持 AI 排序"""
+        post = self.posterior(q)
+        ranked = q.ranked_untried() or q.get_untried_indices()
+        return sorted(ranked, key=lambda i: -post[i])
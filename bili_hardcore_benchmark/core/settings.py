@@ -1,11 +1,21 @@
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import computed_field
+from pydantic import BaseModel, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class AIEndpoint(BaseModel):
+    """额外的 OpenAI 兼容端点，api_key/answer_format 留空时使用全局配置"""
+
+    base_url: str
+    model: str
+    api_key: str = ""
+    logprobs: bool = True
+    answer_format: Optional[Literal["text", "compact", "json"]] = None
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -13,29 +23,183 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-3.5-turbo"
     openai_api_key: str = ""
     openai_timeout: int = 30
+    # 以首个序号的 logprobs 给选项排序；端点不支持 logprobs 参数时关闭，改用文本中的排序
+    openai_logprobs: bool = True
+    # 输出格式：text 为完整提示词；compact 固定系统提示词（利于前缀缓存）并限制输出长度；
+    # json 进一步以 JSON Schema 约束输出只能是合法选项编号
+    openai_answer_format: Literal["text", "compact", "json"] = "text"
+    openai_max_tokens: Optional[int] = None
+
+    # 多端点对冲：配置额外端点后启用。hedge 在主端点延迟超过分位数时再请求下一个端点，
+    # fanout 同时请求所有端点；均取最先返回的有效答案
+    ai_endpoints: List[AIEndpoint] = []
+    ai_hedge_mode: Literal["hedge", "fanout"] = "hedge"
+    ai_hedge_quantile: float = 0.9
+    ai_hedge_initial_delay: float = 2.0
+
+    # AI 后端：openai 调用 OpenAI 兼容接口；local 在 CPU 上运行本地模型，按对数似然排序
+    ai_backend: Literal["openai", "local"] = "openai"
+    local_model: str = "Qwen/Qwen2.5-0.5B-Instruct"
+    local_batch_size: int = 8
+    local_threads: Optional[int] = None
+
+    # 相似题检索：已完成题目作为 AI 提示词的参考，相似度足够高时直接复用答案
+    retrieval_enabled: bool = True
+    retrieval_top_k: int = 3
+    retrieval_min_similarity: float = 0.3
+    retrieval_answer_threshold: float = 0.9
+
+    # 选项选择策略：ai 按 AI 排序依次尝试；bayes 结合分类的答案位置分布与 AI 在该分类
+    # 的历史准确率计算后验，按后验从高到低尝试（统计量在后台线程中定期重新计算）
+    selection_policy: Literal["ai", "bayes"] = "ai"
+    selection_prior_strength: float = 5.0
+    selection_refresh_interval: float = 300
+
+    # AI 预测缓存：相同模型 + 提示词直接复用历史结果
+    ai_cache_enabled: bool = True
+    ai_cache_max_entries: int = 100000
+    ai_cache_ttl_days: float = 30
 
     max_questions: int = 100
+    accounts: int = 1
+
+    # 流水线预测：与网络往返重叠的投机 AI 请求
+    pipeline_predictions: bool = True
+    prediction_concurrency: int = 4
     safety_threshold: int = 55
+    # 提交后获取结果：与提交至少间隔 result_min_delay 秒；分数未变时再确认
+    # result_confirm_polls 次，避免服务端尚未处理提交时把答对记为答错
+    result_min_delay: float = 0.5
+    result_confirm_polls: int = 1
+    result_confirm_delay: float = 1.0
 
     data_dir: Path = Path("benchmark_data")
     raw_data_file: str = "questions_raw.json"
     benchmark_version: str = "v1"
+    # 增量导出追加的 Arrow 分片数达到上限时整体重写
+    export_max_shards: int = 32
+
+    # 题库存储：json 每次整体重写；wal 追加事件日志并定期压缩为快照；
+    # sqlite 按题目增量写入，统计与导出下推到数据库
+    question_store_backend: Literal["json", "wal", "sqlite"] = "json"
+    sqlite_file: str = "questions.db"
+    wal_compact_every: int = 10000
+    # 写入后是否 fsync，json 与 wal 后端共用；默认只依赖原子替换防止文件损坏
+    wal_fsync: bool = False
+
+    # 延迟写入（需显式开启）：变更由后台线程批量落盘。进程被强制终止时最多丢失
+    # write_behind_max_events 条变更或 write_behind_interval 秒内的变更
+    write_behind: bool = False
+    write_behind_max_events: int = 100
+    write_behind_interval: float = 5.0
+    # 列式内存表示：降低数十万题规模题库的内存占用与加载时间
+    columnar_questions: bool = False
+
+    login_cache_enabled: bool = True
+    login_cache_key: str = ""
+    login_refresh_margin_days: int = 7
 
     log_level: str = "INFO"
     log_file: Optional[Path] = None
 
+    # B站接口地址，可指向本地模拟服务器（python -m bili_hardcore_benchmark.loadtest serve）
+    bilibili_api_base_url: str = "https://api.bilibili.com"
+    bilibili_passport_base_url: str = "https://passport.bilibili.com"
+    bilibili_app_base_url: str = "https://app.bilibili.com"
     bilibili_api_timeout: int = 30
+    bilibili_max_connections: int = 20
+    bilibili_http2: bool = True
+
+    # 请求容错：重试、熔断与超时预算
+    bilibili_retry_times: int = 3
+    bilibili_retry_base_delay: float = 0.5
+    bilibili_retry_max_delay: float = 8.0
+    bilibili_attempt_timeout: float = 10.0
+    bilibili_request_budget: float = 30.0
+    bilibili_retryable_codes: List[int] = [-500, -502, -503, -504]
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    # 会话连续失败（重试用尽、熔断、限流等）的轮次上限，达到后结束会话
+    session_max_failures: int = 10
+
+    # 自适应节流：每个账号的每个接口一个令牌桶（速率单位：请求/秒）
+    pacing_rate: float = 2.0
+    pacing_burst: float = 1.0
+    pacing_min_rate: float = 0.2
+    pacing_max_rate: float = 10.0
+    pacing_increase: float = 0.1
+    pacing_backoff_base: float = 1.0
+    pacing_backoff_max: float = 60.0
+    pacing_throttle_codes: List[int] = [-412, -509, -799]
+
+    # HTTP 录制与回放：record 将 B站接口与 AI 接口的请求/响应写入录制文件；
+    # replay 不访问网络，从录制文件返回响应（cassette_speed 为 0 时不等待）。
+    # 录制开始时的题库、登录凭证与 AI 缓存另存为快照，回放以快照为起点、只在内存中
+    # 更新，不修改真实题库与缓存
+    cassette_mode: Literal["off", "record", "replay"] = "off"
+    cassette_file: str = "cassette.jsonl.gz"
+    cassette_speed: float = 1.0
+    # 请求指纹必须与录制一致；关闭后退回按接口顺序匹配，提交的选项可能与录制时不同
+    cassette_strict: bool = True
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def raw_data_path(self) -> Path:
         return self.data_dir / self.raw_data_file
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def sqlite_path(self) -> Path:
+        return self.data_dir / self.sqlite_file
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def ai_cache_path(self) -> Path:
+        return self.data_dir / "ai_cache.db"
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def cassette_path(self) -> Path:
+        return self.data_dir / self.cassette_file
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def cassette_snapshot_path(self) -> Path:
+        path = self.cassette_path
+        return path.with_name(path.name.split(".", 1)[0] + ".questions.json")
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def cassette_login_cache_dir(self) -> Path:
+        path = self.cassette_path
+        return path.with_name(path.name.split(".", 1)[0] + ".login_cache")
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def cassette_ai_cache_path(self) -> Path:
+        path = self.cassette_path
+        return path.with_name(path.name.split(".", 1)[0] + ".ai_cache.db")
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def login_cache_dir(self) -> Path:
+        return self.data_dir / "login_cache"
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def export_dir(self) -> Path:
         return self.data_dir / f"benchmark_{self.benchmark_version}"
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def export_jsonl_path(self) -> Path:
+        return self.data_dir / f"benchmark_{self.benchmark_version}.jsonl"
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def export_manifest_path(self) -> Path:
+        return self.data_dir / f"benchmark_{self.benchmark_version}.manifest.json"
+
 
 @lru_cache()
 def get_settings() -> Settings:
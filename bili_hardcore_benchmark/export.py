@@ -1,25 +1,56 @@
+"""导出数据集
+
+用法::
+
+    uv run python -m bili_hardcore_benchmark.export [--full]
+
+默认按上次导出的清单增量导出：没有变化时不写入，只有新增题目时追加到
+JSONL 并写成新的 Arrow 分片；已导出题目的内容有变化时整体重写。
+``--full`` 忽略清单，强制整体重写。
+"""
+
+import argparse
+
 from loguru import logger
 
 from .container import Container
+from .core.models import format_stats
+from .core.services.benchmark_service import QuestionQuery
 from .core.settings import get_settings
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="导出 HuggingFace 数据集与 JSONL")
+    parser.add_argument("--full", action="store_true", help="忽略导出清单，整体重写")
+    args = parser.parse_args()
+
     try:
         settings = get_settings()
         container = Container(settings)
-        benchmark = container.benchmark_service.benchmark
+        # 支持下推查询的存储直接在数据库中过滤，不必载入整个题库
+        store = container.question_store
+        source = (
+            store if isinstance(store, QuestionQuery) else container.benchmark_service.benchmark
+        )
 
-        if not benchmark.questions:
+        counts = source.count_by_status()
+        if not sum(counts.values()):
             logger.warning("No data to export")
             return
+        logger.info(format_stats(counts))
 
-        export = container.export_service
-        export.export_huggingface(benchmark, settings.export_dir, settings.benchmark_version, True)
-        export.export_jsonl(
-            benchmark, settings.data_dir / f"benchmark_{settings.benchmark_version}.jsonl"
+        result = container.export_service.export_incremental(
+            source,
+            settings.export_dir,
+            settings.export_jsonl_path,
+            settings.export_manifest_path,
+            settings.benchmark_version,
+            full=args.full,
         )
-        logger.info("Export complete")
+        if result.mode == "unchanged":
+            logger.info(f"Export unchanged ({result.total} questions)")
+        else:
+            logger.info(f"Export complete: {result.mode} {result.written}/{result.total} questions")
     except Exception as e:
         logger.error(e)
 
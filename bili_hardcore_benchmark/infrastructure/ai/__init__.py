@@ -1,6 +1,15 @@
 """AI 服务模块"""
 
+from .cached_provider import CachedAIProvider
+from .hedged_provider import HedgedAIProvider
+from .local_provider import LocalLMProvider
 from .openai_provider import OpenAIProvider
 from .provider import AIProviderBase
 
-__all__ = ["AIProviderBase", "OpenAIProvider"]
+__all__ = [
+    "AIProviderBase",
+    "OpenAIProvider",
+    "CachedAIProvider",
+    "HedgedAIProvider",
+    "LocalLMProvider",
+]
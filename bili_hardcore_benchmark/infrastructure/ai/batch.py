@@ -0,0 +1,67 @@
+"""OpenAI Batch API 的请求导出与结果导入
+
+导出的每行请求以 ``{缓存键}-{选项数}`` 作为 ``custom_id``，导入时据此把解析出的
+选项排序写入 ``CachedAIProvider`` 的预测表，实时答题时即可直接命中缓存。
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from loguru import logger
+
+from .cached_provider import CachedAIProvider
+from .openai_provider import OpenAIProvider
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+
+def write_batch_requests(
+    provider: OpenAIProvider,
+    cache: CachedAIProvider,
+    items: Iterable[Tuple[str, List[str]]],
+    output: Path,
+) -> int:
+    """将 (题干, 选项) 写为 Batch API 输入文件，返回请求数"""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(output, "w", encoding="utf-8") as f:
+        for question, choices in items:
+            request = {
+                "custom_id": f"{cache.key(question, choices)}-{len(choices)}",
+                "method": "POST",
+                "url": CHAT_COMPLETIONS_URL,
+                "body": provider.request_body(question, choices),
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def ingest_batch_results(
+    provider: OpenAIProvider, cache: CachedAIProvider, results: Path
+) -> Tuple[int, int]:
+    """读取 Batch API 输出文件并写入预测表
+
+    Returns:
+        (成功导入数, 失败或无法解析数)
+    """
+    ok = failed = 0
+    with open(results, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key, _, n = record["custom_id"].rpartition("-")
+            response = record.get("response") or {}
+            try:
+                ranking = provider.parse_ranking(response["body"]["choices"][0], int(n))
+            except (KeyError, IndexError, TypeError):
+                ranking = None
+            if response.get("status_code", 200) != 200 or ranking is None:
+                logger.debug(f"批量结果无效 {record['custom_id']}: {record.get('error')}")
+                failed += 1
+                continue
+            cache.put(key, ranking)
+            ok += 1
+    return ok, failed
@@ -0,0 +1,167 @@
+"""带持久化缓存的 AI 提供者
+
+以 ``hash(模型 + 提示词)`` 为键把选项排序存入 SQLite：同一道题在多次会话中
+反复出现、答错后对剩余选项重新预测时，都不再消耗模型调用。缓存按最近使用
+时间淘汰（LRU），条目超过 TTL 后视为失效。
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from .provider import AIProviderBase
+
+# 旧版 predictions 表只缓存首选项，且对应的提示词已不再使用
+_SCHEMA = """
+DROP TABLE IF EXISTS predictions;
+CREATE TABLE IF NOT EXISTS rankings (
+    key TEXT PRIMARY KEY,
+    ranking TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rankings_last_used ON rankings(last_used);
+"""
+
+
+def _is_ranking(ranking: list[int], num_choices: int) -> bool:
+    return sorted(ranking) == list(range(num_choices))
+
+
+class CachedAIProvider(AIProviderBase):
+    """为任意 ``AIProviderBase`` 增加磁盘缓存"""
+
+    def __init__(
+        self,
+        inner: AIProviderBase,
+        db_path: Optional[Path],
+        max_entries: int = 100000,
+        ttl: Optional[float] = 30 * 86400,
+    ):
+        """初始化缓存
+
+        Args:
+            inner: 实际执行预测的提供者
+            db_path: 缓存数据库路径，为 None 时只在内存中缓存（如回放录制文件时）
+            max_entries: 最多保留的条目数，超出时淘汰最久未使用的条目
+            ttl: 条目有效期（秒），为 None 时永不过期
+        """
+        self.inner = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if db_path is None:
+            self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        if ttl is not None:
+            with self.conn:
+                self.conn.execute("DELETE FROM rankings WHERE created_at < ?", (time.time() - ttl,))
+        self._size = int(self.conn.execute("SELECT COUNT(*) FROM rankings").fetchone()[0])
+
+    def backup(self, path: Path) -> None:
+        """将当前缓存完整复制到 ``path``（覆盖已有文件）"""
+        path.unlink(missing_ok=True)
+        dest = sqlite3.connect(path)
+        try:
+            with self._lock:
+                self.conn.backup(dest)
+        finally:
+            dest.close()
+
+    def restore(self, path: Path) -> None:
+        """以 ``path`` 中的缓存替换当前内容（如回放时载入录制开始时的缓存快照）"""
+        with self._lock:
+            src = sqlite3.connect(path)
+            try:
+                src.backup(self.conn)
+            finally:
+                src.close()
+            self._size = int(self.conn.execute("SELECT COUNT(*) FROM rankings").fetchone()[0])
+
+    def cache_key(self, question: str, choices: list[str]) -> str:
+        return self.inner.cache_key(question, choices)
+
+    def key(self, question: str, choices: list[str]) -> str:
+        return hashlib.sha256(self.cache_key(question, choices).encode()).hexdigest()
+
+    def lookup(self, question: str, choices: list[str]) -> Optional[list[int]]:
+        """查询缓存的排序，不调用模型、不计入命中统计"""
+        ranking = self.get(self.key(question, choices))
+        return ranking if ranking is not None and _is_ranking(ranking, len(choices)) else None
+
+    def get(self, key: str) -> Optional[list[int]]:
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT ranking, created_at FROM rankings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            ranking, created_at = row
+            if self.ttl is not None and created_at < now - self.ttl:
+                self.conn.execute("DELETE FROM rankings WHERE key = ?", (key,))
+                self._size -= 1
+                return None
+            self.conn.execute("UPDATE rankings SET last_used = ? WHERE key = ?", (now, key))
+            return [int(i) for i in json.loads(ranking)]
+
+    def put(self, key: str, ranking: list[int]) -> None:
+        now = time.time()
+        with self._lock, self.conn:
+            exists = self.conn.execute("SELECT 1 FROM rankings WHERE key = ?", (key,))
+            if exists.fetchone() is None:
+                self._size += 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO rankings VALUES (?, ?, ?, ?)",
+                (key, json.dumps(ranking), now, now),
+            )
+            if self._size > self.max_entries:
+                # 一次多淘汰 1%，避免每次写入都触发删除
+                excess = self._size - self.max_entries + max(1, self.max_entries // 100)
+                cursor = self.conn.execute(
+                    "DELETE FROM rankings WHERE key IN "
+                    "(SELECT key FROM rankings ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self._size -= cursor.rowcount
+
+    def predict(self, question: str, choices: list[str]) -> int:
+        return self.rank(question, choices)[0]
+
+    def rank(self, question: str, choices: list[str]) -> list[int]:
+        key = self.key(question, choices)
+        ranking = self.get(key)
+        if ranking is not None and _is_ranking(ranking, len(choices)):
+            with self._lock:
+                self.hits += 1
+            logger.debug(f"AI 缓存命中: {question[:30]}...")
+            return ranking
+        with self._lock:
+            self.misses += 1
+        ranking = self.inner.rank(question, choices)
+        self.put(key, ranking)
+        return ranking
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        text = f"AI 缓存: 命中 {self.hits}, 未命中 {self.misses} ({rate:.1f}%), 条目 {self._size}"
+        inner = self.inner.stats()
+        return f"{text}; {inner}" if inner else text
+
+    def close(self) -> None:
+        self.conn.close()
+        self.inner.close()
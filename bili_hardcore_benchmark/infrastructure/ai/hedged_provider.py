@@ -0,0 +1,182 @@
+"""多端点对冲请求
+
+同一提示词可发往多个 OpenAI 兼容端点：``fanout`` 模式同时请求全部端点，
+``hedge`` 模式先请求主端点，超过其延迟分位数仍未返回时再向下一个端点发出
+对冲请求。取第一个可解析的答案，其余请求的结果被丢弃。
+
+主端点按各端点最近的延迟中位数自适应选择。同步 HTTP 请求发出后无法中断，
+落后的请求会在后台线程中完成，其延迟仍计入统计。
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, List, Literal, Optional, Set
+
+from loguru import logger
+
+from ...core.exceptions import QuizError
+from .provider import AIProviderBase
+
+HedgeMode = Literal["hedge", "fanout"]
+
+
+class EndpointStats:
+    """单个端点最近若干次请求的延迟（失败按超时计）"""
+
+    def __init__(self, window: int = 100):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.wins = 0
+        self.failures = 0
+
+    def record(self, latency: float) -> None:
+        self.latencies.append(latency)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def median(self) -> float:
+        # 尚无样本的端点排在最前，保证每个端点都会被尝试
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+
+class HedgedAIProvider(AIProviderBase):
+    """向多个端点发送对冲请求，返回最先得到的有效答案"""
+
+    def __init__(
+        self,
+        endpoints: List[AIProviderBase],
+        mode: HedgeMode = "hedge",
+        quantile: float = 0.9,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.2,
+        timeout: float = 30.0,
+        window: int = 100,
+    ):
+        """初始化对冲提供者
+
+        Args:
+            endpoints: 各端点的提供者，首个端点决定缓存键
+            mode: hedge 延迟对冲；fanout 同时请求所有端点
+            quantile: 主端点延迟超过该分位数时发出对冲请求
+            initial_delay: 端点尚无延迟样本时的对冲等待时间（秒）
+            min_delay: 对冲等待时间下限（秒）
+            timeout: 失败请求计入统计的延迟（秒），同时是对冲等待时间上限
+            window: 每个端点保留的延迟样本数
+        """
+        if not endpoints:
+            raise ValueError("至少需要一个端点")
+        self.endpoints = endpoints
+        self.mode = mode
+        self.quantile = quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.timeout = timeout
+        self._stats = [EndpointStats(window) for _ in endpoints]
+        self._lock = threading.Lock()
+        # 落后的请求仍会占用线程直到完成，线程数需留有余量
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(endpoints) * 8, thread_name_prefix="ai-hedge"
+        )
+
+    def cache_key(self, question: str, choices: list[str]) -> str:
+        return self.endpoints[0].cache_key(question, choices)
+
+    def ranked(self) -> List[int]:
+        """按延迟中位数从低到高排列的端点序号，首个即当前主端点"""
+        with self._lock:
+            return sorted(range(len(self.endpoints)), key=lambda i: self._stats[i].median())
+
+    def hedge_delay(self, i: int) -> float:
+        with self._lock:
+            delay = self._stats[i].quantile(self.quantile)
+        if delay is None:
+            delay = self.initial_delay
+        return min(self.timeout, max(self.min_delay, delay))
+
+    def _call(self, i: int, question: str, choices: list[str]) -> list[int]:
+        start = time.monotonic()
+        try:
+            ranking = self.endpoints[i].rank(question, choices)
+        except Exception:
+            with self._lock:
+                self._stats[i].failures += 1
+                self._stats[i].record(self.timeout)
+            raise
+        with self._lock:
+            self._stats[i].record(time.monotonic() - start)
+        return ranking
+
+    def predict(self, question: str, choices: list[str]) -> int:
+        return self.rank(question, choices)[0]
+
+    def rank(self, question: str, choices: list[str]) -> list[int]:
+        """由最先返回有效结果的端点给出选项排序
+
+        Raises:
+            QuizError: 所有端点均失败或无法解析响应
+        """
+        order = self.ranked()
+        launched: Dict[Future[list[int]], int] = {}
+        pending: Set[Future[list[int]]] = set()
+        error: Optional[BaseException] = None
+
+        def launch() -> None:
+            i = order[len(launched)]
+            future = self._executor.submit(self._call, i, question, choices)
+            launched[future] = i
+            pending.add(future)
+            with self._lock:
+                self._stats[i].requests += 1
+
+        launch()
+        while self.mode == "fanout" and len(launched) < len(order):
+            launch()
+
+        while pending:
+            timeout = None
+            if len(launched) < len(order):
+                timeout = self.hedge_delay(order[len(launched) - 1])
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.debug(
+                    f"AI 端点 {order[len(launched) - 1]} 超过 {timeout:.2f}s，发出对冲请求"
+                )
+                launch()
+                continue
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    i = launched[future]
+                    with self._lock:
+                        self._stats[i].wins += 1
+                    return future.result()
+                error = future.exception()
+                logger.debug(f"AI 端点 {launched[future]} 失败: {error}")
+            # 失败时立即改用下一个端点，无需等待对冲延迟
+            if not pending and len(launched) < len(order):
+                launch()
+
+        if isinstance(error, QuizError):
+            raise error
+        raise QuizError(f"所有 AI 端点均失败: {error}") from error
+
+    def stats(self) -> str:
+        with self._lock:
+            parts = [
+                f"#{i} 请求 {s.requests} 胜出 {s.wins} 失败 {s.failures} "
+                f"p50 {s.median():.2f}s p{int(self.quantile * 100)} "
+                f"{s.quantile(self.quantile) or 0.0:.2f}s"
+                for i, s in enumerate(self._stats)
+            ]
+        return "AI 端点: " + "; ".join(parts)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
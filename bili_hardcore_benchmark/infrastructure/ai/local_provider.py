@@ -0,0 +1,203 @@
+"""本地语言模型提供者
+
+在 CPU 上运行因果语言模型，以“题干 + 选项列表”为前缀、各选项文本为续写，
+按条件对数似然给选项排序，无需网络与 API 费用。
+
+同一时间到达的多个请求（多个答题会话、预标注的并发任务）由后台线程合并为
+一批：先对所有题目的前缀做一次前向计算，再把前缀的 KV 缓存按选项复制，
+所有题目的所有选项续写在第二次前向计算中一起打分，前缀不重复计算。
+
+``torch`` 与 ``transformers`` 仅在首次预测时导入（通过 ``cpu`` 可选依赖或
+``lm_eval[hf]`` 安装）。
+"""
+
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+from loguru import logger
+
+from ...core.exceptions import QuizError
+from .provider import AIProviderBase
+
+_Request = Tuple[str, List[str], "Future[List[int]]"]
+
+
+class LocalLMProvider(AIProviderBase):
+    """以本地模型的对数似然为选项排序"""
+
+    PROMPT_TEMPLATE = "问题：{question}\n选项：\n{options}\n答案："
+
+    def __init__(
+        self,
+        model: str,
+        batch_size: int = 8,
+        batch_wait: float = 0.01,
+        threads: Optional[int] = None,
+        normalize: bool = True,
+    ):
+        """初始化本地提供者
+
+        Args:
+            model: Hugging Face 模型名或本地路径（离线环境使用本地路径）
+            batch_size: 一次前向计算最多包含的题目数
+            batch_wait: 收到第一个请求后等待更多请求凑批的时间（秒）
+            threads: torch 计算线程数，为 None 时使用默认值
+            normalize: 是否按续写 token 数对对数似然取平均，避免偏向短选项
+        """
+        self.model_name = model
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.threads = threads
+        self.normalize = normalize
+        self._model: Any = None
+        self._tokenizer: Any = None
+        # None 为停止后台线程的信号
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def cache_key(self, question: str, choices: list[str]) -> str:
+        return json.dumps(
+            [self.model_name, self.PROMPT_TEMPLATE, self.normalize, question, choices],
+            ensure_ascii=False,
+        )
+
+    def build_prompt(self, question: str, choices: list[str]) -> str:
+        options = "\n".join(f"{i}. {choice}" for i, choice in enumerate(choices, 1))
+        return self.PROMPT_TEMPLATE.format(question=question, options=options)
+
+    def _load(self) -> None:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        logger.info(f"加载本地模型 {self.model_name}...")
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self._model = AutoModelForCausalLM.from_pretrained(self.model_name, dtype=torch.float32)
+        self._model.eval()
+
+    def _encode(self, text: str) -> List[int]:
+        return list(self._tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def score(self, batch: List[Tuple[str, List[str]]]) -> List[List[float]]:
+        """计算一批题目中每个选项的条件对数似然
+
+        Args:
+            batch: (题干, 选项列表) 列表
+
+        Returns:
+            与 ``batch`` 对应的各选项得分
+        """
+        import torch
+
+        if self._model is None:
+            self._load()
+
+        prefixes = [self._encode(self.build_prompt(q, c)) for q, c in batch]
+        # 前缀以“答案：”结尾，选项单独编码不会与前缀末尾的 token 合并
+        conts = [[self._encode(choice) or [0] for choice in c] for _, c in batch]
+        owner = [i for i, c in enumerate(conts) for _ in c]
+        rows = [ids for c in conts for ids in c]
+
+        def pad(seqs: List[List[int]]) -> Tuple[Any, Any]:
+            width = max(len(s) for s in seqs)
+            ids = torch.zeros((len(seqs), width), dtype=torch.long)
+            mask = torch.zeros((len(seqs), width), dtype=torch.long)
+            for r, s in enumerate(seqs):
+                ids[r, : len(s)] = torch.tensor(s)
+                mask[r, : len(s)] = 1
+            return ids, mask
+
+        with torch.inference_mode():
+            # 1. 所有题目的前缀一次前向计算（右侧填充），保留 KV 缓存
+            p_ids, p_mask = pad(prefixes)
+            out = self._model(input_ids=p_ids, attention_mask=p_mask, use_cache=True)
+            lengths = p_mask.sum(dim=1)
+            last = torch.log_softmax(out.logits[torch.arange(len(batch)), lengths - 1], dim=-1)
+
+            # 2. 前缀缓存按选项复制，所有续写一起计算；位置从各自前缀的实际长度开始
+            index = torch.tensor(owner)
+            past = out.past_key_values
+            if hasattr(past, "reorder_cache"):
+                past.reorder_cache(index)
+            else:
+                past = tuple(tuple(t.index_select(0, index) for t in layer) for layer in past)
+            c_ids, c_mask = pad(rows)
+            positions = lengths[index].unsqueeze(1) + torch.arange(c_ids.shape[1])
+            out = self._model(
+                input_ids=c_ids,
+                attention_mask=torch.cat([p_mask[index], c_mask], dim=1),
+                position_ids=positions,
+                past_key_values=past,
+            )
+            # 续写首个 token 由前缀末位的输出预测，其余由续写前一位置预测
+            logits = out.logits[:, :-1]
+            token_logp = logits.gather(-1, c_ids[:, 1:].unsqueeze(-1)).squeeze(-1)
+            token_logp = (token_logp - torch.logsumexp(logits, dim=-1)) * c_mask[:, 1:]
+            totals = last[index, c_ids[:, 0]] + token_logp.sum(dim=1)
+            if self.normalize:
+                totals = totals / c_mask.sum(dim=1)
+
+        scores: List[List[float]] = [[] for _ in batch]
+        for r, total in enumerate(totals.tolist()):
+            scores[owner[r]].append(float(total))
+        return scores
+
+    def _run(self, requests: "queue.Queue[Optional[_Request]]") -> None:
+        stopping = False
+        while not stopping:
+            first = requests.get()
+            if first is None:
+                break
+            batch = [first]
+            try:
+                while len(batch) < self.batch_size:
+                    item = requests.get(timeout=self.batch_wait)
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            pending = [(q, c, f) for q, c, f in batch if f.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            try:
+                scores = self.score([(q, c) for q, c, _ in pending])
+            except Exception as e:
+                logger.error(f"本地模型推理失败: {e}")
+                for _, _, f in pending:
+                    f.set_exception(QuizError(f"本地模型推理失败: {e}"))
+                continue
+            for (_, _, f), s in zip(pending, scores):
+                f.set_result(sorted(range(len(s)), key=lambda i: s[i], reverse=True))
+
+    def rank(self, question: str, choices: list[str]) -> list[int]:
+        """按对数似然从高到低排列选项，与同时到达的其他请求合并计算"""
+        future: "Future[List[int]]" = Future()
+        with self._start_lock:
+            if self._worker is None:
+                # 每个后台线程有自己的队列，停止信号之后不会再有请求排入
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(
+                    target=self._run, args=(self._queue,), name="local-lm", daemon=True
+                )
+                self._worker.start()
+            self._queue.put((question, choices, future))
+        return future.result()
+
+    def predict(self, question: str, choices: list[str]) -> int:
+        return self.rank(question, choices)[0]
+
+    def close(self) -> None:
+        """处理完已排队的请求后停止后台线程；之后的请求会重新启动线程"""
+        with self._start_lock:
+            worker, self._worker = self._worker, None
+            if worker is None:
+                return
+            self._queue.put(None)
+        worker.join()
@@ -3,32 +3,89 @@
 使用 OpenAI API（或兼容接口）进行答题预测。
 """
 
+import json
+import re
+from typing import Any, Dict, List, Literal, Optional
+
+import httpx
 from loguru import logger
 from openai import OpenAI
 
 from ...core.exceptions import QuizError
-from .provider import AIProviderBase
+from .provider import AIProviderBase, ReferenceSource
+
+_NUMBER = re.compile(r"\d+")
+# 只由编号组成的排序（提示词要求的格式，如 3,1,2,4）
+_RANKING_LIST = re.compile(r"\d+(?:\s*[,，、]\s*\d+)*[。.]?")
+
+AnswerFormat = Literal["text", "compact", "json"]
+
+
+def _ranking_schema(num_choices: int) -> Dict[str, Any]:
+    """只允许输出合法选项编号（1-based）的 JSON Schema 结构化输出格式"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "ranking",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "ranking": {
+                        "type": "array",
+                        "items": {"type": "integer", "enum": list(range(1, num_choices + 1))},
+                    }
+                },
+                "required": ["ranking"],
+                "additionalProperties": False,
+            },
+        },
+    }
 
 
 class OpenAIProvider(AIProviderBase):
     """OpenAI API 提供者"""
 
-    # 提示词模板
+    # 提示词模板：要求给出完整排序，答错后无需再次调用模型
     PROMPT_TEMPLATE = """你是一个高效精准的答题专家，面对选择题时，直接根据问题和选项判断正确答案，
-并返回对应选项的序号（1, 2, 3, 4）。
+并按正确的可能性从高到低返回所有选项的序号，用逗号分隔。
 
 示例：
 问题：大的反义词是什么？
 选项：['长', '宽', '小', '热']
-回答：3
-
-如果不确定正确答案，选择最接近的选项序号返回，不提供额外解释或超出 1-4 的内容。
+回答：3,1,2,4
 
+第一个序号即你认为的正确答案。不确定时也要给出完整排序，不提供额外解释。
+{references}
 ---
 请回答我的问题：{question}
 """
 
-    def __init__(self, base_url: str, api_key: str, model: str, timeout: int = 30):
+    # 精简模式：指令全部放在不含题目内容的系统提示词中，所有请求共享同一前缀，
+    # 可命中端点的提示词缓存；用户消息只有题干与编号选项
+    SYSTEM_PROMPT = (
+        "你是答题专家。用户给出一道选择题，选项已编号。"
+        "按正确的可能性从高到低给出全部选项编号，第一个即答案。不要解释。"
+    )
+    FORMAT_INSTRUCTIONS = {
+        "compact": "只输出以逗号分隔的编号，例如：3,1,2,4",
+        "json": '只输出 JSON，例如：{"ranking": [3, 1, 2, 4]}',
+    }
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        timeout: int = 30,
+        logprobs: bool = True,
+        answer_format: AnswerFormat = "text",
+        max_tokens: Optional[int] = None,
+        references: Optional[ReferenceSource] = None,
+        reference_k: int = 3,
+        reference_min_similarity: float = 0.3,
+        http_client: Optional[httpx.Client] = None,
+    ):
         """初始化 OpenAI 提供者
 
         Args:
@@ -36,58 +93,205 @@ class OpenAIProvider(AIProviderBase):
             api_key: API key
             model: 模型名称
             timeout: 超时时间（秒）
+            logprobs: 是否请求 logprobs，以首个序号的概率分布排序（端点不支持时应关闭）
+            answer_format: text 为完整的自然语言提示词；compact 使用固定系统提示词、
+                限制输出 token 数并在换行处停止；json 在 compact 基础上以 JSON Schema
+                约束输出只能是合法的选项编号
+            max_tokens: compact/json 模式的输出 token 上限，默认按选项数估算
+            references: 相近已完成题目的来源，检索结果作为参考加入提示词
+            reference_k: 最多加入的参考题目数
+            reference_min_similarity: 参考题目的最低相似度
+            http_client: 自定义 HTTP 客户端（如录制/回放请求）
         """
-        self.client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout)
+        extra: Dict[str, Any] = {}
+        if http_client is not None:
+            extra["http_client"] = http_client
+        self.client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout, **extra)
         self.model = model
         self.timeout = timeout
+        self.logprobs = logprobs
+        self.answer_format = answer_format
+        self.max_tokens = max_tokens
+        self.references = references
+        self.reference_k = reference_k
+        self.reference_min_similarity = reference_min_similarity
+
+    def reference_block(self, question: str) -> str:
+        """相近已完成题目及其答案组成的参考段落，没有时为空字符串"""
+        if self.references is None:
+            return ""
+        refs = [
+            f"题目：{text}\n答案：{answer}"
+            for text, answer, sim in self.references.references(question, self.reference_k)
+            if sim >= self.reference_min_similarity
+        ]
+        if not refs:
+            return ""
+        return "\n参考（已确认答案的相似题目）：\n" + "\n".join(refs) + "\n"
+
+    def build_prompt(
+        self, question: str, choices: list[str], references: Optional[str] = None
+    ) -> str:
+        # 格式化选项
+        options_text = ", ".join([f"{i}. {choice}" for i, choice in enumerate(choices, 1)])
+        formatted_question = f"题目: {question}\n选项: {options_text}"
+
+        # 构造完整提示词
+        if references is None:
+            references = self.reference_block(question)
+        return self.PROMPT_TEMPLATE.format(question=formatted_question, references=references)
+
+    def messages(
+        self, question: str, choices: list[str], references: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """请求消息
+
+        Args:
+            question: 题目内容
+            choices: 选项列表
+            references: 参考段落，为 None 时检索相近的已完成题目生成
+        """
+        if references is None:
+            references = self.reference_block(question)
+        if self.answer_format == "text":
+            return [{"role": "user", "content": self.build_prompt(question, choices, references)}]
+        system = f"{self.SYSTEM_PROMPT}\n{self.FORMAT_INSTRUCTIONS[self.answer_format]}"
+        options = "\n".join(f"{i}. {choice}" for i, choice in enumerate(choices, 1))
+        # 参考内容随题目变化，放在用户消息中，系统提示词保持不变
+        references = references.lstrip("\n")
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"{references}{question}\n{options}"},
+        ]
+
+    def request_body(
+        self, question: str, choices: list[str], references: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Chat Completions 请求体（实时调用与 Batch API 共用）
+
+        Args:
+            question: 题目内容
+            choices: 选项列表
+            references: 参考段落，为 None 时检索相近的已完成题目生成
+        """
+        n = len(choices)
+        body: Dict[str, Any] = {
+            "model": self.model,
+            "messages": self.messages(question, choices, references),
+        }
+        if self.answer_format == "compact":
+            # 每个编号与逗号各约一个 token
+            body.update(max_tokens=self.max_tokens or 2 * n + 4, stop=["\n"])
+        elif self.answer_format == "json":
+            body.update(
+                max_tokens=self.max_tokens or 2 * n + 16, response_format=_ranking_schema(n)
+            )
+        if self.logprobs:
+            # 首个序号位置上的候选需覆盖所有选项，另留少量余量给非数字 token
+            body.update(logprobs=True, top_logprobs=min(20, n + 2))
+        return body
+
+    def cache_key(self, question: str, choices: list[str]) -> str:
+        # 请求体决定了模型输出，提示词、输出格式或参数变化后缓存自动失效。
+        # 参考段落随题库增长而变化，不计入键值（否则预标注与缓存几乎总是未命中），
+        # 只记录检索配置；计算键值时也无需再检索一次
+        body = self.request_body(question, choices, references="")
+        if self.references is not None:
+            body["references"] = [self.reference_k, self.reference_min_similarity]
+        return json.dumps(body, ensure_ascii=False, sort_keys=True)
+
+    def _choice_index(self, token: str, num_choices: int) -> Optional[int]:
+        token = token.strip()
+        if token.isdigit() and 1 <= int(token) <= num_choices:
+            return int(token) - 1
+        return None
+
+    def parse_ranking(self, choice: Dict[str, Any], num_choices: int) -> Optional[List[int]]:
+        """从 Chat Completions 的一个 choice（字典形式）中解析选项排序
+
+        compact/json 格式或按要求只输出编号列表时，直接使用文本中的排序；
+        text 格式下模型常以自然语言作答，先出现的编号未必是答案（如
+        “选项1不对，正确答案是3”），此时以 ``_parse_answer`` 解析出的答案为首选，
+        其余编号按出现顺序补全。有 logprobs 且首个编号即首选答案时，按该位置上
+        各选项的概率排序，其余位置以文本中的排序补全。
+
+        Returns:
+            选项索引（0-based）的完整排列，无法解析时返回 None
+        """
+        content = (choice.get("message") or {}).get("content") or ""
+        numbers = [
+            i
+            for n in _NUMBER.findall(content)
+            if (i := self._choice_index(n, num_choices)) is not None
+        ]
+        if numbers and (self.answer_format != "text" or _RANKING_LIST.fullmatch(content.strip())):
+            ranked = numbers
+        else:
+            answer = self._parse_answer(content, num_choices)
+            ranked = numbers if answer is None else [answer, *numbers]
+
+        tokens = (choice.get("logprobs") or {}).get("content") or []
+        for token in tokens:
+            first = self._choice_index(token["token"], num_choices)
+            if first is None:
+                continue
+            if ranked[:1] != [first]:
+                # 首个编号不是答案（如被否定的选项），其概率分布不代表答案的分布
+                break
+            candidates = sorted(
+                token.get("top_logprobs") or [], key=lambda t: t["logprob"], reverse=True
+            )
+            by_prob = [
+                i
+                for t in candidates
+                if (i := self._choice_index(t["token"], num_choices)) is not None
+            ]
+            if len(by_prob) > 1:
+                ranked = by_prob + ranked
+            break
+
+        return self._complete_ranking(ranked, num_choices) if ranked else None
 
     def predict(self, question: str, choices: list[str]) -> int:
-        """预测答案
+        return self.rank(question, choices)[0]
+
+    def rank(self, question: str, choices: list[str]) -> list[int]:
+        """一次调用得到所有选项的排序
 
         Args:
             question: 题目内容
             choices: 选项列表
 
         Returns:
-            预测的答案索引（0-based）
+            选项索引（0-based）按可能性从高到低的排列
 
         Raises:
             QuizError: 如果 API 调用失败或响应无效
         """
-        # 格式化选项
-        options_text = ", ".join([f"{i}. {choice}" for i, choice in enumerate(choices, 1)])
-        formatted_question = f"题目: {question}\n选项: {options_text}"
-
-        # 构造完整提示词
-        prompt = self.PROMPT_TEMPLATE.format(question=formatted_question)
-
         try:
             logger.debug(f"调用 AI 预测: {question[:50]}...")
 
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                timeout=self.timeout,
+                **self.request_body(question, choices), timeout=self.timeout
             )
 
-            ai_response = response.choices[0].message.content
+            choice = response.choices[0].model_dump()
+            ai_response = choice["message"]["content"]
             if ai_response is None:
                 raise QuizError("AI 返回了空响应")
+            logger.debug(f"AI 响应: {ai_response.strip()}")
 
-            ai_response = ai_response.strip()
-            logger.debug(f"AI 响应: {ai_response}")
-
-            # 解析答案
-            answer_idx = self._parse_answer(ai_response, len(choices))
+            # 解析排序
+            ranking = self.parse_ranking(choice, len(choices))
 
-            if answer_idx is None:
+            if ranking is None:
                 raise QuizError(
                     f"无法从 AI 响应中提取有效答案: {ai_response}",
                     details={"response": ai_response},
                 )
 
-            logger.debug(f"AI 预测答案索引: {answer_idx}")
-            return answer_idx
+            logger.debug(f"AI 预测排序: {ranking}")
+            return ranking
 
         except Exception as e:
             if isinstance(e, QuizError):
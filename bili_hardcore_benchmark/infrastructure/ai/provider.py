@@ -3,8 +3,28 @@
 定义 AI 提供者的接口和通用逻辑。
 """
 
+import json
+import re
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Protocol, Tuple
+
+# 答案解析用的正则在导入时编译一次
+_ANSWER_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:回答|答案|选项|选择|index|result)\s*(?:[:：]|是|为)\s*(\d+)",
+        r"正确答案是[:：]?\s*(\d+)",
+        r"应该选[:：]?\s*(\d+)",
+        r"(\d+)\s*是正确答案",
+    )
+]
+_NUMBER = re.compile(r"\d+")
+
+
+class ReferenceSource(Protocol):
+    """相近已完成题目的来源，返回 (题干, 正确选项文本, 相似度)"""
+
+    def references(self, question: str, k: int) -> List[Tuple[str, str, float]]: ...
 
 
 class AIProviderBase(ABC):
@@ -26,6 +46,37 @@ class AIProviderBase(ABC):
         """
         pass
 
+    def rank(self, question: str, choices: list[str]) -> list[int]:
+        """一次调用给出所有选项按可能性从高到低的排序
+
+        默认实现只有首选项来自模型，其余按原顺序排列；能给出完整排序的
+        提供者应覆盖此方法。
+
+        Returns:
+            选项索引（0-based）的排列
+        """
+        return self._complete_ranking([self.predict(question, choices)], len(choices))
+
+    def cache_key(self, question: str, choices: list[str]) -> str:
+        """返回决定预测结果的全部输入，供缓存计算键值
+
+        子类应包含模型名与实际发送的提示词，使更换模型或提示词后缓存自动失效。
+        """
+        return json.dumps([type(self).__name__, question, choices], ensure_ascii=False)
+
+    def stats(self) -> Optional[str]:
+        """运行统计（如缓存命中率），没有时返回 None"""
+        return None
+
+    def close(self) -> None:
+        """释放连接、线程等资源"""
+
+    @staticmethod
+    def _complete_ranking(ranked: list[int], num_choices: int) -> list[int]:
+        """去重并补全未出现的选项（按原顺序），得到完整排列"""
+        ranked = list(dict.fromkeys(i for i in ranked if 0 <= i < num_choices))
+        return ranked + [i for i in range(num_choices) if i not in ranked]
+
     def _parse_answer(self, response: str, num_choices: int) -> Optional[int]:
         """解析 AI 响应，提取答案索引
 
@@ -36,19 +87,11 @@ class AIProviderBase(ABC):
         Returns:
             答案索引（0-based），如果解析失败返回 None
         """
-        import re
-
         response = response.strip()
 
         # 1. 尝试匹配常见的答案格式（优先级最高）
-        patterns = [
-            r"(?:回答|答案|选项|选择|index|result)[:：]\s*(\d+)",
-            r"正确答案是[:：]?\s*(\d+)",
-            r"应该选[:：]?\s*(\d+)",
-            r"(\d+)\s*是正确答案",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, response, re.IGNORECASE)
+        for pattern in _ANSWER_PATTERNS:
+            match = pattern.search(response)
             if match:
                 try:
                     answer = int(match.group(1))
@@ -75,7 +118,7 @@ class AIProviderBase(ABC):
             pass
 
         # 3. 尝试从文本中提取数字，从后往前找（通常结论在最后）
-        numbers = re.findall(r"\d+", response)
+        numbers = _NUMBER.findall(response)
         if numbers:
             for num_str in reversed(numbers):
                 try:
@@ -1,13 +1,25 @@
 """B站 API 客户端模块"""
 
-from .auth import BilibiliAuthClient
-from .client import BilibiliClient
-from .senior import BilibiliSeniorClient
-from .user import BilibiliUserClient
+from .auth import AsyncBilibiliAuthClient, BilibiliAuthClient
+from .client import AsyncBilibiliClient, BilibiliClient, create_async_http_client
+from .pacing import AdaptivePacer, TokenBucket
+from .resilience import CircuitBreaker, RequestGuard, RetryPolicy
+from .senior import AsyncBilibiliSeniorClient, BilibiliSeniorClient
+from .user import AsyncBilibiliUserClient, BilibiliUserClient
 
 __all__ = [
     "BilibiliClient",
     "BilibiliAuthClient",
     "BilibiliUserClient",
     "BilibiliSeniorClient",
+    "AsyncBilibiliClient",
+    "AsyncBilibiliAuthClient",
+    "AsyncBilibiliSeniorClient",
+    "AsyncBilibiliUserClient",
+    "create_async_http_client",
+    "AdaptivePacer",
+    "TokenBucket",
+    "RequestGuard",
+    "RetryPolicy",
+    "CircuitBreaker",
 ]
@@ -1,18 +1,39 @@
-from ...core.models import LoginData, QRCodeData
-from .client import BilibiliClient
+from typing import Any, Dict
+
+from ...core.models import LoginData, QRCodeData, RefreshData
+from .client import AsyncBilibiliClient, BilibiliClient
+
+PASSPORT_BASE_URL = "https://passport.bilibili.com"
+QRCODE_URL = "/x/passport-tv-login/qrcode/auth_code"
+POLL_URL = "/x/passport-tv-login/qrcode/poll"
+REFRESH_URL = "/x/passport-login/oauth2/refresh_token"
+
+
+def _refresh_params(login: LoginData) -> Dict[str, Any]:
+    return {"access_key": login.access_token, "refresh_token": login.refresh_token, "local_id": 0}
 
 
 class BilibiliAuthClient(BilibiliClient):
+    BASE_URL = PASSPORT_BASE_URL
+
     def get_qrcode(self) -> QRCodeData:
-        return self.post(
-            "https://passport.bilibili.com/x/passport-tv-login/qrcode/auth_code",
-            QRCodeData,
-            {"local_id": 0},
-        )
+        return self.post(QRCODE_URL, QRCodeData, {"local_id": 0})
 
     def poll_qrcode(self, auth_code: str) -> LoginData:
-        return self.post(
-            "https://passport.bilibili.com/x/passport-tv-login/qrcode/poll",
-            LoginData,
-            {"auth_code": auth_code, "local_id": 0},
-        )
+        return self.post(POLL_URL, LoginData, {"auth_code": auth_code, "local_id": 0})
+
+    def refresh_token(self, login: LoginData) -> LoginData:
+        return self.post(REFRESH_URL, RefreshData, _refresh_params(login)).to_login()
+
+
+class AsyncBilibiliAuthClient(AsyncBilibiliClient):
+    BASE_URL = PASSPORT_BASE_URL
+
+    async def get_qrcode(self) -> QRCodeData:
+        return await self.post(QRCODE_URL, QRCodeData, {"local_id": 0})
+
+    async def poll_qrcode(self, auth_code: str) -> LoginData:
+        return await self.post(POLL_URL, LoginData, {"auth_code": auth_code, "local_id": 0})
+
+    async def refresh_token(self, login: LoginData) -> LoginData:
+        return (await self.post(REFRESH_URL, RefreshData, _refresh_params(login))).to_login()
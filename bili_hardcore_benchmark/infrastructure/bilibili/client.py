@@ -1,23 +1,65 @@
 """B站 API 客户端基类
 
-使用 httpx 实现，提供统一的请求处理、错误处理和重试逻辑。
+使用 httpx 实现，提供统一的请求处理、错误处理和重试逻辑（见 ``resilience``）。
+同步客户端每个实例持有独立的 ``httpx.Client``；异步客户端共享同一个
+连接池化的 ``httpx.AsyncClient``（keep-alive + HTTP/2），由调用方负责关闭。
+
+各接口以路径表示，与客户端的 ``base_url`` 拼接成完整地址；``base_url``
+默认为 B站的正式域名，可指向本地模拟服务器（``mock_server``）。
 """
 
+import asyncio
 import hashlib
 import time
 import urllib.parse
-from typing import Any, Dict, Optional, Type, TypeVar
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
 
 import httpx
-from pydantic import TypeAdapter
+from loguru import logger
 
 from ...core.exceptions import APIError
-from ...core.models import BiliResponse
+from .decoding import decode_response
+from .pacing import AdaptivePacer
+from .resilience import RequestGuard
 
 T = TypeVar("T")
 
 
-class BilibiliClient:
+def create_async_http_client(
+    timeout: int = 30,
+    max_connections: int = 20,
+    http2: bool = True,
+    wrap_transport: Optional[Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]] = None,
+) -> httpx.AsyncClient:
+    """创建供所有异步 B站客户端共享的连接池
+
+    Args:
+        timeout: 请求超时时间（秒）
+        max_connections: 连接池最大连接数
+        http2: 是否启用 HTTP/2（需要安装 h2）
+        wrap_transport: 包装连接池传输层的函数（如压测时统计各接口延迟）
+
+    Returns:
+        配置好连接池与 keep-alive 的 ``httpx.AsyncClient``
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=30,
+    )
+    # 显式指定传输层会停用环境变量中的代理设置，只在需要包装时才指定
+    extra: Dict[str, Any] = {}
+    if wrap_transport is not None:
+        extra["transport"] = wrap_transport(httpx.AsyncHTTPTransport(limits=limits, http2=http2))
+    return httpx.AsyncClient(
+        timeout=timeout, headers=BilibiliClientBase.HEADERS, limits=limits, http2=http2, **extra
+    )
+
+
+class BilibiliClientBase:
+    """同步/异步客户端共享的签名与响应解析逻辑"""
+
+    BASE_URL = "https://api.bilibili.com"
     APPKEY = "783bbb7264451d82"
     APPSEC = "2653583c8873dea268ab9386918b1d65"
     HEADERS = {
@@ -25,34 +67,144 @@ class BilibiliClient:
         "Content-Type": "application/x-www-form-urlencoded",
     }
 
-    def __init__(self, timeout: int = 30):
-        self.client = httpx.Client(timeout=timeout, headers=self.HEADERS)
-
     def _app_sign(self, params: Dict[str, Any]) -> Dict[str, Any]:
         params = {**params, "ts": str(int(time.time())), "appkey": self.APPKEY}
         query = urllib.parse.urlencode(dict(sorted(params.items())))
         params["sign"] = hashlib.md5((query + self.APPSEC).encode()).hexdigest()
         return params
 
+    def _parse_response(self, resp: httpx.Response, model: Type[T]) -> T:
+        result = decode_response(resp.content, model)
+        if not result.is_success:
+            raise APIError(result.message, result.code)
+        if result.data is None:
+            return {}  # type: ignore
+        return result.data
+
+
+class BilibiliClient(BilibiliClientBase):
+    def __init__(
+        self,
+        timeout: int = 30,
+        guard: Optional[RequestGuard] = None,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.client = httpx.Client(timeout=timeout, headers=self.HEADERS, transport=transport)
+        self.guard = guard
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+
+    def _send(
+        self, method: str, url: str, model: Type[T], params: Optional[Dict[str, Any]], **kwargs: Any
+    ) -> T:
+        resp = self.client.request(method, url, params=self._app_sign(params or {}), **kwargs)
+        return self._parse_response(resp, model)
+
     def _request(
         self,
         method: str,
         url: str,
         model: Type[T],
         params: Optional[Dict[str, Any]] = None,
+        idempotent: bool = True,
         **kwargs: Any,
     ) -> T:
-        resp = self.client.request(method, url, params=self._app_sign(params or {}), **kwargs)
-        adapter: TypeAdapter[BiliResponse[T]] = TypeAdapter(BiliResponse[model])  # type: ignore
-        result = adapter.validate_python(resp.json())
-        if not result.is_success:
-            raise APIError(result.message, result.code)
-        if result.data is None:
-            return {}  # type: ignore
-        return result.data
+        if self.guard is None:
+            return self._send(method, url, model, params, **kwargs)
 
-    def get(self, url: str, model: Type[T], params: Optional[Dict[str, Any]] = None) -> T:
-        return self._request("GET", url, model, params)
+        endpoint = urllib.parse.urlsplit(url).path
+        deadline, attempt = self.guard.deadline(), 0
+        while True:
+            timeout = self.guard.before_attempt(endpoint, deadline)
+            attempt += 1
+            try:
+                data = self._send(method, url, model, params, timeout=timeout, **kwargs)
+            except Exception as e:
+                delay = self.guard.on_failure(endpoint, e, attempt, deadline, idempotent)
+                logger.warning(f"{endpoint} 第 {attempt} 次请求失败: {e}，{delay:.2f}s 后重试")
+                time.sleep(delay)
+                continue
+            self.guard.on_success(endpoint)
+            return data
 
-    def post(self, url: str, model: Type[T], params: Optional[Dict[str, Any]] = None) -> T:
-        return self._request("POST", url, model, params)
+    def get(self, path: str, model: Type[T], params: Optional[Dict[str, Any]] = None) -> T:
+        return self._request("GET", self.base_url + path, model, params)
+
+    def post(
+        self,
+        path: str,
+        model: Type[T],
+        params: Optional[Dict[str, Any]] = None,
+        idempotent: bool = True,
+    ) -> T:
+        return self._request("POST", self.base_url + path, model, params, idempotent)
+
+
+class AsyncBilibiliClient(BilibiliClientBase):
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        pacer: Optional[AdaptivePacer] = None,
+        guard: Optional[RequestGuard] = None,
+        base_url: Optional[str] = None,
+    ):
+        self.client = http
+        self.pacer = pacer
+        self.guard = guard
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+
+    async def _send(
+        self, method: str, url: str, model: Type[T], params: Optional[Dict[str, Any]], **kwargs: Any
+    ) -> T:
+        endpoint = urllib.parse.urlsplit(url).path
+        if self.pacer:
+            await self.pacer.acquire(endpoint)
+        resp = await self.client.request(method, url, params=self._app_sign(params or {}), **kwargs)
+        try:
+            data = self._parse_response(resp, model)
+        except APIError as e:
+            if self.pacer:
+                self.pacer.report(endpoint, e.code)
+            raise
+        if self.pacer:
+            self.pacer.report(endpoint, 0)
+        return data
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        model: Type[T],
+        params: Optional[Dict[str, Any]] = None,
+        idempotent: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        if self.guard is None:
+            return await self._send(method, url, model, params, **kwargs)
+
+        endpoint = urllib.parse.urlsplit(url).path
+        deadline, attempt = self.guard.deadline(), 0
+        while True:
+            timeout = self.guard.before_attempt(endpoint, deadline)
+            attempt += 1
+            try:
+                data = await self._send(method, url, model, params, timeout=timeout, **kwargs)
+            except Exception as e:
+                delay = self.guard.on_failure(endpoint, e, attempt, deadline, idempotent)
+                logger.warning(f"{endpoint} 第 {attempt} 次请求失败: {e}，{delay:.2f}s 后重试")
+                await asyncio.sleep(delay)
+                continue
+            self.guard.on_success(endpoint)
+            return data
+
+    async def get(self, path: str, model: Type[T], params: Optional[Dict[str, Any]] = None) -> T:
+        return await self._request("GET", self.base_url + path, model, params)
+
+    async def post(
+        self,
+        path: str,
+        model: Type[T],
+        params: Optional[Dict[str, Any]] = None,
+        idempotent: bool = True,
+    ) -> T:
+        return await self._request("POST", self.base_url + path, model, params, idempotent)
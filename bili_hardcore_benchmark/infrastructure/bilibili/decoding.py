@@ -0,0 +1,41 @@
+"""响应解码
+
+每个响应模型的 ``TypeAdapter`` 只构建一次并缓存；响应体直接以字节交给
+pydantic-core 的 JSON 解析器校验（``validate_json``），不再先 ``json.loads``
+再 ``validate_python`` 解码两遍。
+"""
+
+import json
+from typing import Any, Dict, Type, TypeVar, cast
+
+from pydantic import TypeAdapter, ValidationError
+
+from ...core.models import BiliResponse
+
+T = TypeVar("T")
+
+_adapters: Dict[Any, TypeAdapter[Any]] = {}
+
+
+def response_adapter(model: Any) -> TypeAdapter[Any]:
+    """返回 ``BiliResponse[model]`` 的缓存 TypeAdapter"""
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(BiliResponse[model])
+    return adapter
+
+
+def decode_response(content: bytes, model: Type[T]) -> BiliResponse[T]:
+    """将响应体解码为 ``BiliResponse[model]``
+
+    Raises:
+        json.JSONDecodeError: 响应体不是合法 JSON（如网关错误页），视为瞬时故障
+        ValidationError: JSON 合法但结构不符合模型
+    """
+    try:
+        return cast(BiliResponse[T], response_adapter(model).validate_json(content))
+    except ValidationError as e:
+        if e.errors()[0]["type"] == "json_invalid":
+            doc = content[:200].decode("utf-8", errors="replace")
+            raise json.JSONDecodeError(str(e.errors()[0]["msg"]), doc, 0) from e
+        raise
@@ -0,0 +1,329 @@
+"""B站硬核会员答题接口的本地模拟服务器
+
+实现答题（``question``、``answer/submit``、``answer/result``）与 TV 扫码
+登录接口，以及供 ``OpenAIProvider`` 使用的 ``/v1/chat/completions``，
+用于在没有真实账号的情况下测量吞吐量。可配置延迟、错误率与限流：
+
+- 每个请求在基础延迟上叠加指数分布的抖动，模拟长尾；
+- 按 ``error_rate`` 随机返回 -500 错误码或 502 网关错误页；
+- 每个账号的每个接口一个令牌桶，超过 ``throttle_rate`` 时返回 -412。
+
+题库为合成数据：每个账号一场答题 ``quiz_length`` 题，答对加 1 分，
+分数计入题目所属分类；模拟 AI 以 ``ai_accuracy`` 的概率把正确选项排在首位。
+"""
+
+import hashlib
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .auth import POLL_URL, QRCODE_URL
+from .senior import QUESTION_URL, RESULT_URL, SUBMIT_URL
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+# 扫码尚未确认
+QR_NOT_CONFIRMED = 86090
+QUIZ_FINISHED = 41099
+
+_QUESTION_ID = re.compile(r"模拟题 (\d+)")
+
+
+@dataclass
+class MockConfig:
+    """模拟服务器配置
+
+    Attributes:
+        latency: B站接口的基础延迟（秒）
+        jitter: 延迟抖动的均值（秒，指数分布）
+        error_rate: 随机失败的概率
+        throttle_rate: 每个账号每个接口的限流速率（请求/秒），为 None 时不限流
+        throttle_burst: 限流令牌桶容量
+        ai_latency: 模拟 AI 接口的延迟（秒）
+        ai_accuracy: 模拟 AI 把正确选项排在首位的概率
+        questions: 合成题库的题目数
+        quiz_length: 每场答题的题目数
+        login_polls: 扫码后第几次轮询时确认登录
+        categories: 题目分类
+        seed: 合成题库的随机种子
+    """
+
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    throttle_rate: Optional[float] = None
+    throttle_burst: float = 2.0
+    ai_latency: float = 0.2
+    ai_accuracy: float = 0.6
+    questions: int = 5000
+    quiz_length: int = 100
+    login_polls: int = 1
+    categories: List[str] = field(
+        default_factory=lambda: ["动画", "游戏", "鬼畜", "知识", "文史", "影视", "音乐", "体育"]
+    )
+    seed: int = 0
+
+
+@dataclass
+class _MockQuestion:
+    id: int
+    question: str
+    choices: List[str]
+    correct: int
+    category: str
+
+    def ans_hash(self, i: int) -> str:
+        return hashlib.md5(f"{self.id}:{i}".encode()).hexdigest()[:16]
+
+
+@dataclass
+class _Account:
+    csrf: str
+    queue: List[int]
+    answered: int = 0
+    scores: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def score(self) -> int:
+        return sum(self.scores.values())
+
+
+class MockBilibili:
+    """模拟接口的状态与处理逻辑，与 HTTP 层无关"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+        self.questions = [
+            _MockQuestion(
+                id=100000 + i,
+                question=f"模拟题 {100000 + i}：以下哪一项正确？",
+                choices=[f"{100000 + i} 号题的选项 {c}" for c in "ABCD"],
+                correct=rng.randrange(4),
+                category=rng.choice(config.categories),
+            )
+            for i in range(config.questions)
+        ]
+        self.by_id = {q.id: q for q in self.questions}
+        self.accounts: Dict[str, _Account] = {}
+        self._codes: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._ids = itertools.count(1)
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+    def _ok(self, data: Any) -> Dict[str, Any]:
+        return {"code": 0, "message": "0", "ttl": 1, "data": data}
+
+    def _error(self, code: int, message: str) -> Dict[str, Any]:
+        return {"code": code, "message": message, "ttl": 1, "data": None}
+
+    def _throttled(self, account: str, path: str) -> bool:
+        rate = self.config.throttle_rate
+        if rate is None:
+            return False
+        now = time.monotonic()
+        burst = self.config.throttle_burst
+        tokens, updated = self._buckets.get((account, path), (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        throttled = tokens < 1
+        self._buckets[account, path] = (tokens if throttled else tokens - 1, now)
+        return throttled
+
+    def handle(self, path: str, params: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        """处理一个请求
+
+        Returns:
+            (HTTP 状态码, 响应体)；响应体为字典时以 JSON 返回，为字符串时原样返回
+        """
+        if path == CHAT_COMPLETIONS_URL:
+            time.sleep(self.config.ai_latency)
+            return 200, self._chat(json.loads(body or b"{}"))
+
+        delay = self.config.latency
+        if self.config.jitter > 0:
+            delay += self._rng.expovariate(1 / self.config.jitter)
+        time.sleep(delay)
+        if self._rng.random() < self.config.error_rate:
+            if self._rng.random() < 0.5:
+                return 502, "<html><body>502 Bad Gateway</body></html>"
+            return 200, self._error(-500, "服务器错误")
+
+        with self._lock:
+            if self._throttled(params.get("access_key", ""), path):
+                return 200, self._error(-412, "请求被拦截")
+            if path == QRCODE_URL:
+                return 200, self._qrcode()
+            if path == POLL_URL:
+                return 200, self._poll(params.get("auth_code", ""))
+            if path not in (QUESTION_URL, SUBMIT_URL, RESULT_URL):
+                return 404, self._error(-404, "啥都木有")
+            account = self.accounts.get(params.get("access_key", ""))
+            if account is None or (path == SUBMIT_URL and params.get("csrf") != account.csrf):
+                return 200, self._error(-101, "账号未登录")
+            if path == QUESTION_URL:
+                return 200, self._question(account)
+            if path == SUBMIT_URL:
+                return 200, self._submit(account, params)
+            return 200, self._ok(self._result(account))
+
+    def _qrcode(self) -> Dict[str, Any]:
+        code = f"mock{next(self._ids):08d}"
+        self._codes[code] = 0
+        return self._ok({"url": f"https://passport.bilibili.com/h5-app/{code}", "auth_code": code})
+
+    def _poll(self, code: str) -> Dict[str, Any]:
+        if code not in self._codes:
+            return self._error(86038, "二维码已失效")
+        self._codes[code] += 1
+        if self._codes[code] < self.config.login_polls:
+            return self._error(QR_NOT_CONFIRMED, "二维码已扫码未确认")
+        del self._codes[code]
+        mid = next(self._ids)
+        token, csrf = f"mock-token-{mid}", f"mock-csrf-{mid}"
+        self.accounts[token] = _Account(
+            csrf=csrf,
+            queue=self._rng.sample(range(len(self.questions)), self.config.quiz_length),
+        )
+        return self._ok(
+            {
+                "access_token": token,
+                "mid": mid,
+                "refresh_token": f"mock-refresh-{mid}",
+                "expires_in": 15552000,
+                "cookie_info": {"cookies": [{"name": "bili_jct", "value": csrf}]},
+            }
+        )
+
+    def _question(self, account: _Account) -> Dict[str, Any]:
+        if account.answered >= len(account.queue):
+            return self._error(QUIZ_FINISHED, "答题已结束")
+        q = self.questions[account.queue[account.answered]]
+        answers = [{"ans_text": c, "ans_hash": q.ans_hash(i)} for i, c in enumerate(q.choices)]
+        return self._ok(
+            {
+                "id": q.id,
+                "question": q.question,
+                "answers": answers,
+                "question_num": account.answered + 1,
+            }
+        )
+
+    def _submit(self, account: _Account, params: Dict[str, str]) -> Dict[str, Any]:
+        if account.answered >= len(account.queue):
+            return self._error(QUIZ_FINISHED, "答题已结束")
+        q = self.questions[account.queue[account.answered]]
+        if params.get("id") != str(q.id):
+            return self._error(-400, "题目不匹配")
+        account.answered += 1
+        if params.get("ans_hash") == q.ans_hash(q.correct):
+            account.scores[q.category] = account.scores.get(q.category, 0) + 1
+        return self._ok({})
+
+    def _result(self, account: _Account) -> Dict[str, Any]:
+        total = self.config.quiz_length // len(self.config.categories)
+        return {
+            "score": account.score,
+            "scores": [
+                {"category": c, "score": account.scores.get(c, 0), "total": total}
+                for c in self.config.categories
+            ],
+        }
+
+    def _chat(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        content = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        # 参考题目在题干之前，取最后一个题号
+        ids = _QUESTION_ID.findall(content)
+        q = self.by_id.get(int(ids[-1])) if ids else None
+        ranking: List[int] = []
+        if q is not None:
+            pattern = re.compile(rf"(\d+)\. {q.id} 号题的选项 ([A-D])")
+            options = {int(n): "ABCD".index(letter) for n, letter in pattern.findall(content)}
+            ranking = list(options)
+            self._rng.shuffle(ranking)
+            correct = next((n for n, i in options.items() if i == q.correct), None)
+            if correct is not None and self._rng.random() < self.config.ai_accuracy:
+                ranking.remove(correct)
+                ranking.insert(0, correct)
+        return {
+            "id": f"chatcmpl-mock{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": ",".join(map(str, ranking)) or "1"},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }
+            ],
+            "usage": {"prompt_tokens": len(content), "completion_tokens": 8, "total_tokens": 0},
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，不关闭 Nagle 算法会与延迟确认叠加出约 40ms 的额外延迟
+    disable_nagle_algorithm = True
+    server: "MockServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._dispatch()
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload = self.server.mock.handle(url.path, params, body)
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), "text/html; charset=utf-8"
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode()
+            content_type = "application/json; charset=utf-8"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockServer(ThreadingHTTPServer):
+    """每个连接一个线程的模拟 HTTP 服务器"""
+
+    daemon_threads = True
+
+    def __init__(self, config: MockConfig, host: str = "127.0.0.1", port: int = 0):
+        """初始化服务器
+
+        Args:
+            config: 模拟配置
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+        """
+        super().__init__((host, port), _Handler)
+        self.mock = MockBilibili(config)
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # 客户端取消预取等请求时会直接断开连接，不视为错误
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
@@ -0,0 +1,124 @@
+"""自适应请求节流
+
+为每个账号的每个接口维护一个令牌桶：响应正常时逐步提高速率，
+遇到限流错误码时降低速率并按指数退避暂停该接口，取代固定的 sleep。
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, Optional
+
+
+class TokenBucket:
+    """单个接口的自适应令牌桶"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        increase: float = 0.1,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        """初始化令牌桶
+
+        Args:
+            rate: 初始速率（请求/秒）
+            burst: 桶容量，允许的突发请求数
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase: 每次正常响应后增加的速率
+            backoff_base: 首次限流的退避时间（秒），之后每次翻倍
+            backoff_max: 退避时间上限（秒）
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate, self.max_rate = min_rate, max_rate
+        self.increase = increase
+        self.backoff_base, self.backoff_max = backoff_base, backoff_max
+        self.throttles = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self) -> None:
+        self.throttles = 0
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> float:
+        """记录一次限流，返回本次退避时间（秒）"""
+        self.throttles += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        backoff = min(self.backoff_max, self.backoff_base * 2.0 ** (self.throttles - 1))
+        self._blocked_until = time.monotonic() + backoff
+        self._tokens = 0
+        return backoff
+
+
+class AdaptivePacer:
+    """单个账号的请求节流器，按接口分别维护令牌桶"""
+
+    DEFAULT_THROTTLE_CODES = (-412, -509, -799)
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: float = 1.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        increase: float = 0.1,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        throttle_codes: Optional[Iterable[int]] = None,
+    ):
+        self._bucket_kwargs = dict(
+            rate=rate,
+            burst=burst,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            increase=increase,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+        )
+        self.throttle_codes = frozenset(
+            self.DEFAULT_THROTTLE_CODES if throttle_codes is None else throttle_codes
+        )
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self.buckets:
+            self.buckets[endpoint] = TokenBucket(**self._bucket_kwargs)
+        return self.buckets[endpoint]
+
+    def is_throttle(self, code: int) -> bool:
+        return code in self.throttle_codes
+
+    async def acquire(self, endpoint: str) -> None:
+        await self.bucket(endpoint).acquire()
+
+    def report(self, endpoint: str, code: int) -> Optional[float]:
+        """根据响应码调整速率，限流时返回退避时间"""
+        if self.is_throttle(code):
+            return self.bucket(endpoint).on_throttle()
+        self.bucket(endpoint).on_success()
+        return None
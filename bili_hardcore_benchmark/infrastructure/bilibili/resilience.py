@@ -0,0 +1,181 @@
+"""请求容错：重试、退避、熔断与超时预算
+
+``RequestGuard`` 只负责决策（是否重试、等待多久、本次尝试的超时），
+实际的请求循环由同步/异步客户端各自实现。
+"""
+
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+import httpx
+
+from ...core.exceptions import APIError, CircuitOpenError, TransientAPIError
+
+# 请求确定未被服务端处理的错误，对非幂等请求也可以安全重试
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclass
+class RetryPolicy:
+    """重试策略
+
+    Attributes:
+        max_attempts: 最大尝试次数（含首次）
+        base_delay: 退避基准时间（秒）
+        max_delay: 单次退避上限（秒）
+        attempt_timeout: 单次尝试的超时时间（秒）
+        total_budget: 整个请求（含所有重试与退避）的时间预算（秒）
+        retryable_codes: 可重试的 B站错误码
+        safe_codes: 表示请求被拒绝、未被处理的错误码（如限流），非幂等请求也可重试
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    attempt_timeout: float = 10.0
+    total_budget: float = 30.0
+    retryable_codes: FrozenSet[int] = frozenset({-500, -502, -503, -504})
+    safe_codes: FrozenSet[int] = frozenset({-412, -509, -799})
+
+    def backoff(self, attempt: int) -> float:
+        """第 ``attempt`` 次失败后的等待时间（full jitter）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2.0**attempt))
+
+    def is_transient(self, exc: BaseException) -> bool:
+        if isinstance(exc, APIError):
+            return exc.code in self.retryable_codes or exc.code in self.safe_codes
+        # 传输层错误，或返回了非 JSON 的响应体（网关错误页等）
+        return isinstance(exc, (httpx.TransportError, json.JSONDecodeError))
+
+    def is_safe_to_retry(self, exc: BaseException, idempotent: bool) -> bool:
+        if not self.is_transient(exc):
+            return False
+        if idempotent:
+            return True
+        if isinstance(exc, APIError):
+            return exc.code in self.safe_codes
+        return isinstance(exc, _NOT_SENT_ERRORS)
+
+
+@dataclass
+class CircuitBreaker:
+    """单个接口的熔断器
+
+    连续 ``failure_threshold`` 次瞬时故障（限流除外）后打开，``reset_timeout`` 秒后进入半开状态，
+    放行一次探测请求：成功则关闭，失败则重新打开。探测请求进行中时其他请求
+    至少等待 ``probe_timeout`` 秒（探测请求的超时时间）再试。
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    probe_timeout: float = 10.0
+    failures: int = 0
+    opened_at: Optional[float] = None
+    _probing: bool = field(default=False, repr=False)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self, endpoint: str) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        assert self.opened_at is not None
+        if state == "half_open":
+            # 探测请求进行中，结果最迟在其超时后揭晓
+            retry_after = self.probe_timeout
+        else:
+            retry_after = self.reset_timeout - (time.monotonic() - self.opened_at)
+        raise CircuitOpenError(endpoint, retry_after)
+
+    def record_success(self) -> None:
+        self.failures, self.opened_at, self._probing = 0, None, False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class RequestGuard:
+    """所有 B站客户端共享的容错决策器，每个接口一个熔断器"""
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout, self.policy.attempt_timeout
+            )
+        return self.breakers[endpoint]
+
+    def deadline(self) -> float:
+        return time.monotonic() + self.policy.total_budget
+
+    def before_attempt(self, endpoint: str, deadline: float) -> float:
+        """检查熔断器并返回本次尝试可用的超时时间"""
+        self.breaker(endpoint).before_call(endpoint)
+        return max(0.1, min(self.policy.attempt_timeout, deadline - time.monotonic()))
+
+    def on_success(self, endpoint: str) -> None:
+        self.breaker(endpoint).record_success()
+
+    def on_failure(
+        self, endpoint: str, exc: Exception, attempt: int, deadline: float, idempotent: bool
+    ) -> float:
+        """记录失败并返回重试前的等待时间；不应重试时抛出异常
+
+        Args:
+            endpoint: 接口路径
+            exc: 本次尝试的异常
+            attempt: 已完成的尝试次数
+            deadline: 整个请求的截止时间（monotonic）
+            idempotent: 请求是否可以安全重放
+
+        Raises:
+            Exception: 非瞬时错误（如业务错误码）原样抛出
+            TransientAPIError: 瞬时故障但已用尽重试次数、时间预算，或请求不可安全重放
+        """
+        if not self.policy.is_transient(exc):
+            # 业务错误码或数据格式不符说明接口本身可用，不计入熔断
+            self.breaker(endpoint).record_success()
+            raise exc
+        if isinstance(exc, APIError) and exc.code in self.policy.safe_codes:
+            # 限流针对的是单个账号，接口本身正常响应；计入熔断会让一个被限流的
+            # 账号阻断所有会话
+            self.breaker(endpoint).record_success()
+        else:
+            self.breaker(endpoint).record_failure()
+
+        delay = self.policy.backoff(attempt)
+        if (
+            attempt >= self.policy.max_attempts
+            or not self.policy.is_safe_to_retry(exc, idempotent)
+            or time.monotonic() + delay >= deadline
+        ):
+            code = exc.code if isinstance(exc, APIError) else -1
+            raise TransientAPIError(
+                f"{endpoint} 请求失败（已尝试 {attempt} 次）: {exc}", code
+            ) from exc
+        return delay
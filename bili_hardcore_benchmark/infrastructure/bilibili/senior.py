@@ -1,13 +1,20 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+import httpx
 
 from ...core.models import BiliQuestion, BiliResult
-from .client import BilibiliClient
+from .client import AsyncBilibiliClient, BilibiliClient
+from .pacing import AdaptivePacer
+from .resilience import RequestGuard
 
+QUESTION_URL = "/x/senior/v1/question"
+SUBMIT_URL = "/x/senior/v1/answer/submit"
+RESULT_URL = "/x/senior/v1/answer/result"
 
-class BilibiliSeniorClient(BilibiliClient):
-    def __init__(self, access_token: str, csrf: str, timeout: int = 30):
-        super().__init__(timeout)
-        self.access_token, self.csrf = access_token, csrf
+
+class _SeniorParamsMixin:
+    access_token: str
+    csrf: str
 
     def _params(self) -> Dict[str, Any]:
         return {
@@ -17,22 +24,54 @@ class BilibiliSeniorClient(BilibiliClient):
             "platform": "android",
         }
 
+    def _submit_params(self, qid: int, ans_hash: str, ans_text: str) -> Dict[str, Any]:
+        return {**self._params(), "id": qid, "ans_hash": ans_hash, "ans_text": ans_text}
+
+
+class BilibiliSeniorClient(_SeniorParamsMixin, BilibiliClient):
+    def __init__(
+        self,
+        access_token: str,
+        csrf: str,
+        timeout: int = 30,
+        guard: Optional[RequestGuard] = None,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        super().__init__(timeout, guard, base_url, transport)
+        self.access_token, self.csrf = access_token, csrf
+
     def get_question(self) -> BiliQuestion:
-        return self.get(
-            "https://api.bilibili.com/x/senior/v1/question", BiliQuestion, self._params()
-        )
+        return self.get(QUESTION_URL, BiliQuestion, self._params())
 
     def submit_answer(self, qid: int, ans_hash: str, ans_text: str) -> Dict[str, Any]:
-        params = {**self._params(), "id": qid, "ans_hash": ans_hash, "ans_text": ans_text}
-        return self.post(
-            "https://api.bilibili.com/x/senior/v1/answer/submit",
-            Dict[str, Any],
-            params,
-        )
+        params = self._submit_params(qid, ans_hash, ans_text)
+        # 提交答案不可重放：只在确定请求未送达时重试
+        return self.post(SUBMIT_URL, Dict[str, Any], params, idempotent=False)
 
     def get_result(self) -> BiliResult:
-        return self.get(
-            "https://api.bilibili.com/x/senior/v1/answer/result",
-            BiliResult,
-            self._params(),
-        )
+        return self.get(RESULT_URL, BiliResult, self._params())
+
+
+class AsyncBilibiliSeniorClient(_SeniorParamsMixin, AsyncBilibiliClient):
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        access_token: str,
+        csrf: str,
+        pacer: Optional[AdaptivePacer] = None,
+        guard: Optional[RequestGuard] = None,
+        base_url: Optional[str] = None,
+    ):
+        super().__init__(http, pacer, guard, base_url)
+        self.access_token, self.csrf = access_token, csrf
+
+    async def get_question(self) -> BiliQuestion:
+        return await self.get(QUESTION_URL, BiliQuestion, self._params())
+
+    async def submit_answer(self, qid: int, ans_hash: str, ans_text: str) -> Dict[str, Any]:
+        params = self._submit_params(qid, ans_hash, ans_text)
+        return await self.post(SUBMIT_URL, Dict[str, Any], params, idempotent=False)
+
+    async def get_result(self) -> BiliResult:
+        return await self.get(RESULT_URL, BiliResult, self._params())
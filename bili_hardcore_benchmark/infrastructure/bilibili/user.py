@@ -1,16 +1,44 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from .client import BilibiliClient
+import httpx
+
+from .client import AsyncBilibiliClient, BilibiliClient
+from .resilience import RequestGuard
+
+APP_BASE_URL = "https://app.bilibili.com"
+ACCOUNT_INFO_URL = "/x/v2/account/myinfo"
 
 
 class BilibiliUserClient(BilibiliClient):
-    def __init__(self, access_token: str, timeout: int = 30):
-        super().__init__(timeout)
+    BASE_URL = APP_BASE_URL
+
+    def __init__(
+        self,
+        access_token: str,
+        timeout: int = 30,
+        guard: Optional[RequestGuard] = None,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        super().__init__(timeout, guard, base_url, transport)
         self.access_token = access_token
 
     def get_account_info(self) -> Dict[str, Any]:
-        return self.get(
-            "https://app.bilibili.com/x/v2/account/myinfo",
-            Dict[str, Any],
-            {"access_key": self.access_token},
-        )
+        return self.get(ACCOUNT_INFO_URL, Dict[str, Any], {"access_key": self.access_token})
+
+
+class AsyncBilibiliUserClient(AsyncBilibiliClient):
+    BASE_URL = APP_BASE_URL
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        access_token: str,
+        guard: Optional[RequestGuard] = None,
+        base_url: Optional[str] = None,
+    ):
+        super().__init__(http, guard=guard, base_url=base_url)
+        self.access_token = access_token
+
+    async def get_account_info(self) -> Dict[str, Any]:
+        return await self.get(ACCOUNT_INFO_URL, Dict[str, Any], {"access_key": self.access_token})
@@ -0,0 +1,210 @@
+"""HTTP 录制与回放
+
+在 httpx 传输层记录 B站接口与 AI 接口的每个请求/响应及其耗时，写入 gzip
+压缩的 JSON Lines 文件（cassette）；回放时不访问网络，按录制顺序返回响应，
+可按录制时的耗时等待或全速返回。用于离线、可复现地剖析整个答题流程
+（存储写入、响应解析、答题策略），以及在同一份流量上比较不同版本。
+
+回放匹配规则：请求指纹（方法、路径、去掉 ``ts``/``sign`` 的查询参数与请求体）
+相同的录制条目按顺序返回；找不到时（如新版本的提示词或作答不同）退回到同一
+接口的下一条未使用的录制条目（``strict=False``），默认直接报错。
+
+录制文件包含登录接口的响应（访问令牌），不要分享给他人。
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Deque, Dict, List, Literal, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+from loguru import logger
+
+from ..core.exceptions import CassetteMissError
+
+CassetteMode = Literal["record", "replay"]
+
+# 每次请求都会变化、不影响响应的参数
+VOLATILE_PARAMS = frozenset({"ts", "sign"})
+
+
+@dataclass
+class CassetteEntry:
+    method: str
+    path: str
+    key: str
+    status: int
+    content_type: str
+    body: str
+    elapsed: float
+
+    def response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            self.status,
+            headers={"Content-Type": self.content_type},
+            content=base64.b64decode(self.body),
+            request=request,
+        )
+
+
+def fingerprint(request: httpx.Request) -> str:
+    params = sorted(
+        (k, v) for k, v in parse_qsl(request.url.query.decode()) if k not in VOLATILE_PARAMS
+    )
+    digest = hashlib.sha1(request.method.encode())
+    digest.update(request.url.path.encode())
+    digest.update(json.dumps(params, ensure_ascii=False).encode())
+    digest.update(request.content)
+    return digest.hexdigest()[:16]
+
+
+class Cassette:
+    """一个录制文件，录制与回放共用"""
+
+    def __init__(self, path: Path, mode: CassetteMode, speed: float = 1.0, strict: bool = True):
+        """打开录制文件
+
+        Args:
+            path: 录制文件路径（``.jsonl.gz``）；录制模式下覆盖已有文件
+            mode: record 录制；replay 回放
+            speed: 回放速度倍数，1 为按录制耗时等待，0 为不等待
+            strict: 回放时请求指纹必须匹配，否则抛出 ``CassetteMissError``
+        """
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._entries: List[CassetteEntry] = []
+        self._used: List[bool] = []
+        self._by_key: Dict[str, Deque[int]] = defaultdict(deque)
+        self._by_endpoint: Dict[Tuple[str, str], Deque[int]] = defaultdict(deque)
+        self.recorded = self.exact = self.fallback = self.missed = 0
+
+        if mode == "record":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+            return
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self._entries = [CassetteEntry(**json.loads(line)) for line in f if line.strip()]
+        self._used = [False] * len(self._entries)
+        for i, entry in enumerate(self._entries):
+            self._by_key[entry.key].append(i)
+            self._by_endpoint[entry.method, entry.path].append(i)
+        logger.info(f"已加载录制文件 {path}: {len(self._entries)} 条请求")
+
+    def record(self, request: httpx.Request, response: httpx.Response, elapsed: float) -> None:
+        entry = CassetteEntry(
+            method=request.method,
+            path=request.url.path,
+            key=fingerprint(request),
+            status=response.status_code,
+            content_type=response.headers.get("Content-Type", ""),
+            body=base64.b64encode(response.content).decode(),
+            elapsed=round(elapsed, 4),
+        )
+        line = json.dumps(asdict(entry), ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self.recorded += 1
+
+    def _take(self, queue: Deque[int]) -> Optional[int]:
+        while queue:
+            i = queue.popleft()
+            if not self._used[i]:
+                self._used[i] = True
+                return i
+        return None
+
+    def match(self, request: httpx.Request) -> CassetteEntry:
+        """取出与请求对应的录制条目
+
+        Raises:
+            CassetteMissError: 没有可用的录制条目
+        """
+        with self._lock:
+            i = self._take(self._by_key[fingerprint(request)])
+            if i is not None:
+                self.exact += 1
+            elif not self.strict:
+                i = self._take(self._by_endpoint[request.method, request.url.path])
+                if i is not None:
+                    self.fallback += 1
+            if i is None:
+                self.missed += 1
+                raise CassetteMissError(f"录制文件中没有可回放的请求: {request.url.path}")
+            return self._entries[i]
+
+    def wrap_async(self, inner: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        return _AsyncCassetteTransport(self, inner)
+
+    def wrap_sync(self, inner: httpx.BaseTransport) -> httpx.BaseTransport:
+        return _CassetteTransport(self, inner)
+
+    def stats(self) -> str:
+        if self.mode == "record":
+            return f"录制 {self.recorded} 条请求到 {self.path}"
+        return (
+            f"回放 {self.exact + self.fallback}/{len(self._entries)} 条请求"
+            f"（精确匹配 {self.exact}，按接口顺序 {self.fallback}，未命中 {self.missed}）"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _CassetteTransport(httpx.BaseTransport):
+    def __init__(self, cassette: Cassette, inner: httpx.BaseTransport):
+        self.cassette = cassette
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.mode == "replay":
+            request.read()
+            entry = self.cassette.match(request)
+            if self.cassette.speed > 0:
+                time.sleep(entry.elapsed / self.cassette.speed)
+            return entry.response(request)
+        start = time.perf_counter()
+        response = self.inner.handle_request(request)
+        response.read()
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class _AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    def __init__(self, cassette: Cassette, inner: httpx.AsyncBaseTransport):
+        self.cassette = cassette
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.mode == "replay":
+            await request.aread()
+            entry = self.cassette.match(request)
+            if self.cassette.speed > 0:
+                await asyncio.sleep(entry.elapsed / self.cassette.speed)
+            return entry.response(request)
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        await response.aread()
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
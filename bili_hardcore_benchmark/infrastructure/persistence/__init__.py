@@ -2,6 +2,20 @@
 
 from .exporters.huggingface_exporter import HuggingFaceExporter
 from .exporters.jsonl_exporter import JSONLExporter
-from .question_store import JSONQuestionStore
+from .question_store import JSONQuestionStore, MemoryQuestionStore, WALQuestionStore
+from .shard_merge import MergeReport, ShardMerger
+from .sqlite_store import SQLiteQuestionStore
+from .token_cache import EncryptedTokenCache, MemoryTokenCache
 
-__all__ = ["JSONQuestionStore", "HuggingFaceExporter", "JSONLExporter"]
+__all__ = [
+    "JSONQuestionStore",
+    "WALQuestionStore",
+    "MemoryQuestionStore",
+    "SQLiteQuestionStore",
+    "ShardMerger",
+    "MergeReport",
+    "EncryptedTokenCache",
+    "MemoryTokenCache",
+    "HuggingFaceExporter",
+    "JSONLExporter",
+]
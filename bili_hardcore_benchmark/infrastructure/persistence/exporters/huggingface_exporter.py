@@ -1,5 +1,8 @@
 """HuggingFace 格式导出器"""
 
+import json
+import os
+import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -10,11 +13,16 @@ if TYPE_CHECKING:
 
 from datasets import Dataset
 
+# 增量导出追加的分片文件名前缀
+APPEND_PREFIX = "data-append-"
+
 
 class HuggingFaceExporter:
     """HuggingFace datasets 格式导出器
 
-    导出为 Arrow 格式，适合 HuggingFace datasets 库加载。
+    导出为 Arrow 格式，适合 HuggingFace datasets 库加载。增量导出时新题目
+    写成 ``train`` 下额外的 Arrow 分片并登记到 ``state.json``，
+    ``load_from_disk`` 加载时会拼接所有分片。
     """
 
     def export(self, questions: list["Question"], output_dir: Path, version: str) -> None:
@@ -28,15 +36,58 @@ class HuggingFaceExporter:
         Raises:
             ValueError: 如果题目列表为空或包含不完整题目
         """
+        dataset = self._dataset(questions, version)
+
+        # 保存为 Arrow 格式（lm_eval 需要 train split）
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # 整体重写时清理之前追加的分片
+        for shard in (output_dir / "train").glob(f"{APPEND_PREFIX}*.arrow"):
+            shard.unlink()
+        # 创建 DatasetDict 包含 train split
+        from datasets import DatasetDict
+
+        dataset_dict = DatasetDict({"train": dataset})
+        dataset_dict.save_to_disk(str(output_dir))
+
+        logger.info(f"已导出 {len(questions)} 道题目到 HuggingFace 格式: {output_dir}")
+
+    def append(self, questions: list["Question"], output_dir: Path, version: str) -> None:
+        """将题目写成已有数据集 ``train`` split 的一个新分片
+
+        Args:
+            questions: 题目列表（必须都是完整题目）
+            output_dir: 已由 ``export`` 导出的数据集目录
+            version: 版本号
+
+        Raises:
+            ValueError: 如果题目列表为空或包含不完整题目
+            FileNotFoundError: 数据集目录不存在
+        """
+        dataset = self._dataset(questions, version)
+        train = output_dir / "train"
+        state_file = train / "state.json"
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+        shard = f"{APPEND_PREFIX}{len(state['_data_files']):05d}.arrow"
+
+        with tempfile.TemporaryDirectory(dir=train) as tmp:
+            dataset.save_to_disk(tmp)
+            written = json.loads((Path(tmp) / "state.json").read_text(encoding="utf-8"))
+            # 样本量小，save_to_disk 只写一个分片
+            os.replace(Path(tmp) / written["_data_files"][0]["filename"], train / shard)
+
+        state["_data_files"].append({"filename": shard})
+        state["_fingerprint"] = written["_fingerprint"]
+        tmp_file = state_file.with_suffix(".json.tmp")
+        tmp_file.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp_file, state_file)
+
+        logger.info(f"已追加 {len(questions)} 道题目到 HuggingFace 分片: {train / shard}")
+
+    def _dataset(self, questions: list["Question"], version: str) -> Dataset:
         if not questions:
             raise ValueError("题目列表为空，无法导出")
 
-        # 验证所有题目都是完整的
-        for q in questions:
-            if not q.is_complete:
-                raise ValueError(f"题目 {q.id} 不完整，无法导出")
-
-        # 准备数据
+        # 准备数据，同时验证所有题目都是完整的
         data_dict: dict[str, list[Any]] = {
             "id": [],
             "question": [],
@@ -46,6 +97,8 @@ class HuggingFaceExporter:
         }
 
         for question in questions:
+            if not question.is_complete:
+                raise ValueError(f"题目 {question.id} 不完整，无法导出")
             data_dict["id"].append(question.id)
             data_dict["question"].append(question.question)
             data_dict["choices"].append(question.choices)
@@ -70,13 +123,4 @@ class HuggingFaceExporter:
             version_formatted = version_clean
 
         dataset.info.version = version_formatted
-
-        # 保存为 Arrow 格式（lm_eval 需要 train split）
-        output_dir.mkdir(parents=True, exist_ok=True)
-        # 创建 DatasetDict 包含 train split
-        from datasets import DatasetDict
-
-        dataset_dict = DatasetDict({"train": dataset})
-        dataset_dict.save_to_disk(str(output_dir))
-
-        logger.info(f"已导出 {len(questions)} 道题目到 HuggingFace 格式: {output_dir}")
+        return dataset
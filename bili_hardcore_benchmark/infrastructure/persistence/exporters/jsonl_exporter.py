@@ -26,27 +26,37 @@ class JSONLExporter:
         Raises:
             ValueError: 如果题目列表为空或包含不完整题目
         """
+        self._write(questions, output_file, "w")
+        logger.info(f"已导出 {len(questions)} 道题目到 JSONL 格式: {output_file}")
+
+    def append(self, questions: list["Question"], output_file: Path) -> None:
+        """在已有的 JSONL 文件末尾追加题目
+
+        Raises:
+            ValueError: 如果题目列表为空或包含不完整题目
+        """
+        self._write(questions, output_file, "a")
+        logger.info(f"已追加 {len(questions)} 道题目到 JSONL 文件: {output_file}")
+
+    def _write(self, questions: list["Question"], output_file: Path, mode: str) -> None:
         if not questions:
             raise ValueError("题目列表为空，无法导出")
 
-        # 验证所有题目都是完整的
-        for q in questions:
-            if not q.is_complete:
-                raise ValueError(f"题目 {q.id} 不完整，无法导出")
+        # 写入前整体校验，避免写出半个文件
+        lines = []
+        for question in questions:
+            if not question.is_complete:
+                raise ValueError(f"题目 {question.id} 不完整，无法导出")
+            record = {
+                "id": question.id,
+                "question": question.question,
+                "choices": question.choices,
+                "answer": question.correct_answer,  # 0-based
+                "category": question.category or "general",
+            }
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
 
         # 确保输出目录存在
         output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # 写入 JSONL
-        with open(output_file, "w", encoding="utf-8") as f:
-            for question in questions:
-                record = {
-                    "id": question.id,
-                    "question": question.question,
-                    "choices": question.choices,
-                    "answer": question.correct_answer,  # 0-based
-                    "category": question.category or "general",
-                }
-                f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-        logger.info(f"已导出 {len(questions)} 道题目到 JSONL 格式: {output_file}")
+        with open(output_file, mode, encoding="utf-8") as f:
+            f.writelines(lines)
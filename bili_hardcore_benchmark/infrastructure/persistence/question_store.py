@@ -1,28 +1,282 @@
+import copy
 import json
+import os
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, cast
+from typing import IO, Any, Dict, Iterator, Mapping, Optional, Sequence, Tuple, cast
+
+from loguru import logger
+
+from ...core.models import Question, QuestionEvent
+
+
+class _JSONStream:
+    """从文本流中逐个解析 JSON 值，只在内存中保留当前正在解析的片段"""
+
+    _decoder = json.JSONDecoder()
+    _non_ws = re.compile(r"[^ \t\r\n]")
+
+    def __init__(self, f: IO[str], chunk_size: int = 1 << 20):
+        self.f, self.chunk_size = f, chunk_size
+        self.buf, self.pos, self.eof = "", 0, False
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_ws(self) -> None:
+        while True:
+            m = self._non_ws.search(self.buf, self.pos)
+            self.pos = m.start() if m else len(self.buf)
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def char(self) -> str:
+        """读取并消费下一个非空白字符"""
+        self._skip_ws()
+        if self.pos >= len(self.buf):
+            raise json.JSONDecodeError("Unexpected end of data", self.buf, self.pos)
+        ch = self.buf[self.pos]
+        self.pos += 1
+        return ch
+
+    def peek(self) -> str:
+        self._skip_ws()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def value(self) -> Any:
+        self._skip_ws()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数字可能恰好在块边界被截断，读到更多数据后重新解析
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def keys(self) -> Iterator[Any]:
+        """逐个产出当前对象的键；调用方需在下一次迭代前用 ``value()`` 或 ``keys()`` 消费对应的值"""
+        if self.char() != "{":
+            raise json.JSONDecodeError("Expecting '{'", self.buf, self.pos - 1)
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if self.char() != ":":
+                raise json.JSONDecodeError("Expecting ':'", self.buf, self.pos - 1)
+            yield key
+            if self.char() == "}":
+                return
 
 
 class JSONQuestionStore:
-    def __init__(self, file_path: Path):
+    """整体重写的 JSON 题库存储
+
+    每次保存先写临时文件再原子替换，崩溃时不会留下写了一半的题库；
+    ``fsync`` 为 True 时替换前强制刷盘，断电后也不会丢失已保存的数据，
+    但每次保存都要等待磁盘。
+    """
+
+    def __init__(self, file_path: Path, fsync: bool = False):
         self.file_path = file_path
+        self.fsync = fsync
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    def load(self) -> Dict[str, Any]:
+    def _read(self) -> Dict[str, Any]:
         if not self.file_path.exists():
             return {}
         with open(self.file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-            if isinstance(data, dict):
-                return cast(Dict[str, Any], data.get("questions", {}))
-            return {}
+            return cast(Dict[str, Any], data) if isinstance(data, dict) else {}
 
-    def save(self, questions: Dict[str, Any]) -> None:
+    def _write(self, questions: Dict[str, Any], **extra: Any) -> None:
         data = {
             "version": "1.0",
             "updated_at": datetime.now().isoformat(),
+            **extra,
             "questions": questions,
         }
-        with open(self.file_path, "w", encoding="utf-8") as f:
+        # 先写临时文件再原子替换，避免写入中途崩溃损坏已有数据
+        tmp = self.file_path.with_name(self.file_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.file_path)
+
+    def load(self) -> Dict[str, Any]:
+        return cast(Dict[str, Any], self._read().get("questions", {}))
+
+    def iter_load(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """流式读取题目，不把整个文件解析为一个字典"""
+        if not self.file_path.exists():
+            return
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            stream = _JSONStream(f)
+            for key in stream.keys():
+                if key != "questions":
+                    stream.value()
+                    continue
+                for qid in stream.keys():
+                    yield qid, stream.value()
+
+    def save(self, questions: Dict[str, Any]) -> None:
+        self._write(questions)
+
+
+class MemoryQuestionStore:
+    """只保存在内存中的题库存储，不写入任何文件（如回放录制文件时）"""
+
+    def __init__(self, questions: Optional[Dict[str, Any]] = None):
+        self._questions = copy.deepcopy(questions or {})
+
+    def load(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._questions)
+
+    def save(self, questions: Dict[str, Any]) -> None:
+        self._questions = copy.deepcopy(questions)
+
+
+class WALQuestionStore(JSONQuestionStore):
+    """快照 + 追加日志的题库存储
+
+    每次变更向日志追加一行紧凑的 ``QuestionEvent``，保存成本与题库规模无关；
+    加载时读取快照（即 ``questions_raw.json``）并重放日志。日志累积到
+    ``compact_every`` 条时写入新快照并清空日志。
+
+    每条事件带递增序号，快照记录已合并的最大序号：即使在写完快照、
+    清空日志之前崩溃，重放时也会跳过已合并的事件，不会重复计数。
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        log_path: Optional[Path] = None,
+        compact_every: int = 10000,
+        fsync: bool = False,
+    ):
+        super().__init__(file_path, fsync=fsync)
+        self.log_path = log_path or file_path.with_name(file_path.name + ".wal")
+        self.compact_every = compact_every
+        self._seq = 0
+        self._pending = 0
+
+    def load(self) -> Dict[str, Any]:
+        """读取快照并重放日志
+
+        Raises:
+            ValueError: 日志中间有无法解析的记录（损坏，或由更新版本写入的事件）；
+                日志保持原样，不会丢弃其后的有效事件
+        """
+        doc = self._read()
+        questions = cast(Dict[str, Any], doc.get("questions", {}))
+        self._seq = snapshot_seq = int(doc.get("wal_seq", 0))
+        self._pending = 0
+        if not self.log_path.exists():
+            return questions
+
+        offset, torn, terminated = 0, False, True
+        with open(self.log_path, "rb") as f:
+            for lineno, line in enumerate(f, 1):
+                # 只有最后一行可能没有换行符，即崩溃时写了一半的记录
+                terminated = line.endswith(b"\n")
+                if not line.strip():
+                    offset += len(line)
+                    continue
+                try:
+                    event = QuestionEvent.model_validate_json(line)
+                except ValueError as e:
+                    if terminated:
+                        raise ValueError(
+                            f"题库日志 {self.log_path} 第 {lineno} 行无法解析"
+                            f"（文件损坏或由更新版本写入）: {e}"
+                        ) from e
+                    torn = True
+                    break
+                offset += len(line)
+                if event.seq is not None and event.seq <= snapshot_seq:
+                    continue
+                self._seq = max(self._seq, event.seq or 0)
+                self._pending += 1
+                self._replay(questions, event)
+        if torn:
+            logger.warning(f"题库日志 {self.log_path} 末尾记录不完整，已丢弃")
+            with open(self.log_path, "r+b") as f:
+                f.truncate(offset)
+        elif not terminated:
+            # 末行完整但缺少换行符，补上后才能继续追加
+            with open(self.log_path, "ab") as f:
+                f.write(b"\n")
+        return questions
+
+    def iter_load(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # 日志事件需要在完整的快照上重放
+        yield from self.load().items()
+
+    @staticmethod
+    def _replay(questions: Dict[str, Any], event: QuestionEvent) -> None:
+        if event.op == "create":
+            questions.setdefault(
+                event.id, {"id": event.id, "question": event.question, "choices": event.choices}
+            )
+            return
+        q = questions.get(event.id)
+        if q is None:
+            return
+        if event.op == "attempt":
+            q["attempts"] = q.get("attempts", 0) + 1
+            q["last_attempt"] = event.ts.isoformat() if event.ts else None
+        elif event.op == "correct":
+            q["correct_answer"] = event.idx
+            q["wrong_answers"] = [i for i in q.get("wrong_answers", []) if i != event.idx]
+        elif event.op == "wrong":
+            wrong = q.setdefault("wrong_answers", [])
+            if event.idx != q.get("correct_answer") and event.idx not in wrong:
+                wrong.append(event.idx)
+        elif event.op == "category":
+            q["category"] = event.category
+        elif event.op == "rank":
+            q["ai_ranking"] = event.ranking
+
+    def save(self, questions: Dict[str, Any]) -> None:
+        """写入快照并清空日志"""
+        self._write(questions, wal_seq=self._seq)
+        with open(self.log_path, "wb"):
+            pass
+        self._pending = 0
+
+    def apply(self, events: Sequence[QuestionEvent], questions: Mapping[str, Question]) -> None:
+        lines = []
+        for event in events:
+            self._seq += 1
+            stamped = event.model_copy(update={"seq": self._seq})
+            lines.append(stamped.model_dump_json(exclude_none=True) + "\n")
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self._pending += len(events)
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """将日志合并进快照
+
+        从磁盘重建当前状态，不依赖调用方的内存数据，可在后台落盘线程中执行。
+        """
+        logger.debug(f"压缩题库日志: {self._pending} 条事件")
+        self.save(self.load())
@@ -0,0 +1,253 @@
+"""多采集端题库合并
+
+各机器独立产出的 ``questions_raw.json`` 按以下规则合并：
+
+- ``wrong_answers`` 取并集，``attempts`` 求和；
+- ``last_attempt`` 取最新，``category`` 优先取最新一次作答时记录的分类；
+- 不同分片给出不同的 ``correct_answer`` 时保留最新结果；
+- 正确答案出现在其他分片的 ``wrong_answers`` 中时，按 ``BenchmarkService``
+  的规则保留正确答案并剔除该错误记录。
+
+以上两类冲突以及选项不一致都会写入冲突报告，供人工复核。
+
+内存占用有界：先按题目 id 的哈希把所有分片流式切分到若干分区文件，
+再逐个分区合并，任一时刻只有一个分区（每个工作进程）驻留内存。
+切分与合并两个阶段都可以多进程并行。
+"""
+
+import json
+import math
+import os
+import shutil
+import tempfile
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from loguru import logger
+
+from .question_store import JSONQuestionStore
+
+T = TypeVar("T")
+
+# 合并时每字节输入在内存中的大致开销（解析后的 dict 远大于 JSON 文本）
+_MEMORY_FACTOR = 6
+
+
+@dataclass
+class MergeReport:
+    shards: int = 0
+    records: int = 0
+    questions: int = 0
+    conflicts: int = 0
+    conflict_kinds: Dict[str, int] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        kinds = ", ".join(f"{k}: {n}" for k, n in sorted(self.conflict_kinds.items()))
+        return (
+            f"合并 {self.shards} 个分片的 {self.records} 条记录 -> {self.questions} 道题目，"
+            f"冲突 {self.conflicts} 处" + (f"（{kinds}）" if kinds else "")
+        )
+
+
+def _time(record: Dict[str, Any]) -> datetime:
+    last = record.get("last_attempt")
+    if not last:
+        return datetime.min
+    dt = datetime.fromisoformat(last)
+    return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def merge_records(
+    qid: str, records: Sequence[Tuple[str, Dict[str, Any]]]
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """合并同一题目在各分片中的记录
+
+    Args:
+        qid: 题目 id
+        records: ``(分片名, Question.model_dump(mode="json") 格式的记录)`` 列表
+
+    Returns:
+        合并后的记录与冲突列表
+    """
+    ordered = sorted(records, key=lambda r: _time(r[1]))
+    newest = ordered[-1][1]
+    conflicts: List[Dict[str, Any]] = []
+
+    choices = [(src, r["choices"]) for src, r in ordered]
+    if any(c != newest["choices"] for _, c in choices):
+        conflicts.append({"id": qid, "kind": "choices", "sources": dict(choices)})
+
+    correct = {
+        src: r["correct_answer"] for src, r in ordered if r.get("correct_answer") is not None
+    }
+    if len(set(correct.values())) > 1:
+        conflicts.append({"id": qid, "kind": "correct_answer", "sources": correct})
+    # 按时间顺序遍历，最后一个即最新的正确答案
+    answer = list(correct.values())[-1] if correct else None
+
+    wrong: Dict[int, List[str]] = {}
+    for src, r in ordered:
+        for idx in r.get("wrong_answers", []):
+            wrong.setdefault(idx, []).append(src)
+    if answer is not None and answer in wrong:
+        conflicts.append(
+            {
+                "id": qid,
+                "kind": "correct_in_wrong",
+                "answer": answer,
+                "correct_sources": [s for s, a in correct.items() if a == answer],
+                "wrong_sources": wrong[answer],
+            }
+        )
+
+    categories = [r["category"] for _, r in ordered if r.get("category")]
+    rankings = [r["ai_ranking"] for _, r in ordered if r.get("ai_ranking")]
+    merged = {
+        "id": qid,
+        "question": newest["question"],
+        "choices": newest["choices"],
+        "category": categories[-1] if categories else None,
+        "correct_answer": answer,
+        "wrong_answers": sorted(i for i in wrong if i != answer),
+        "attempts": sum(r.get("attempts", 0) for _, r in ordered),
+        "last_attempt": newest.get("last_attempt"),
+        "ai_ranking": rankings[-1] if rankings else [],
+    }
+    return merged, conflicts
+
+
+def _partition_of(qid: str, partitions: int) -> int:
+    # crc32 在各进程间稳定（内置 hash 对 str 加了随机盐）
+    return zlib.crc32(qid.encode()) % partitions
+
+
+def _split_shard(shard: Path, work_dir: Path, index: int, partitions: int) -> int:
+    """将一个分片流式切分到各分区文件，返回记录数"""
+    files = [
+        open(work_dir / f"p{p:04d}.s{index:04d}.jsonl", "w", encoding="utf-8")
+        for p in range(partitions)
+    ]
+    count = 0
+    try:
+        for qid, record in JSONQuestionStore(shard).iter_load():
+            line = json.dumps([str(shard), record], ensure_ascii=False)
+            files[_partition_of(qid, partitions)].write(line + "\n")
+            count += 1
+    finally:
+        for f in files:
+            f.close()
+    return count
+
+
+def _merge_partition(work_dir: Path, partition: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """合并一个分区，返回题目数与冲突列表
+
+    结果写入 ``p{n}.merged``，每行是一个现成的 ``"qid": {...}`` 片段。
+    """
+    grouped: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for path in sorted(work_dir.glob(f"p{partition:04d}.s*.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                src, record = json.loads(line)
+                grouped.setdefault(record["id"], []).append((src, record))
+        path.unlink()
+
+    conflicts: List[Dict[str, Any]] = []
+    with open(work_dir / f"p{partition:04d}.merged", "w", encoding="utf-8") as f:
+        for qid in sorted(grouped):
+            merged, found = merge_records(qid, grouped[qid])
+            conflicts.extend(found)
+            f.write(f"{json.dumps(qid)}: {json.dumps(merged, ensure_ascii=False)}\n")
+    return len(grouped), conflicts
+
+
+class ShardMerger:
+    """多分片题库合并器"""
+
+    def __init__(self, jobs: Optional[int] = None, memory_budget_mb: int = 512):
+        """初始化合并器
+
+        Args:
+            jobs: 并行进程数，默认为 CPU 核数；为 1 时在当前进程内串行执行
+            memory_budget_mb: 单个工作进程的内存预算，决定分区数量
+        """
+        self.jobs = jobs or os.cpu_count() or 1
+        self.memory_budget = memory_budget_mb * 2**20
+
+    def _map(self, pool: Optional[Executor], fn: Callable[..., T], *args: Iterable[Any]) -> List[T]:
+        if pool is None:
+            return list(map(fn, *args))
+        return list(pool.map(fn, *args))
+
+    def merge(
+        self, shards: Sequence[Path], output: Path, conflicts_path: Optional[Path] = None
+    ) -> MergeReport:
+        """合并分片并写出 ``questions_raw.json`` 格式的结果
+
+        Args:
+            shards: 输入的分片文件
+            output: 输出文件
+            conflicts_path: 冲突报告（JSONL），为空时只记录冲突数量
+        """
+        total = sum(p.stat().st_size for p in shards)
+        # 分区数至少等于进程数，保证合并阶段能用满所有进程
+        partitions = max(self.jobs, math.ceil(total * _MEMORY_FACTOR / self.memory_budget))
+        report = MergeReport(shards=len(shards))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(prefix=".merge-", dir=output.parent))
+        pool = ProcessPoolExecutor(self.jobs) if self.jobs > 1 else None
+        try:
+            logger.info(
+                f"切分 {len(shards)} 个分片（{total / 2**20:.1f} MiB）到 {partitions} 个分区"
+            )
+            n = len(shards)
+            counts = self._map(
+                pool, _split_shard, shards, [work_dir] * n, range(n), [partitions] * n
+            )
+            report.records = sum(counts)
+
+            logger.info("合并分区")
+            results = self._map(pool, _merge_partition, [work_dir] * partitions, range(partitions))
+            conflicts_file = open(conflicts_path, "w", encoding="utf-8") if conflicts_path else None
+            try:
+                for questions, conflicts in results:
+                    report.questions += questions
+                    for c in conflicts:
+                        report.conflicts += 1
+                        report.conflict_kinds[c["kind"]] = (
+                            report.conflict_kinds.get(c["kind"], 0) + 1
+                        )
+                        if conflicts_file:
+                            conflicts_file.write(json.dumps(c, ensure_ascii=False) + "\n")
+            finally:
+                if conflicts_file:
+                    conflicts_file.close()
+
+            self._write_output(work_dir, partitions, output)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return report
+
+    @staticmethod
+    def _write_output(work_dir: Path, partitions: int, output: Path) -> None:
+        """逐行拼接各分区结果，流式写出与 ``JSONQuestionStore`` 兼容的文件"""
+        tmp = output.with_name(output.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as out:
+            header = {"version": "1.0", "updated_at": datetime.now().isoformat()}
+            out.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "questions": {')
+            first = True
+            for p in range(partitions):
+                with open(work_dir / f"p{p:04d}.merged", "r", encoding="utf-8") as f:
+                    for line in f:
+                        out.write(("\n" if first else ",\n") + line.rstrip("\n"))
+                        first = False
+            out.write("\n}}\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, output)
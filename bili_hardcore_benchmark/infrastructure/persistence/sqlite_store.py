@@ -0,0 +1,194 @@
+"""SQLite 题库存储
+
+每道题一行，变更按题目增量 upsert。``status``、``category``、``last_attempt``
+建有索引，统计与导出可直接在数据库中过滤，无需把整个题库载入内存。
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from ...core.models import Question, QuestionEvent, QuestionStatus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    choices TEXT NOT NULL,
+    category TEXT,
+    correct_answer INTEGER,
+    wrong_answers TEXT NOT NULL DEFAULT '[]',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_attempt TEXT,
+    status TEXT NOT NULL,
+    ai_ranking TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_questions_status ON questions(status);
+CREATE INDEX IF NOT EXISTS idx_questions_category ON questions(category);
+CREATE INDEX IF NOT EXISTS idx_questions_last_attempt ON questions(last_attempt);
+"""
+
+_COLUMNS = (
+    "id",
+    "question",
+    "choices",
+    "category",
+    "correct_answer",
+    "wrong_answers",
+    "attempts",
+    "last_attempt",
+    "status",
+    "ai_ranking",
+)
+
+_UPSERT = (
+    f"INSERT INTO questions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "id")
+)
+
+
+def _status(data: Mapping[str, Any]) -> QuestionStatus:
+    if data.get("correct_answer") is not None:
+        return QuestionStatus.COMPLETE
+    return QuestionStatus.PARTIAL if data.get("wrong_answers") else QuestionStatus.UNKNOWN
+
+
+def _row(data: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """将 ``Question.model_dump(mode="json")`` 格式的字典转换为表中的一行"""
+    return (
+        data["id"],
+        data["question"],
+        json.dumps(data["choices"], ensure_ascii=False),
+        data.get("category"),
+        data.get("correct_answer"),
+        json.dumps(data.get("wrong_answers", [])),
+        data.get("attempts", 0),
+        data.get("last_attempt"),
+        _status(data).value,
+        json.dumps(data.get("ai_ranking", [])),
+    )
+
+
+def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    data = dict(row)
+    data.pop("status")
+    data["choices"] = json.loads(data["choices"])
+    data["wrong_answers"] = json.loads(data["wrong_answers"])
+    data["ai_ranking"] = json.loads(data["ai_ranking"])
+    return data
+
+
+class SQLiteQuestionStore:
+    """SQLite 题库存储
+
+    实现 ``IncrementalQuestionStore``（按题目 upsert）与 ``QuestionQuery``
+    （``count_by_status``/``iter_questions`` 下推到 SQL）。
+    """
+
+    def __init__(self, db_path: Path, migrate_from: Optional[Path] = None):
+        """初始化存储
+
+        Args:
+            db_path: 数据库文件路径
+            migrate_from: 数据库为空时从该 JSON 题库（``questions_raw.json`` 格式）导入
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(questions)")}
+        if "ai_ranking" not in columns:
+            self.conn.execute(
+                "ALTER TABLE questions ADD COLUMN ai_ranking TEXT NOT NULL DEFAULT '[]'"
+            )
+        if migrate_from is not None and migrate_from.exists() and not self._count():
+            with open(migrate_from, "r", encoding="utf-8") as f:
+                questions = json.load(f).get("questions", {})
+            self.save(questions)
+            logger.info(f"已从 {migrate_from} 导入 {len(questions)} 道题目到 {db_path}")
+
+    def _count(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0])
+
+    def _upsert(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        with self._lock, self.conn:
+            self.conn.executemany(_UPSERT, rows)
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM questions").fetchall()
+        return {row["id"]: _from_row(row) for row in rows}
+
+    def iter_load(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for row in self.conn.execute("SELECT * FROM questions"):
+            yield row["id"], _from_row(row)
+
+    def save(self, questions: Dict[str, Any]) -> None:
+        self._upsert(_row(q) for q in questions.values())
+
+    def apply(self, events: Sequence[QuestionEvent], questions: Mapping[str, Question]) -> None:
+        ids = dict.fromkeys(e.id for e in events)
+        self._upsert(_row(questions[qid].model_dump(mode="json")) for qid in ids)
+
+    def count_by_status(self) -> Dict[QuestionStatus, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM questions GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys(QuestionStatus, 0)
+        counts.update({QuestionStatus(status): n for status, n in rows})
+        return counts
+
+    def categories(self) -> Dict[Optional[str], int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT category, COUNT(*) FROM questions GROUP BY category"
+            ).fetchall()
+        return {category: n for category, n in rows}
+
+    def iter_questions(
+        self,
+        status: Optional[QuestionStatus] = None,
+        category: Optional[str] = None,
+        since: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Question]:
+        """按条件流式读取题目
+
+        Args:
+            status: 只返回该状态的题目
+            category: 只返回该分类的题目
+            since: 只返回最后作答时间不早于该时间的题目
+            batch_size: 每次从数据库读取的行数
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status.value)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if since is not None:
+            clauses.append("last_attempt >= ?")
+            params.append(since.isoformat())
+        sql = "SELECT * FROM questions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        # 分批读取，内存占用与结果集大小无关
+        cursor = self.conn.execute(sql + " ORDER BY id", params)
+        while rows := cursor.fetchmany(batch_size):
+            for row in rows:
+                yield Question.model_validate(_from_row(row))
+
+    def close(self) -> None:
+        self.conn.close()
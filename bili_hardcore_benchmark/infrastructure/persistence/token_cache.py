@@ -0,0 +1,94 @@
+"""登录凭证缓存
+
+每个账号槽位一个文件，内容为 Fernet 加密后的 ``LoginData`` JSON。
+密钥优先取自配置（``LOGIN_CACHE_KEY``）；未配置时在缓存目录生成仅当前用户可读的密钥文件。
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from loguru import logger
+from pydantic import ValidationError
+
+from ...core.models import LoginData
+
+_SLOT_FILE = re.compile(r"account_(\d+)\.bin")
+
+
+class EncryptedTokenCache:
+    """加密存储的登录凭证缓存"""
+
+    KEY_FILE = "cache.key"
+
+    def __init__(self, cache_dir: Path, key: str = ""):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            key: Fernet 密钥（urlsafe base64），为空时使用/生成目录内的密钥文件
+        """
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fernet = Fernet(key.encode() if key else self._load_or_create_key())
+
+    def _load_or_create_key(self) -> bytes:
+        key_path = self.cache_dir / self.KEY_FILE
+        if key_path.exists():
+            return key_path.read_bytes().strip()
+        key = Fernet.generate_key()
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def _path(self, slot: int) -> Path:
+        return self.cache_dir / f"account_{slot}.bin"
+
+    def load(self, slot: int = 0) -> Optional[LoginData]:
+        path = self._path(slot)
+        if not path.exists():
+            return None
+        try:
+            return LoginData.model_validate_json(self.fernet.decrypt(path.read_bytes()))
+        except (InvalidToken, ValidationError) as e:
+            logger.warning(f"登录缓存 {path} 无法解密或已损坏，忽略: {type(e).__name__}")
+            return None
+
+    def save(self, login: LoginData, slot: int = 0) -> None:
+        path = self._path(slot)
+        tmp = path.with_suffix(".tmp")
+        token = self.fernet.encrypt(login.model_dump_json().encode())
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(token)
+        os.replace(tmp, path)
+
+    def clear(self, slot: int = 0) -> None:
+        self._path(slot).unlink(missing_ok=True)
+
+    def load_all(self) -> Dict[int, LoginData]:
+        """读取所有槽位的凭证（无法解密的槽位被忽略）"""
+        logins = {}
+        for path in self.cache_dir.iterdir():
+            if (m := _SLOT_FILE.fullmatch(path.name)) and (login := self.load(int(m.group(1)))):
+                logins[int(m.group(1))] = login
+        return logins
+
+
+class MemoryTokenCache:
+    """只保存在内存中的登录凭证缓存，不写入任何文件（如回放录制文件时）"""
+
+    def __init__(self, logins: Optional[Dict[int, LoginData]] = None):
+        self._logins = dict(logins or {})
+
+    def load(self, slot: int = 0) -> Optional[LoginData]:
+        return self._logins.get(slot)
+
+    def save(self, login: LoginData, slot: int = 0) -> None:
+        self._logins[slot] = login
+
+    def clear(self, slot: int = 0) -> None:
+        self._logins.pop(slot, None)
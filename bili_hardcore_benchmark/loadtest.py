@@ -0,0 +1,234 @@
+"""本地压测：模拟服务器 + 并发答题会话
+
+用法::
+
+    # 单独启动模拟服务器，配合 BILIBILI_*_BASE_URL / OPENAI_BASE_URL 手动运行
+    uv run python -m bili_hardcore_benchmark.loadtest serve [--port 8765] [--latency 0.05]
+    # 在子进程中启动模拟服务器，以 N 个并发会话压测完整答题流程
+    uv run python -m bili_hardcore_benchmark.loadtest run -n 8 [--error-rate 0.05]
+
+``run`` 使用当前配置（节流、重试、流水线预测、存储后端等），只将接口地址
+指向模拟服务器、数据目录换成临时目录，并关闭 AI 缓存与登录缓存。报告每分钟
+答题数、各接口的 p50/p99 延迟（客户端观测，含重试前的失败请求）与每题 CPU 时间。
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import tempfile
+import time
+from collections import Counter, defaultdict
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+from .collector import run_sessions
+from .container import Container
+from .core.exceptions import APIError
+from .core.logging import setup_logging
+from .core.models import LoginData
+from .core.settings import Settings, get_settings
+from .infrastructure.bilibili.client import create_async_http_client
+from .infrastructure.bilibili.mock_server import QR_NOT_CONFIRMED, MockConfig, MockServer
+
+
+class TimingTransport(httpx.AsyncBaseTransport):
+    """记录每个接口的响应时间（含读取响应体）与失败次数（网关错误或非 0 错误码）"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+            await response.aread()
+        except Exception:
+            self.errors[path] += 1
+            raise
+        self.latencies[path].append(time.perf_counter() - start)
+        if response.status_code >= 500 or self._error_code(response.content):
+            self.errors[path] += 1
+        return response
+
+    @staticmethod
+    def _error_code(content: bytes) -> bool:
+        try:
+            return bool(json.loads(content).get("code"))
+        except (ValueError, AttributeError):
+            return True
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def report(self) -> List[str]:
+        lines = []
+        for path, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            p50 = ordered[len(ordered) // 2]
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            lines.append(
+                f"{path}: {len(ordered)} 次, p50 {p50 * 1000:.1f}ms, "
+                f"p99 {p99 * 1000:.1f}ms, 失败 {self.errors[path]}"
+            )
+        return lines
+
+
+class LoadTestContainer(Container):
+    """B站异步客户端经过 ``TimingTransport`` 的容器"""
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        self.timing: Optional[TimingTransport] = None
+
+    @cached_property
+    def async_http_client(self) -> httpx.AsyncClient:
+        def wrap(inner: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+            if self.cassette is not None:
+                inner = self.cassette.wrap_async(inner)
+            self.timing = TimingTransport(inner)
+            return self.timing
+
+        return create_async_http_client(
+            timeout=self.settings.bilibili_api_timeout,
+            max_connections=self.settings.bilibili_max_connections,
+            http2=self.settings.bilibili_http2,
+            wrap_transport=wrap,
+        )
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MockConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="延迟抖动均值（秒）")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="失败概率")
+    parser.add_argument(
+        "--throttle-rate", type=float, default=None, help="每账号每接口限流速率（请求/秒）"
+    )
+    parser.add_argument("--ai-latency", type=float, default=defaults.ai_latency)
+    parser.add_argument("--ai-accuracy", type=float, default=defaults.ai_accuracy)
+    parser.add_argument("--questions", type=int, default=defaults.questions, help="合成题库题目数")
+
+
+def mock_config(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        ai_latency=args.ai_latency,
+        ai_accuracy=args.ai_accuracy,
+        questions=args.questions,
+    )
+
+
+def _serve(config: MockConfig, port: int, ready: "multiprocessing.Queue[str]") -> None:
+    server = MockServer(config, port=port)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+async def mock_login(container: Container) -> LoginData:
+    """走一遍模拟服务器的扫码登录流程"""
+    client = container.async_auth_client
+    qr = await client.get_qrcode()
+    while True:
+        try:
+            return await client.poll_qrcode(qr.auth_code)
+        except APIError as e:
+            if e.code != QR_NOT_CONFIRMED:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def load_test(container: LoadTestContainer, sessions: int) -> None:
+    logins = [await mock_login(container) for _ in range(sessions)]
+    start, cpu = time.perf_counter(), time.process_time()
+    try:
+        stats = await run_sessions(container, logins)
+    finally:
+        await container.aclose()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    # 压测期间默认只输出错误，避免逐题日志影响 CPU 统计；报告恢复 INFO 级别输出
+    setup_logging(level="INFO")
+    questions = sum(s.questions for s in stats)
+    logger.info(
+        f"{sessions} 个会话, {questions} 题, 用时 {elapsed:.1f}s, "
+        f"{questions / elapsed * 60:.1f} 题/分钟, "
+        f"CPU {cpu / max(questions, 1) * 1000:.2f}ms/题"
+    )
+    if container.timing is not None:
+        for line in container.timing.report():
+            logger.info(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="B站答题接口模拟服务器与压测")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="启动模拟服务器")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(serve)
+    run = sub.add_parser("run", help="以并发答题会话压测模拟服务器")
+    run.add_argument("-n", "--sessions", type=int, default=4, help="并发会话数")
+    run.add_argument("--url", default=None, help="已启动的模拟服务器地址，缺省时自动启动")
+    run.add_argument("--max-questions", type=int, default=None, help="每个会话最多答题数")
+    run.add_argument("--log-level", default="ERROR")
+    add_mock_arguments(run)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = MockServer(mock_config(args), host=args.host, port=args.port)
+        logger.info(f"模拟服务器已启动: {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    process = None
+    url = args.url
+    if url is None:
+        ready: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_serve, args=(mock_config(args), 0, ready), daemon=True
+        )
+        process.start()
+        url = ready.get(timeout=30)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        overrides: Dict[str, Any] = {
+            "bilibili_api_base_url": url,
+            "bilibili_passport_base_url": url,
+            "bilibili_app_base_url": url,
+            "ai_backend": "openai",
+            "openai_base_url": f"{url}/v1",
+            "openai_api_key": "mock",
+            "ai_endpoints": [],
+            "ai_cache_enabled": False,
+            "login_cache_enabled": False,
+            "data_dir": Path(tmp),
+            "accounts": args.sessions,
+            "log_level": args.log_level,
+        }
+        if args.max_questions is not None:
+            overrides["max_questions"] = args.max_questions
+        settings: Settings = get_settings().model_copy(update=overrides)
+        container = LoadTestContainer(settings)
+        try:
+            asyncio.run(load_test(container, args.sessions))
+        finally:
+            container.close()
+            if process is not None:
+                process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""合并多台机器采集的题库
+
+用法::
+
+    uv run python -m bili_hardcore_benchmark.merge shard1.json shard2.json ... \\
+        -o merged.json [--force] [--conflicts merge_conflicts.jsonl] [-j 8]
+
+输出文件已存在时（包括正在使用的题库）需要 ``--force`` 才会覆盖。
+合并失败时以非零状态码退出。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+from .core.logging import setup_logging
+from .core.settings import get_settings
+from .infrastructure.persistence.shard_merge import ShardMerger
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="合并多台机器采集的 questions_raw.json")
+    parser.add_argument("shards", nargs="+", type=Path, help="各采集端的题库文件")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="合并结果输出路径")
+    parser.add_argument("--force", action="store_true", help="覆盖已存在的输出文件")
+    parser.add_argument(
+        "--conflicts",
+        type=Path,
+        default=settings.data_dir / "merge_conflicts.jsonl",
+        help="冲突报告输出路径（JSONL）",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument(
+        "--memory-mb", type=int, default=512, help="单个工作进程的内存预算（MiB），决定分区数量"
+    )
+    args = parser.parse_args()
+    setup_logging(level=settings.log_level, log_file=settings.log_file)
+
+    if args.output.exists():
+        if not args.force:
+            logger.error(f"{args.output} 已存在，确认覆盖请加 --force")
+            sys.exit(1)
+        logger.warning(f"{args.output} 已存在，将被合并结果覆盖")
+
+    try:
+        merger = ShardMerger(jobs=args.jobs, memory_budget_mb=args.memory_mb)
+        report = merger.merge(args.shards, args.output, args.conflicts)
+        logger.info(str(report))
+        if report.conflicts:
+            logger.warning(f"冲突明细见 {args.conflicts}")
+    except Exception as e:
+        logger.error(e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""离线答题模拟：在题库上比较收集策略
+
+用法::
+
+    uv run python -m bili_hardcore_benchmark.simulate [--runs 200] [--sessions 10]
+    # 比较不同的尝试顺序与安全分数线
+    uv run python -m bili_hardcore_benchmark.simulate --orders ai bayes first --thresholds 55 59
+"""
+
+import argparse
+
+from loguru import logger
+
+from .container import Container
+from .core.services.quiz_simulator import QuizSimulator, SimStrategy
+from .core.settings import get_settings
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="以题库为题目池模拟答题，比较收集策略")
+    parser.add_argument("--runs", type=int, default=200, help="独立运行数")
+    parser.add_argument("--sessions", type=int, default=10, help="每个运行的答题场数")
+    parser.add_argument(
+        "--max-questions", type=int, default=settings.max_questions, help="每场最多答题数"
+    )
+    parser.add_argument(
+        "--orders",
+        nargs="+",
+        choices=["ai", "bayes", "first"],
+        default=["ai", "bayes"],
+        help="未完成题目的尝试顺序",
+    )
+    parser.add_argument(
+        "--thresholds",
+        nargs="+",
+        type=int,
+        default=[settings.safety_threshold],
+        help="安全分数线",
+    )
+    parser.add_argument(
+        "--deliberate",
+        choices=["on", "off", "both"],
+        default="both",
+        help="已完成题目是否故意选错",
+    )
+    parser.add_argument("--cold", action="store_true", help="从空题库开始模拟")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    container = Container(settings)
+    try:
+        simulator = QuizSimulator(
+            list(container.benchmark_service.questions.values()),
+            cold_start=args.cold,
+            seed=args.seed,
+        )
+        deliberate = {"on": [True], "off": [False], "both": [True, False]}[args.deliberate]
+        for order in args.orders:
+            for threshold in args.thresholds:
+                for wrong in deliberate:
+                    name = f"{order}/{threshold}/{'故意选错' if wrong else '直接答对'}"
+                    report = simulator.run(
+                        SimStrategy(name, order=order, threshold=threshold, deliberate_wrong=wrong),
+                        runs=args.runs,
+                        sessions=args.sessions,
+                        max_questions=args.max_questions,
+                    )
+                    logger.info(str(report))
+    except Exception as e:
+        logger.error(e)
+    finally:
+        container.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import asyncio
+from pathlib import Path
+from typing import Any, List
+
+import httpx
+
+from bili_hardcore_benchmark.container import Container
+from bili_hardcore_benchmark.core.models import LoginData
+from bili_hardcore_benchmark.core.settings import Settings, get_settings
+from bili_hardcore_benchmark.infrastructure.ai.cached_provider import CachedAIProvider
+from bili_hardcore_benchmark.infrastructure.ai.provider import AIProviderBase
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import (
+    JSONQuestionStore,
+    MemoryQuestionStore,
+)
+from bili_hardcore_benchmark.infrastructure.persistence.token_cache import EncryptedTokenCache
+
+
+def _settings(data_dir: Path, mode: str, **update: Any) -> Settings:
+    return get_settings().model_copy(
+        update={
+            "data_dir": data_dir,
+            "cassette_mode": mode,
+            "question_store_backend": "json",
+            "write_behind": False,
+            "ai_cache_enabled": False,
+            **update,
+        }
+    )
+
+
+def test_replay_does_not_touch_live_store(tmp_path: Path) -> None:
+    live = JSONQuestionStore(tmp_path / "questions_raw.json")
+    live.save({})
+    container = Container(_settings(tmp_path, "record"))
+    service = container.benchmark_service
+    service.get_or_create_question("1", "录制前已有的题目", ["A", "B"])
+    container.close()
+    before = live.file_path.read_bytes()
+
+    # 录制开始时的题库作为快照，回放从快照出发
+    settings = _settings(tmp_path, "replay")
+    assert settings.cassette_strict
+    assert JSONQuestionStore(settings.cassette_snapshot_path).load() == {}
+    container = Container(settings)
+    assert isinstance(container.question_store, MemoryQuestionStore)
+    service = container.benchmark_service
+    assert "1" not in service.questions
+    service.get_or_create_question("2", "回放中的题目", ["A", "B"])
+    service.record_correct_answer("2", 1)
+    container.close()
+
+    assert live.file_path.read_bytes() == before
+
+
+class _NoModel(AIProviderBase):
+    def predict(self, question: str, choices: List[str]) -> int:
+        raise AssertionError("不应调用模型")
+
+
+def _login(token: str) -> LoginData:
+    return LoginData(
+        access_token=token, mid=1, cookie_info={"cookies": [{"name": "bili_jct", "value": "x"}]}
+    )
+
+
+def _account_info(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"code": 0, "data": {"mid": 1}})
+
+
+def _tokens(container: Container, slots: int) -> List[str]:
+    async def run() -> List[str]:
+        try:
+            return [(await container.auth_service.get_login(i)).access_token for i in range(slots)]
+        finally:
+            await container.aclose()
+
+    return asyncio.run(run())
+
+
+# 启用登录凭证与 AI 缓存，模型端点不会被实际调用
+_CACHES = {
+    "login_cache_enabled": True,
+    "ai_cache_enabled": True,
+    "ai_backend": "openai",
+    "openai_api_key": "test",
+    "ai_endpoints": [],
+}
+
+
+def test_replay_auth_uses_snapshot_of_live_caches(tmp_path: Path) -> None:
+    record = _settings(tmp_path, "record", **_CACHES)
+    tokens = EncryptedTokenCache(record.login_cache_dir, key=record.login_cache_key)
+    tokens.save(_login("token-0"), 0)
+    tokens.save(_login("token-1"), 1)
+    ai_cache = CachedAIProvider(_NoModel(), record.ai_cache_path)
+    ai_cache.put("recorded", [1, 0])
+    ai_cache.close()
+
+    # 录制时只校验了槽位 0 的凭证
+    container = Container(record)
+    assert container.cassette is not None
+    container.async_http_client = httpx.AsyncClient(
+        transport=container.cassette.wrap_async(httpx.MockTransport(_account_info))
+    )
+    container.ai_provider
+    assert _tokens(container, 1) == ["token-0"]
+    container.close()
+
+    # 录制之后真实缓存继续变化
+    tokens.save(_login("token-new"), 0)
+    ai_cache = CachedAIProvider(_NoModel(), record.ai_cache_path)
+    ai_cache.put("later", [0, 1])
+    ai_cache.close()
+    live_tokens = {p.name: p.read_bytes() for p in record.login_cache_dir.iterdir()}
+    live_ai_cache = record.ai_cache_path.read_bytes()
+
+    replay = _settings(tmp_path, "replay", **_CACHES)
+    container = Container(replay)
+    # 回放使用录制开始时的凭证，发出与录制时相同的校验请求；录制中没有的
+    # 校验请求（槽位 1）不会中断回放，沿用快照中的凭证
+    assert _tokens(container, 2) == ["token-0", "token-1"]
+    assert container.cassette is not None and container.cassette.exact == 1
+
+    cached = container.ai_provider
+    assert isinstance(cached, CachedAIProvider)
+    assert cached.get("recorded") == [1, 0]
+    assert cached.get("later") is None
+    cached.put("replayed", [0, 1])
+    container.close()
+
+    assert {p.name: p.read_bytes() for p in record.login_cache_dir.iterdir()} == live_tokens
+    assert record.ai_cache_path.read_bytes() == live_ai_cache
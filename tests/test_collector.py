@@ -0,0 +1,163 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from bili_hardcore_benchmark import collector
+from bili_hardcore_benchmark.collector import QuizSession
+from bili_hardcore_benchmark.core.models import BiliAnswer, BiliQuestion, BiliResult
+from bili_hardcore_benchmark.core.services.benchmark_service import BenchmarkService
+from bili_hardcore_benchmark.core.services.prediction_service import SpeculativePredictor
+from bili_hardcore_benchmark.core.services.quiz_service import QuizService
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import (
+    MemoryQuestionStore,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeSenior:
+    """按顺序返回预设分数的结果接口"""
+
+    def __init__(self, scores: List[int]) -> None:
+        self.scores = scores
+        self.calls = 0
+
+    async def get_result(self) -> BiliResult:
+        score = self.scores[min(self.calls, len(self.scores) - 1)]
+        self.calls += 1
+        return BiliResult(score=score)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(collector, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(collector, "asyncio", SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def _session(scores: List[int], polls: int = 2) -> QuizSession:
+    session = QuizSession.__new__(QuizSession)
+    session.settings = SimpleNamespace(
+        result_min_delay=0.5, result_confirm_polls=polls, result_confirm_delay=1.0
+    )
+    session.senior = FakeSenior(scores)
+    return session
+
+
+def _fetch(session: QuizSession, score: int, submitted: float) -> BiliResult:
+    return asyncio.run(session._fetch_result(score, submitted))
+
+
+def test_waits_min_delay_after_submit(clock: FakeClock) -> None:
+    session = _session([11])
+    assert _fetch(session, 10, clock.now - 0.2).score == 11
+    assert clock.sleeps == [pytest.approx(0.3)]
+    assert session.senior.calls == 1
+
+
+def test_no_wait_when_min_delay_already_passed(clock: FakeClock) -> None:
+    session = _session([11])
+    _fetch(session, 10, clock.now - 5.0)
+    assert clock.sleeps == []
+
+
+def test_repolls_until_score_changes(clock: FakeClock) -> None:
+    # 服务端尚未处理提交：第一次读到的分数未变
+    session = _session([10, 11, 12])
+    assert _fetch(session, 10, clock.now).score == 11
+    assert clock.sleeps == [0.5, 1.0]
+    assert session.senior.calls == 2
+
+
+def test_gives_up_after_confirm_polls(clock: FakeClock) -> None:
+    session = _session([10], polls=2)
+    start = clock.now
+    assert _fetch(session, 10, start).score == 10
+    assert session.senior.calls == 3
+    assert clock.now - start == pytest.approx(0.5 + 2 * 1.0)
+
+
+class FakeAI:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def predict(self, question: str, choices: List[str]) -> int:
+        return 0
+
+    def rank(self, question: str, choices: List[str]) -> List[int]:
+        self.calls += 1
+        return list(range(len(choices)))
+
+
+class FakeQuizSenior:
+    """每次出一道新题，选项 0 总是正确答案"""
+
+    pacer = None
+
+    def __init__(self) -> None:
+        self.questions = 0
+        self.score = 0
+
+    async def get_question(self) -> BiliQuestion:
+        self.questions += 1
+        answers = [BiliAnswer(ans_text=f"{self.questions}-{i}", ans_hash=str(i)) for i in range(4)]
+        return BiliQuestion(
+            id=self.questions, question=f"题目 {self.questions}", answers=answers, question_num=1
+        )
+
+    async def submit_answer(self, qid: int, ans_hash: str, ans_text: str) -> None:
+        if ans_hash == "0":
+            self.score += 1
+
+    async def get_result(self) -> BiliResult:
+        # 模拟网络往返，让已发起的预取任务有机会执行
+        await asyncio.sleep(0)
+        return BiliResult(score=self.score)
+
+
+def _pipeline_session(max_questions: int, threshold: int) -> tuple[QuizSession, FakeAI]:
+    ai = FakeAI()
+    benchmark = BenchmarkService(MemoryQuestionStore())
+    session = QuizSession.__new__(QuizSession)
+    session.settings = SimpleNamespace(
+        max_questions=max_questions,
+        safety_threshold=threshold,
+        session_max_failures=3,
+        result_min_delay=0,
+        result_confirm_polls=0,
+        result_confirm_delay=0,
+    )
+    session.senior = FakeQuizSenior()
+    session.quiz, session.benchmark = QuizService(ai, answer_index=benchmark), benchmark
+    session.stats = collector.SessionStats(name="test")
+    session.category_scores = {}
+    session._resync = False
+    session.predictor = SpeculativePredictor(ai)
+    session._next_question = None
+    return session, ai
+
+
+@pytest.mark.parametrize("max_questions, threshold", [(3, 100), (10, 2)])
+def test_pipeline_does_not_prefetch_unanswered_question(max_questions: int, threshold: int) -> None:
+    # 最后一题或分数达到阈值后不再预取：不会多取题目、多建记录或多发 AI 请求
+    session, ai = _pipeline_session(max_questions, threshold)
+    stats = asyncio.run(session.run())
+    answered = min(max_questions, threshold)
+    assert stats.questions == stats.correct == answered
+    assert session.senior.questions == answered
+    assert len(session.benchmark.questions) == answered
+    assert ai.calls == answered
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from bili_hardcore_benchmark.core.columnar import ColumnarBenchmark
+from bili_hardcore_benchmark.core.models import Benchmark, QuestionStatus
+from bili_hardcore_benchmark.core.services.benchmark_service import BenchmarkService
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import JSONQuestionStore
+
+
+def _json_store(path: Path) -> JSONQuestionStore:
+    store = JSONQuestionStore(path)
+    service = BenchmarkService(store, write_behind=False)
+    service.get_or_create_question("1", "题目一", ["是", "否"])
+    service.get_or_create_question("2", "题目二", ["是", "否"])
+    service.get_or_create_question("3", "题目三", ["A", "B", "C", "D"])
+    service.record_correct_answer("1", 1, category="知识")
+    # JSON 存储不单独保存排序，随之后的作答一起写入
+    service.record_ranking("3", [2, 1])
+    service.record_wrong_answer("3", 0)
+    service.record_wrong_answer("3", 3)
+    service.close()
+    return store
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    store = _json_store(tmp_path / "questions_raw.json")
+    raw = store.load()
+
+    benchmark = ColumnarBenchmark(raw.items())
+    assert benchmark.dump_questions() == raw
+    # 重复的选项组合只存一份
+    assert benchmark.questions.choices[0] is benchmark.questions.choices[1]
+
+    reference = Benchmark(questions=raw)
+    assert benchmark.count_by_status() == reference.count_by_status()
+    for status in QuestionStatus:
+        assert [q.model_dump() for q in benchmark.iter_questions(status=status)] == [
+            q.model_dump() for q in reference.iter_questions(status=status)
+        ]
+
+
+def test_service_saves_columnar_state(tmp_path: Path) -> None:
+    path = tmp_path / "questions_raw.json"
+    raw = _json_store(path).load()
+
+    service = BenchmarkService(JSONQuestionStore(path), columnar=True)
+    assert service.questions["3"].wrong_answers == [0, 3]
+    service.record_correct_answer("2", 0, category="知识")
+    service.close()
+
+    raw["2"] = JSONQuestionStore(path).load()["2"]
+    assert raw["2"]["correct_answer"] == 0
+    assert JSONQuestionStore(path).load() == raw
+
+
+def test_delete_keeps_order_and_rankings(tmp_path: Path) -> None:
+    raw = _json_store(tmp_path / "questions_raw.json").load()
+    questions = ColumnarBenchmark(raw.items()).questions
+
+    del questions["1"]
+    assert list(questions) == ["2", "3"]
+    assert "1" not in questions
+    assert questions["3"].ai_ranking == [2, 1]
+    assert questions.dump(1) == raw["3"]
+    with pytest.raises(KeyError):
+        del questions["1"]
+
+    questions["1"] = Benchmark(questions={"1": raw["1"]}).questions["1"]
+    assert list(questions) == ["2", "3", "1"]
+    assert questions.dump(2) == raw["1"]
+
+
+def test_load_failure_is_raised(tmp_path: Path) -> None:
+    path = tmp_path / "questions_raw.json"
+    path.write_text('{"questions": {"1": ', encoding="utf-8")
+
+    # 不能以空题库继续运行，否则下一次保存会覆盖原文件
+    for columnar in (False, True):
+        with pytest.raises(ValueError):
+            BenchmarkService(JSONQuestionStore(path), columnar=columnar)
+    assert path.read_text(encoding="utf-8") == '{"questions": {"1": '
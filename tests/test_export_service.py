@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from bili_hardcore_benchmark.core.services.benchmark_service import BenchmarkService
+from bili_hardcore_benchmark.core.services.export_service import ExportResult, ExportService
+from bili_hardcore_benchmark.infrastructure.persistence.exporters import (
+    HuggingFaceExporter,
+    JSONLExporter,
+)
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import JSONQuestionStore
+
+datasets = pytest.importorskip("datasets")
+
+
+class _Export:
+    def __init__(self, tmp_path: Path, service: BenchmarkService, max_shards: int = 32) -> None:
+        self.service = service
+        self.exporter = ExportService(HuggingFaceExporter(), JSONLExporter(), max_shards)
+        self.output_dir = tmp_path / "benchmark_v1"
+        self.output_file = tmp_path / "benchmark_v1.jsonl"
+        self.manifest = tmp_path / "benchmark_v1.manifest.json"
+
+    def __call__(self, full: bool = False) -> ExportResult:
+        return self.exporter.export_incremental(
+            self.service.benchmark,
+            self.output_dir,
+            self.output_file,
+            self.manifest,
+            "v1",
+            full=full,
+        )
+
+    def jsonl(self) -> Dict[str, dict]:
+        lines = self.output_file.read_text(encoding="utf-8").splitlines()
+        return {r["id"]: r for r in map(json.loads, lines)}
+
+    def hf_rows(self) -> int:
+        return len(datasets.load_from_disk(str(self.output_dir))["train"])
+
+
+def _solve(service: BenchmarkService, qid: str, answer: int = 0) -> None:
+    service.get_or_create_question(qid, f"题目{qid}", ["A", "B", "C"])
+    service.record_correct_answer(qid, answer)
+
+
+@pytest.fixture
+def export(tmp_path: Path) -> _Export:
+    service = BenchmarkService(JSONQuestionStore(tmp_path / "questions_raw.json"))
+    for i in range(5):
+        _solve(service, str(i))
+    service.get_or_create_question("partial", "未完成的题目", ["A", "B"])
+    return _Export(tmp_path, service)
+
+
+def test_unchanged_and_append(export: _Export) -> None:
+    assert export() == ExportResult("rewrite", 5, 5)
+    assert export() == ExportResult("unchanged", 0, 5)
+
+    _solve(export.service, "5")
+    _solve(export.service, "6")
+    assert export() == ExportResult("append", 2, 7)
+    assert set(export.jsonl()) == {str(i) for i in range(7)}
+    assert export.hf_rows() == 7
+    assert export() == ExportResult("unchanged", 0, 7)
+
+
+def test_category_change_without_new_attempt_rewrites(export: _Export) -> None:
+    export()
+    # 补充分类不修改作答时间
+    export.service.get_or_create_question("3", "题目3", ["A", "B", "C"], category="知识")
+    assert export() == ExportResult("rewrite", 5, 5)
+    assert export.jsonl()["3"]["category"] == "知识"
+    assert export() == ExportResult("unchanged", 0, 5)
+
+
+def test_older_merged_change_rewrites(export: _Export) -> None:
+    export()
+    # 合并进来的题库修改了答案，作答时间早于上次导出
+    q = export.service.questions["1"]
+    q.correct_answer = 2
+    q.last_attempt = datetime.now() - timedelta(days=30)
+    export.service.questions["1"] = q
+    assert export() == ExportResult("rewrite", 5, 5)
+    assert export.jsonl()["1"]["answer"] == 2
+    assert export.hf_rows() == 5
+
+
+def test_removed_question_and_shard_limit_rewrite(tmp_path: Path, export: _Export) -> None:
+    export()
+    del export.service.questions["4"]
+    assert export() == ExportResult("rewrite", 4, 4)
+
+    limited = _Export(tmp_path, export.service, max_shards=1)
+    _solve(export.service, "9")
+    assert limited() == ExportResult("rewrite", 5, 5)
+    assert export.hf_rows() == 5
+
+
+def test_old_manifest_fields_are_ignored(export: _Export) -> None:
+    export()
+    data = json.loads(export.manifest.read_text(encoding="utf-8"))
+    data.update(watermark="2024-01-01T00:00:00", content_hash="x")
+    export.manifest.write_text(json.dumps(data), encoding="utf-8")
+    assert export() == ExportResult("unchanged", 0, 5)
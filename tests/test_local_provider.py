@@ -0,0 +1,110 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+from bili_hardcore_benchmark.infrastructure.ai.local_provider import (  # noqa: E402
+    LocalLMProvider,
+)
+
+BATCH = [
+    ("天空是什么颜色", ["蓝色", "绿色的草地", "红"]),
+    ("1+1等于几", ["2", "三", "十一个苹果", "0"]),
+    ("哪一个是水果", ["苹果", "石头"]),
+]
+
+
+def _tiny_model(path: Path, model_type: str) -> Path:
+    """随机初始化的小模型与字节级 BPE 分词器，离线构建"""
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+
+    tok = Tokenizer(models.BPE())
+    tok.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tok.decoder = decoders.ByteLevel()
+    corpus = [LocalLMProvider.PROMPT_TEMPLATE] + [q + "".join(c) for q, c in BATCH]
+    trainer = trainers.BpeTrainer(
+        vocab_size=300, initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    )
+    tok.train_from_iterator(corpus, trainer)
+    transformers.PreTrainedTokenizerFast(tokenizer_object=tok).save_pretrained(path)
+
+    vocab = tok.get_vocab_size()
+    if model_type == "gpt2":
+        config = transformers.GPT2Config(
+            vocab_size=vocab, n_embd=32, n_layer=2, n_head=4, n_positions=256
+        )
+    else:
+        config = transformers.AutoConfig.for_model(
+            model_type,
+            vocab_size=vocab,
+            hidden_size=32,
+            intermediate_size=64,
+            num_hidden_layers=2,
+            num_attention_heads=4,
+            num_key_value_heads=2,
+            max_position_embeddings=256,
+        )
+    torch.manual_seed(0)
+    transformers.AutoModelForCausalLM.from_config(config).save_pretrained(path)
+    return path
+
+
+def _naive_scores(provider: LocalLMProvider, question: str, choices: list[str]) -> list[float]:
+    """逐个选项对“前缀 + 续写”完整前向计算"""
+    prefix = provider._encode(provider.build_prompt(question, choices))
+    scores = []
+    for choice in choices:
+        cont = provider._encode(choice) or [0]
+        with torch.inference_mode():
+            logits = provider._model(input_ids=torch.tensor([prefix + cont])).logits[0]
+        logp = torch.log_softmax(logits, dim=-1)
+        total = sum(logp[len(prefix) - 1 + i, t].item() for i, t in enumerate(cont))
+        scores.append(total / len(cont) if provider.normalize else total)
+    return scores
+
+
+@pytest.fixture(scope="module", params=["gpt2", "qwen2", "llama"])
+def model_dir(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _tiny_model(tmp_path_factory.mktemp(request.param), request.param)
+
+
+@pytest.mark.parametrize("normalize", [True, False])
+def test_batched_scores_match_naive(model_dir: Path, normalize: bool) -> None:
+    provider = LocalLMProvider(str(model_dir), normalize=normalize)
+    # 前缀长度不同的题目合并为一批，覆盖右侧填充与 KV 缓存复制
+    batched = provider.score(BATCH)
+    for (question, choices), scores in zip(BATCH, batched):
+        assert scores == pytest.approx(_naive_scores(provider, question, choices), abs=1e-4)
+
+
+def test_rank_and_close(model_dir: Path) -> None:
+    provider = LocalLMProvider(str(model_dir), batch_wait=0.05)
+    results: dict[int, list[int]] = {}
+
+    def rank(i: int) -> None:
+        results[i] = provider.rank(*BATCH[i])
+
+    threads = [threading.Thread(target=rank, args=(i,)) for i in range(len(BATCH))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for i, (question, choices) in enumerate(BATCH):
+        scores = _naive_scores(provider, question, choices)
+        assert sorted(results[i]) == list(range(len(choices)))
+        assert results[i][0] == max(range(len(choices)), key=lambda c: scores[c])
+
+    worker = provider._worker
+    assert worker is not None and worker.is_alive()
+    provider.close()
+    assert not worker.is_alive()
+    provider.close()
+
+    # 关闭后再次请求会重新启动后台线程
+    assert provider.predict(*BATCH[2]) in (0, 1)
+    provider.close()
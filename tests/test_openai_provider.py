@@ -0,0 +1,90 @@
+from typing import List, Tuple
+
+import pytest
+
+from bili_hardcore_benchmark.infrastructure.ai.openai_provider import AnswerFormat, OpenAIProvider
+
+
+class _References:
+    def __init__(self) -> None:
+        self.items: List[Tuple[str, str, float]] = []
+        self.calls = 0
+
+    def references(self, question: str, k: int) -> List[Tuple[str, str, float]]:
+        self.calls += 1
+        return self.items[:k]
+
+
+@pytest.mark.parametrize("answer_format", ["text", "compact", "json"])
+def test_cache_key_ignores_reference_block(answer_format: AnswerFormat) -> None:
+    refs = _References()
+    provider = OpenAIProvider(
+        "http://127.0.0.1:1/v1",
+        "test",
+        "model",
+        answer_format=answer_format,
+        references=refs,
+    )
+    key = provider.cache_key("题目", ["A", "B"])
+    assert refs.calls == 0
+
+    # 题库增长后检索到新的参考题目：请求内容变化，缓存键不变
+    refs.items.append(("相似题目", "A", 0.9))
+    assert "相似题目" in str(provider.request_body("题目", ["A", "B"]))
+    assert provider.cache_key("题目", ["A", "B"]) == key
+    assert provider.cache_key("题目", ["A", "C"]) != key
+
+    # 检索配置与是否启用检索仍会使缓存失效
+    provider.reference_k = 5
+    assert provider.cache_key("题目", ["A", "B"]) != key
+    provider.references = None
+    assert provider.cache_key("题目", ["A", "B"]) != key
+
+
+def _provider(answer_format: AnswerFormat = "text") -> OpenAIProvider:
+    return OpenAIProvider("http://127.0.0.1:1/v1", "test", "model", answer_format=answer_format)
+
+
+def _choice(content: str, first_token: str = "", top: Tuple[str, ...] = ()) -> dict:
+    choice: dict = {"message": {"content": content}}
+    if first_token:
+        top_logprobs = [{"token": t, "logprob": -float(i)} for i, t in enumerate(top)]
+        choice["logprobs"] = {"content": [{"token": first_token, "top_logprobs": top_logprobs}]}
+    return choice
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("3,1,2,4", [2, 0, 1, 3]),
+        ("回答：3,1,2,4", [2, 0, 1, 3]),
+        # 先出现的编号被否定，答案在后
+        ("选项1不对，正确答案是3", [2, 0, 1, 3]),
+        ("答案是 2。选项 1 与 4 明显错误", [1, 0, 3, 2]),
+        # 没有明确的答案表述时以最后出现的编号为答案
+        ("排除 1 和 2 之后，只剩 4", [3, 0, 1, 2]),
+        ("无法判断", None),
+    ],
+)
+def test_parse_ranking_text(content: str, expected: List[int]) -> None:
+    assert _provider().parse_ranking(_choice(content), 4) == expected
+
+
+@pytest.mark.parametrize(
+    "answer_format, content",
+    [("compact", "2,4,1,3"), ("json", '{"ranking": [2, 4, 1, 3]}')],
+)
+def test_parse_ranking_structured(answer_format: AnswerFormat, content: str) -> None:
+    provider = _provider(answer_format)
+    assert provider.parse_ranking(_choice(content), 4) == [1, 3, 0, 2]
+    # 首个编号位置的概率分布决定前几名，其余按文本补全
+    choice = _choice(content, "2", ("4", "2", "x"))
+    assert provider.parse_ranking(choice, 4) == [3, 1, 0, 2]
+
+
+def test_parse_ranking_ignores_logprobs_of_rejected_choice() -> None:
+    # 首个编号是被否定的选项，其概率分布与答案无关
+    choice = _choice("选项1不对，正确答案是3", "1", ("1", "2"))
+    assert _provider().parse_ranking(choice, 4) == [2, 0, 1, 3]
+    choice = _choice("3,1,2,4", "3", ("2", "3"))
+    assert _provider().parse_ranking(choice, 4) == [1, 2, 0, 3]
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from bili_hardcore_benchmark.infrastructure.bilibili import pacing
+from bili_hardcore_benchmark.infrastructure.bilibili.pacing import AdaptivePacer, TokenBucket
+
+
+class FakeClock:
+    """``time.monotonic`` 与 ``asyncio.sleep`` 的替身：sleep 只推进时钟"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(pacing, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(pacing, "asyncio", SimpleNamespace(sleep=clock.sleep, Lock=asyncio.Lock))
+    return clock
+
+
+def _acquire(bucket: TokenBucket, n: int = 1) -> None:
+    async def run() -> None:
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(run())
+
+
+def test_burst_then_paced(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    _acquire(bucket, 3)
+    assert clock.sleeps == []
+    _acquire(bucket)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_refill_is_capped_at_burst(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    _acquire(bucket, 3)
+    clock.now += 1.0
+    _acquire(bucket, 2)
+    assert clock.sleeps == []
+
+    # 长时间空闲后也只能突发 burst 个请求
+    clock.now += 100.0
+    _acquire(bucket, 4)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_throttle_backs_off_exponentially(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=4.0, burst=1.0, min_rate=1.0, backoff_base=1.0, backoff_max=3.0)
+    assert bucket.on_throttle() == 1.0
+    assert bucket.rate == 2.0
+
+    # 退避期间暂停该接口，之后按降低后的速率发放令牌
+    start = clock.now
+    _acquire(bucket, 2)
+    assert clock.now - start == pytest.approx(1.0 + 1 / 2.0)
+
+    assert bucket.on_throttle() == 2.0
+    assert bucket.on_throttle() == 3.0
+    assert bucket.rate == 1.0
+
+
+def test_success_resets_backoff_and_recovers_rate(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2.0, max_rate=2.5, increase=0.2, backoff_base=1.0)
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 0.5
+    bucket.on_success()
+    assert bucket.on_throttle() == 1.0
+
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate == 2.5
+
+
+def test_pacer_reports_per_endpoint(clock: FakeClock) -> None:
+    pacer = AdaptivePacer(rate=2.0, backoff_base=1.0)
+    assert pacer.report("/submit", -412) == 1.0
+    assert pacer.report("/submit", -412) == 2.0
+    assert pacer.report("/question", 0) is None
+    assert pacer.bucket("/submit").rate == 0.5
+    assert pacer.bucket("/question").rate == pytest.approx(2.1)
+    assert not pacer.is_throttle(-500)
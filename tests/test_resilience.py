@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+
+from bili_hardcore_benchmark.core.exceptions import APIError, CircuitOpenError, TransientAPIError
+from bili_hardcore_benchmark.infrastructure.bilibili import resilience
+from bili_hardcore_benchmark.infrastructure.bilibili.resilience import (
+    CircuitBreaker,
+    RequestGuard,
+    RetryPolicy,
+)
+
+ENDPOINT = "/x/senior/v1/answer/submit"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=clock.monotonic))
+    # 退避固定取抖动区间上限，便于断言截止时间
+    monkeypatch.setattr(resilience, "random", SimpleNamespace(uniform=lambda low, high: high))
+    return clock
+
+
+def _guard(**policy: Any) -> RequestGuard:
+    return RequestGuard(
+        RetryPolicy(base_delay=1.0, max_delay=1.0, **policy),
+        failure_threshold=2,
+        reset_timeout=30.0,
+    )
+
+
+def _read_timeout() -> httpx.ReadTimeout:
+    return httpx.ReadTimeout("timed out")
+
+
+def _connect_error() -> httpx.ConnectError:
+    return httpx.ConnectError("refused")
+
+
+def test_breaker_opens_after_threshold(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0, probe_timeout=10.0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 12.0
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call(ENDPOINT)
+    assert info.value.retry_after == pytest.approx(18.0)
+
+
+def test_breaker_half_open_allows_single_probe(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, probe_timeout=10.0)
+    breaker.record_failure()
+    clock.now += 30.0
+    assert breaker.state == "half_open"
+
+    breaker.before_call(ENDPOINT)
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call(ENDPOINT)
+    assert info.value.retry_after == 10.0
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call(ENDPOINT)
+
+
+def test_breaker_reopens_when_probe_fails(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0, probe_timeout=10.0)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30.0
+    breaker.before_call(ENDPOINT)
+
+    # 探测失败立即重新打开，不必再累积 failure_threshold 次
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opened_at == clock.now
+
+
+def test_success_resets_failure_count(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_idempotent_request_retries_transient_errors() -> None:
+    policy = RetryPolicy()
+    assert policy.is_safe_to_retry(_read_timeout(), idempotent=True)
+    assert policy.is_safe_to_retry(APIError("busy", -503), idempotent=True)
+    assert not policy.is_safe_to_retry(APIError("bad answer", 41103), idempotent=True)
+
+
+def test_non_idempotent_request_retries_only_unsent_errors() -> None:
+    policy = RetryPolicy()
+    # 读超时时提交可能已被处理，重放会重复作答
+    assert not policy.is_safe_to_retry(_read_timeout(), idempotent=False)
+    assert not policy.is_safe_to_retry(APIError("busy", -503), idempotent=False)
+    assert policy.is_safe_to_retry(_connect_error(), idempotent=False)
+    assert policy.is_safe_to_retry(APIError("throttled", -412), idempotent=False)
+
+
+def test_guard_does_not_replay_ambiguous_submit(clock: FakeClock) -> None:
+    guard = _guard()
+    deadline = guard.deadline()
+    with pytest.raises(TransientAPIError):
+        guard.on_failure(ENDPOINT, _read_timeout(), 1, deadline, idempotent=False)
+    assert guard.on_failure(ENDPOINT, _connect_error(), 1, deadline, idempotent=False) == 1.0
+
+
+def test_guard_stops_at_max_attempts(clock: FakeClock) -> None:
+    guard = _guard(max_attempts=2)
+    deadline = guard.deadline()
+    assert guard.on_failure(ENDPOINT, _read_timeout(), 1, deadline, idempotent=True) == 1.0
+    with pytest.raises(TransientAPIError):
+        guard.on_failure(ENDPOINT, _read_timeout(), 2, deadline, idempotent=True)
+
+
+def test_guard_stops_when_backoff_exceeds_deadline(clock: FakeClock) -> None:
+    guard = _guard(total_budget=5.0)
+    deadline = guard.deadline()
+    clock.now += 4.5
+    with pytest.raises(TransientAPIError):
+        guard.on_failure(ENDPOINT, _read_timeout(), 1, deadline, idempotent=True)
+    # 剩余时间不足单次超时时，本次尝试的超时被截短
+    guard.breaker(ENDPOINT).record_success()
+    assert guard.before_attempt(ENDPOINT, deadline) == pytest.approx(0.5)
+
+
+def test_guard_reraises_business_errors_without_tripping(clock: FakeClock) -> None:
+    guard = _guard()
+    deadline = guard.deadline()
+    guard.on_failure(ENDPOINT, _read_timeout(), 1, deadline, idempotent=True)
+    error = APIError("bad answer", 41103)
+    with pytest.raises(APIError) as info:
+        guard.on_failure(ENDPOINT, error, 2, deadline, idempotent=True)
+    assert info.value is error
+    assert guard.breaker(ENDPOINT).failures == 0
+
+
+def test_guard_opens_breaker_on_repeated_transient_failures(clock: FakeClock) -> None:
+    guard = _guard()
+    for _ in range(2):
+        with pytest.raises(TransientAPIError):
+            guard.on_failure(ENDPOINT, _read_timeout(), 1, guard.deadline(), idempotent=False)
+    with pytest.raises(CircuitOpenError):
+        guard.before_attempt(ENDPOINT, guard.deadline())
+
+
+def test_throttle_codes_do_not_trip_breaker(clock: FakeClock) -> None:
+    # 一个账号被限流不应熔断所有会话共享的接口
+    guard = _guard(max_attempts=1)
+    for code in (-412, -509, -799, -412):
+        with pytest.raises(TransientAPIError):
+            guard.on_failure(ENDPOINT, APIError("throttled", code), 1, guard.deadline(), True)
+    assert guard.breaker(ENDPOINT).state == "closed"
+    guard.before_attempt(ENDPOINT, guard.deadline())
@@ -0,0 +1,60 @@
+import threading
+from typing import List
+
+from bili_hardcore_benchmark.core.models import Question
+from bili_hardcore_benchmark.core.services.selection_policy import BayesianPolicy
+
+
+class _SlowHistory:
+    """调用方放行前一直阻塞的已完成题目来源"""
+
+    def __init__(self, questions: List[Question]) -> None:
+        self.questions = questions
+        self.release = threading.Event()
+        self.calls = 0
+
+    def completed_questions(self) -> List[Question]:
+        self.calls += 1
+        self.release.wait(timeout=10)
+        return self.questions
+
+
+def _solved(i: int, answer: int) -> Question:
+    return Question(
+        id=str(i),
+        question=f"题目{i}",
+        choices=["A", "B", "C", "D"],
+        category="知识",
+        correct_answer=answer,
+        ai_ranking=[3, 2, 1, 0],
+    )
+
+
+def test_tables_refresh_in_background() -> None:
+    # 正确答案总在位置 0，而 AI 总把它排在末位
+    history = _SlowHistory([_solved(i, 0) for i in range(200)])
+    policy = BayesianPolicy(history, prior_strength=1.0, refresh_interval=300)
+    q = Question(id="new", question="新题", choices=["A", "B", "C", "D"], category="知识")
+    q.ai_ranking = [3, 2, 1, 0]
+
+    # 统计量算出之前不阻塞，只有先验：按 AI 排序
+    assert policy.order(q) == [3, 2, 1, 0]
+    refreshing = policy._refreshing
+    assert refreshing is not None
+    assert policy.order(q) == [3, 2, 1, 0]
+
+    history.release.set()
+    refreshing.join(timeout=10)
+    assert policy.order(q)[0] == 0
+    assert history.calls == 1
+
+    # 未过期时不重新计算
+    policy.order(q)
+    assert policy._refreshing is None and history.calls == 1
+
+
+def test_refresh_is_synchronous() -> None:
+    history = _SlowHistory([_solved(i, 0) for i in range(50)])
+    history.release.set()
+    tables = BayesianPolicy(history).refresh()
+    assert tables.categories == {"知识": 0}
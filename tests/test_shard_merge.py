@@ -0,0 +1,117 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+from bili_hardcore_benchmark import merge
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import JSONQuestionStore
+from bili_hardcore_benchmark.infrastructure.persistence.shard_merge import ShardMerger
+
+
+def _record(
+    qid: str,
+    last_attempt: str,
+    correct_answer: Optional[int] = None,
+    wrong_answers: tuple[int, ...] = (),
+    category: Optional[str] = None,
+    choices: tuple[str, ...] = ("A", "B", "C"),
+) -> Dict[str, Any]:
+    return {
+        "id": qid,
+        "question": f"题目{qid}",
+        "choices": list(choices),
+        "category": category,
+        "correct_answer": correct_answer,
+        "wrong_answers": list(wrong_answers),
+        "attempts": 1 + len(wrong_answers),
+        "last_attempt": last_attempt,
+        "ai_ranking": [],
+    }
+
+
+def _shard(path: Path, *records: Dict[str, Any]) -> Path:
+    JSONQuestionStore(path).save({r["id"]: r for r in records})
+    return path
+
+
+@pytest.fixture
+def shards(tmp_path: Path) -> list[Path]:
+    a = _shard(
+        tmp_path / "a.json",
+        _record("1", "2024-01-01T10:00:00", correct_answer=0, category="历史"),
+        _record("2", "2024-01-01T10:00:00", wrong_answers=(1,)),
+        _record("3", "2024-01-02T10:00:00", wrong_answers=(0,), category="知识"),
+        _record("4", "2024-01-01T10:00:00"),
+    )
+    b = _shard(
+        tmp_path / "b.json",
+        _record("1", "2024-01-03T10:00:00", correct_answer=2),
+        _record("2", "2024-01-02T10:00:00", correct_answer=1),
+        _record("3", "2024-01-01T10:00:00", wrong_answers=(2,)),
+        _record("5", "2024-01-01T10:00:00", choices=("是", "否")),
+    )
+    c = _shard(
+        tmp_path / "c.json",
+        _record("5", "2024-01-02T10:00:00", choices=("否", "是")),
+    )
+    return [a, b, c]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_merge_resolves_conflicts(tmp_path: Path, shards: list[Path], jobs: int) -> None:
+    output, conflicts_path = tmp_path / "merged.json", tmp_path / "conflicts.jsonl"
+    report = ShardMerger(jobs=jobs).merge(shards, output, conflicts_path)
+
+    assert (report.shards, report.records, report.questions) == (3, 9, 5)
+    assert report.conflict_kinds == {"correct_answer": 1, "correct_in_wrong": 1, "choices": 1}
+
+    merged = JSONQuestionStore(output).load()
+    assert set(merged) == {"1", "2", "3", "4", "5"}
+    # 不同的正确答案保留最新结果；分类取最新一次记录的分类
+    assert merged["1"]["correct_answer"] == 2
+    assert merged["1"]["category"] == "历史"
+    assert merged["1"]["attempts"] == 2
+    # 正确答案不会同时出现在错误答案中
+    assert merged["2"]["correct_answer"] == 1
+    assert merged["2"]["wrong_answers"] == []
+    # 错误答案取并集
+    assert merged["3"]["wrong_answers"] == [0, 2]
+    assert merged["3"]["last_attempt"] == "2024-01-02T10:00:00"
+    assert merged["5"]["choices"] == ["否", "是"]
+
+    conflicts = [json.loads(line) for line in conflicts_path.read_text("utf-8").splitlines()]
+    by_kind = {c["kind"]: c for c in conflicts}
+    a, b, _ = map(str, shards)
+    assert by_kind["correct_answer"]["sources"] == {a: 0, b: 2}
+    assert by_kind["correct_in_wrong"]["wrong_sources"] == [a]
+    assert by_kind["choices"]["id"] == "5"
+
+
+def test_cli_refuses_to_overwrite(
+    tmp_path: Path, shards: list[Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    output = tmp_path / "merged.json"
+    output.write_text("{}", encoding="utf-8")
+    argv = ["merge", *map(str, shards), "-o", str(output), "-j", "1"]
+    argv += ["--conflicts", str(tmp_path / "conflicts.jsonl")]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exc:
+        merge.main()
+    assert exc.value.code == 1
+    assert output.read_text(encoding="utf-8") == "{}"
+
+    monkeypatch.setattr(sys, "argv", [*argv, "--force"])
+    merge.main()
+    assert len(JSONQuestionStore(output).load()) == 5
+
+
+def test_cli_exits_nonzero_on_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    argv = ["merge", str(tmp_path / "missing.json"), "-o", str(tmp_path / "merged.json")]
+    monkeypatch.setattr(sys, "argv", [*argv, "-j", "1"])
+    with pytest.raises(SystemExit) as exc:
+        merge.main()
+    assert exc.value.code == 1
+    assert not (tmp_path / "merged.json").exists()
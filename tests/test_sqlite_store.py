@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from bili_hardcore_benchmark.core.models import QuestionStatus
+from bili_hardcore_benchmark.core.services.benchmark_service import BenchmarkService
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import JSONQuestionStore
+from bili_hardcore_benchmark.infrastructure.persistence.sqlite_store import SQLiteQuestionStore
+
+
+def _json_store(path: Path) -> JSONQuestionStore:
+    store = JSONQuestionStore(path)
+    service = BenchmarkService(store, write_behind=False)
+    service.get_or_create_question("1", "题目一", ["A", "B", "C"])
+    service.get_or_create_question("2", "题目二", ["A", "B"])
+    service.get_or_create_question("3", "题目三", ["A", "B"])
+    service.record_wrong_answer("1", 0)
+    service.record_correct_answer("1", 2, category="知识")
+    service.record_wrong_answer("2", 1)
+    service.record_ranking("3", [1, 0])
+    service.close()
+    return store
+
+
+def test_migrates_json_store(tmp_path: Path) -> None:
+    json_path = tmp_path / "questions_raw.json"
+    expected = _json_store(json_path).load()
+
+    store = SQLiteQuestionStore(tmp_path / "questions.db", migrate_from=json_path)
+    assert store.load() == expected
+    assert store.count_by_status() == {
+        QuestionStatus.COMPLETE: 1,
+        QuestionStatus.PARTIAL: 1,
+        QuestionStatus.UNKNOWN: 1,
+    }
+    assert store.categories() == {"知识": 1, None: 2}
+    store.close()
+
+
+def test_migration_runs_once(tmp_path: Path) -> None:
+    json_path = tmp_path / "questions_raw.json"
+    _json_store(json_path)
+    db_path = tmp_path / "questions.db"
+
+    store = SQLiteQuestionStore(db_path, migrate_from=json_path)
+    service = BenchmarkService(store, write_behind=False)
+    service.record_correct_answer("2", 0)
+    service.close()
+
+    # 数据库非空时不再导入，JSON 中的旧状态不能覆盖已有的变更
+    store = SQLiteQuestionStore(db_path, migrate_from=json_path)
+    questions = store.load()
+    assert questions["2"]["correct_answer"] == 0
+    assert store.count_by_status()[QuestionStatus.COMPLETE] == 2
+    store.close()
+
+
+def test_adds_missing_ai_ranking_column(tmp_path: Path) -> None:
+    db_path = tmp_path / "questions.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE questions (id TEXT PRIMARY KEY, question TEXT NOT NULL, "
+        "choices TEXT NOT NULL, category TEXT, correct_answer INTEGER, "
+        "wrong_answers TEXT NOT NULL DEFAULT '[]', attempts INTEGER NOT NULL DEFAULT 0, "
+        "last_attempt TEXT, status TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO questions (id, question, choices, status) VALUES (?, ?, ?, ?)",
+        ("1", "题目", '["A"]', "unknown"),
+    )
+    conn.commit()
+    conn.close()
+
+    store = SQLiteQuestionStore(db_path)
+    assert store.load()["1"]["ai_ranking"] == []
+    store.close()
+
+
+def test_iter_questions_filters(tmp_path: Path) -> None:
+    json_path = tmp_path / "questions_raw.json"
+    _json_store(json_path)
+    store = SQLiteQuestionStore(tmp_path / "questions.db", migrate_from=json_path)
+
+    def ids(**kwargs: Any) -> list[str]:
+        return [q.id for q in store.iter_questions(**kwargs)]
+
+    assert ids() == ["1", "2", "3"]
+    assert ids(status=QuestionStatus.COMPLETE) == ["1"]
+    assert ids(category="知识") == ["1"]
+    assert ids(since=datetime.max) == []
+    # 题目三只有排序，从未作答
+    assert ids(since=datetime.min) == ["1", "2"]
+    store.close()
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from bili_hardcore_benchmark.core.services.benchmark_service import BenchmarkService
+from bili_hardcore_benchmark.infrastructure.persistence import question_store
+from bili_hardcore_benchmark.infrastructure.persistence.question_store import (
+    JSONQuestionStore,
+    WALQuestionStore,
+)
+
+
+def _collect(path: Path, compact_every: int = 10000) -> WALQuestionStore:
+    store = WALQuestionStore(path, compact_every=compact_every)
+    service = BenchmarkService(store, write_behind=False)
+    service.get_or_create_question("1", "题目一", ["A", "B", "C"])
+    service.get_or_create_question("2", "题目二", ["A", "B"])
+    service.record_wrong_answer("1", 0)
+    service.record_correct_answer("1", 2, category="知识")
+    service.record_ranking("2", [1, 0])
+    service.close()
+    return store
+
+
+def test_replay_restores_state(tmp_path: Path) -> None:
+    path = tmp_path / "questions_raw.json"
+    store = _collect(path)
+    assert not path.exists() or not json.loads(path.read_text())["questions"]
+
+    questions = WALQuestionStore(path).load()
+    assert questions["1"]["correct_answer"] == 2
+    assert questions["1"]["wrong_answers"] == [0]
+    assert questions["1"]["category"] == "知识"
+    assert questions["2"]["ai_ranking"] == [1, 0]
+    assert store.log_path.stat().st_size > 0
+
+
+def test_compaction_skips_merged_events(tmp_path: Path) -> None:
+    path = tmp_path / "questions_raw.json"
+    store = _collect(path)
+    log = store.log_path.read_bytes()
+    store.compact()
+    assert store.log_path.stat().st_size == 0
+
+    # 写完快照、清空日志之前崩溃：旧日志仍在，已合并的事件不能重复计数
+    store.log_path.write_bytes(log)
+    questions = WALQuestionStore(path).load()
+    assert questions["1"]["wrong_answers"] == [0]
+    assert questions["1"]["correct_answer"] == 2
+
+
+def test_torn_last_line_is_truncated(tmp_path: Path) -> None:
+    path = tmp_path / "questions_raw.json"
+    store = _collect(path)
+    intact = store.log_path.read_bytes()
+    store.log_path.write_bytes(intact + b'{"op":"wrong","id":"2","idx')
+
+    questions = WALQuestionStore(path).load()
+    assert questions["1"]["correct_answer"] == 2
+    assert store.log_path.read_bytes() == intact
+
+
+def test_unterminated_valid_last_line_is_kept(tmp_path: Path) -> None:
+    path = tmp_path / "questions_raw.json"
+    store = _collect(path)
+    store.log_path.write_bytes(store.log_path.read_bytes().rstrip(b"\n"))
+
+    reloaded = WALQuestionStore(path)
+    assert reloaded.load()["2"]["ai_ranking"] == [1, 0]
+    assert store.log_path.read_bytes().endswith(b"\n")
+
+
+@pytest.mark.parametrize(
+    "bad_line",
+    [b"not json\n", b'{"op":"future-op","id":"1","seq":99}\n'],
+)
+def test_unparseable_middle_line_raises_without_truncating(tmp_path: Path, bad_line: bytes) -> None:
+    path = tmp_path / "questions_raw.json"
+    store = _collect(path)
+    lines = store.log_path.read_bytes().splitlines(keepends=True)
+    corrupted = b"".join(lines[:2] + [bad_line] + lines[2:])
+    store.log_path.write_bytes(corrupted)
+
+    with pytest.raises(ValueError, match="第 3 行"):
+        WALQuestionStore(path).load()
+    assert store.log_path.read_bytes() == corrupted
+
+
+@pytest.mark.parametrize("fsync", [False, True])
+def test_fsync_follows_setting(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fsync: bool
+) -> None:
+    # json 后端默认只依赖原子替换，不为每次整体重写等待磁盘
+    synced: list[int] = []
+    monkeypatch.setattr(question_store.os, "fsync", synced.append)
+    path = tmp_path / "questions_raw.json"
+    JSONQuestionStore(path, fsync=fsync).save({"1": {"id": "1"}})
+    assert json.loads(path.read_text())["questions"] == {"1": {"id": "1"}}
+    assert not path.with_name(path.name + ".tmp").exists()
+
+    store = _collect(tmp_path / "wal.json")
+    store.fsync = fsync
+    store.compact()
+    assert bool(synced) is fsync